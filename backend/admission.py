@@ -0,0 +1,122 @@
+import asyncio
+from collections import deque
+from typing import Deque, Tuple
+
+class Saturado(Exception):
+    """El servidor tiene demasiado trabajo en curso: la subida debe reintentarse más tarde."""
+    def __init__(self, reintentar_en: int):
+        self.reintentar_en = reintentar_en
+        self.message = "El servidor está procesando demasiados archivos; reintente en unos segundos."
+        super().__init__(self.message)
+
+class Permiso:
+    """Capacidad admitida para un grupo de archivos; se devuelve a medida que cada uno termina."""
+    def __init__(self, control: "ControlAdmision", archivos: int, tamano: int):
+        self._control = control
+        self.archivos = archivos
+        self.tamano = tamano
+
+    def liberar(self, archivos: int = 1, tamano: int = 0):
+        """Devuelve la capacidad de archivos ya terminados (sin pasar de lo admitido)."""
+        archivos, tamano = min(archivos, self.archivos), min(tamano, self.tamano)
+        self.archivos -= archivos
+        self.tamano -= tamano
+        self._control._devolver(archivos, tamano)
+
+    def liberar_todo(self):
+        self.liberar(self.archivos, self.tamano)
+
+    def ajustar(self, archivos: int, tamano: int):
+        """
+        Lleva el permiso a lo que resultó tener la solicitud. Las subidas se admiten antes de
+        leer su cuerpo (por Content-Length y la cantidad anunciada): lo que sobra se devuelve
+        y lo que falta se suma sin esperar, porque los bytes ya llegaron.
+        """
+        sobran_archivos, sobran_tamano = max(0, self.archivos - archivos), max(0, self.tamano - tamano)
+        if sobran_archivos or sobran_tamano:
+            self.liberar(sobran_archivos, sobran_tamano)
+        faltan_archivos, faltan_tamano = max(0, archivos - self.archivos), max(0, tamano - self.tamano)
+        self._control.archivos_en_curso += faltan_archivos
+        self._control.bytes_en_curso += faltan_tamano
+        self.archivos += faltan_archivos
+        self.tamano += faltan_tamano
+
+class ControlAdmision:
+    """
+    Límite de archivos y bytes en curso (recibidos y aún sin terminar) para todo el servicio.
+    Las solicitudes que no caben esperan su turno en orden de llegada; las subidas HTTP
+    esperan como máximo `espera_maxima` segundos y luego se rechazan (429 + Retry-After).
+    Un grupo más grande que el límite se admite solo cuando no hay nada más en curso.
+    """
+    def __init__(self, max_archivos: int, max_bytes: int, espera_maxima: float, reintentar_en: int):
+        self.max_archivos = max_archivos
+        self.max_bytes = max_bytes
+        self.espera_maxima = espera_maxima
+        self.reintentar_en = reintentar_en
+        self.archivos_en_curso = 0
+        self.bytes_en_curso = 0
+        self.rechazos = 0
+        # Todo ocurre en el event loop: sin await entre la consulta y la reserva no hace falta lock
+        self._cola: Deque[Tuple[asyncio.Future, int, int]] = deque()
+
+    @property
+    def en_espera(self) -> int:
+        return len(self._cola)
+
+    def _cabe(self, archivos: int, tamano: int) -> bool:
+        # Sin nada en curso se admite cualquier tamaño, a propósito: una carpeta local o un lote
+        # más grande que el límite nunca cabría y esperaría para siempre (o recibiría 429 siempre).
+        # El límite acota la concurrencia, no el tamaño de una solicitud (eso lo hace la ruta, 413).
+        if self.archivos_en_curso == 0:
+            return True
+        return (self.archivos_en_curso + archivos <= self.max_archivos
+                and self.bytes_en_curso + tamano <= self.max_bytes)
+
+    def _tomar(self, archivos: int, tamano: int) -> Permiso:
+        self.archivos_en_curso += archivos
+        self.bytes_en_curso += tamano
+        return Permiso(self, archivos, tamano)
+
+    async def admitir(self, archivos: int, tamano: int, esperar: bool = False) -> Permiso:
+        """
+        Reserva capacidad para `archivos` archivos que suman `tamano` bytes.
+        Con esperar=False (subidas) lanza Saturado si no hubo lugar en espera_maxima segundos;
+        con esperar=True (carpetas locales, trabajo en segundo plano) espera lo necesario.
+        """
+        if archivos == 0:
+            return Permiso(self, 0, 0)  # p. ej. crear un trabajo sin archivos todavía
+        if not self._cola and self._cabe(archivos, tamano):
+            return self._tomar(archivos, tamano)
+        turno = asyncio.get_running_loop().create_future()
+        entrada = (turno, archivos, tamano)
+        self._cola.append(entrada)
+        try:
+            return await asyncio.wait_for(turno, None if esperar else self.espera_maxima)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if turno.done() and not turno.cancelled():
+                # El turno llegó justo al vencer la espera: se devuelve lo reservado
+                turno.result().liberar_todo()
+            if entrada in self._cola:
+                self._cola.remove(entrada)
+                self._despachar()
+            if isinstance(e, asyncio.TimeoutError):
+                self.rechazos += 1
+                raise Saturado(self.reintentar_en) from None
+            raise
+
+    def _devolver(self, archivos: int, tamano: int):
+        self.archivos_en_curso -= archivos
+        self.bytes_en_curso -= tamano
+        self._despachar()
+
+    def _despachar(self):
+        # Admite en orden de llegada mientras haya lugar
+        while self._cola:
+            turno, archivos, tamano = self._cola[0]
+            if turno.done():
+                self._cola.popleft()
+                continue
+            if not self._cabe(archivos, tamano):
+                break
+            self._cola.popleft()
+            turno.set_result(self._tomar(archivos, tamano))
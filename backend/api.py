@@ -0,0 +1,429 @@
+"""
+API HTTP del sistema (FastAPI): rutas de procesamiento, trabajos, descargas y catálogo,
+y los archivos estáticos de la interfaz. main.py la arranca con uvicorn.
+"""
+import re
+import sys
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Literal, Optional
+from fastapi import Depends, FastAPI, UploadFile, File, Form, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers
+
+from config import PRECALENTAR_WORKERS
+from models import (BatchProcessResponse, JobCreatedResponse, JobStatusResponse, ProcesarRutaRequest,
+                    CatalogoPagina, FaltantesResponse, EstadoCarga, ConocidosRequest, ConocidosResponse,
+                    SubidaEstado, SubidasResponse, UsoPlantilla, ReparseoResponse)
+from service import acta_service
+from parser import ParsingError
+from admission import Saturado
+from uploads import SubidaInvalida, leer_content_range, RE_SHA256
+from config import SUBIDA_MAX_PARTE, RUTAS_PERMITIDAS, STORAGE_ROOT, DATA_ROOT
+from utils import get_resource_path
+
+logger = logging.getLogger(__name__)
+
+HOST = "127.0.0.1"
+PORT = 8000
+# Orígenes de la propia interfaz: ninguna otra página abierta en el navegador puede usar la API
+ORIGENES = [f"http://{HOST}:{PORT}", f"http://localhost:{PORT}"]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if PRECALENTAR_WORKERS:
+        # Los workers importan pdfplumber en paralelo con el resto del arranque
+        acta_service.engine.calentar()
+    yield
+    # Detener los procesos del pool de parsing al cerrar el servidor
+    acta_service.cerrar()
+
+app = FastAPI(
+    title="Sistema de Gestión de Actas",
+    description="Sistema Institucional Portátil de Gestión de Actas",
+    version="1.1.0",
+    lifespan=lifespan
+)
+
+# Clave del permiso de admisión de una subida en scope["state"] (ver AdmisionSubidas)
+PERMISO_SUBIDA = "permiso_subida"
+
+class AdmisionSubidas:
+    """
+    Control de admisión de las subidas multipart antes de leer su cuerpo: el lugar se reserva
+    con Content-Length y la cantidad de archivos que anuncia X-Archivos (1 si no viene), así
+    un 429 llega antes de que el cliente envíe los bytes y no ocupa disco de staging.
+    La ruta toma el permiso de scope["state"] y lo ajusta a los archivos recibidos; si no lo
+    toma (p. ej. un 404), se devuelve al terminar la petición.
+    """
+    RUTAS = re.compile(r"^/(procesar-carpeta|trabajos|trabajos/[^/]+/archivos)$")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not self.RUTAS.match(scope["path"]):
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            return await self.app(scope, receive, send)
+        try:
+            tamano = max(0, int(headers.get("content-length") or 0))
+            archivos = max(1, int(headers.get("x-archivos") or 1))
+        except ValueError:
+            tamano, archivos = 0, 1
+        try:
+            permiso = await acta_service.admision.admitir(archivos, tamano)
+        except Saturado as e:
+            respuesta = await saturado_handler(None, e)
+            return await respuesta(scope, receive, send)
+        scope.setdefault("state", {})[PERMISO_SUBIDA] = permiso
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if scope["state"].pop(PERMISO_SUBIDA, None) is not None:
+                permiso.liberar_todo()
+
+def _tomar_permiso(request: Request):
+    """Permiso reservado por AdmisionSubidas para esta petición (desde aquí es de la ruta)."""
+    return request.scope.get("state", {}).pop(PERMISO_SUBIDA, None)
+
+app.add_middleware(AdmisionSubidas)
+
+# CORS solo para la propia interfaz (el frontend se sirve desde este mismo servidor)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=ORIGENES,
+    allow_methods=["GET", "POST", "PUT"],
+    allow_headers=["Content-Type", "Content-Range", "Last-Event-ID", "X-Archivos"],
+)
+
+async def verificar_origen(origin: Optional[str] = Header(None), sec_fetch_site: Optional[str] = Header(None)):
+    """
+    Rechaza las peticiones que otra página del navegador envía a este servidor local.
+    CORS no alcanza: un formulario o un fetch "simple" de otro sitio llega igual (solo
+    no puede leer la respuesta). Los clientes fuera del navegador no envían Origin.
+    """
+    if (origin is not None and origin not in ORIGENES) or sec_fetch_site in ("cross-site", "same-site"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Petición rechazada: solo la interfaz del sistema puede usar esta operación")
+
+def _dentro_de(ruta: Path, raiz: Path) -> bool:
+    return ruta == raiz or raiz in ruta.parents
+
+def _validar_ruta_local(ruta: str) -> Path:
+    """Carpeta local permitida (ver RUTAS_PERMITIDAS en config.py), ya resuelta."""
+    origen = Path(ruta).expanduser().resolve()
+    if not any(_dentro_de(origen, raiz.resolve()) for raiz in RUTAS_PERMITIDAS):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail=f"La carpeta está fuera de las permitidas: {ruta}")
+    # Los espacios de trabajo se borran al empezar otra sesión: no se toman originales de ahí
+    if any(_dentro_de(origen, raiz.resolve()) or _dentro_de(raiz.resolve(), origen)
+           for raiz in (STORAGE_ROOT, DATA_ROOT)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"La carpeta contiene datos internos del sistema: {ruta}")
+    if not origen.is_dir():
+        raise HTTPException(status_code=400, detail=f"La carpeta no existe: {ruta}")
+    return origen
+
+# Manejador de errores global para ParsingError
+@app.exception_handler(ParsingError)
+async def parsing_error_handler(request, exc: ParsingError):
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={"detail": exc.message}
+    )
+
+# Exceso de trabajo en curso: el cliente debe reintentar la subida más tarde
+@app.exception_handler(Saturado)
+async def saturado_handler(request, exc: Saturado):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": exc.message},
+        headers={"Retry-After": str(exc.reintentar_en)}
+    )
+
+@app.get("/health", tags=["General"])
+async def health():
+    return {"status": "ok", "message": "Sistema funcionando"}
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["General"])
+async def metrics():
+    """Tiempos por etapa y contadores de resultados, en el formato de texto de Prometheus."""
+    return PlainTextResponse(acta_service.exportar_metricas(), media_type="text/plain; version=0.0.4")
+
+@app.get("/carga", response_model=EstadoCarga, tags=["General"])
+async def carga():
+    """Archivos y parseos en curso y en espera (profundidad de la cola) frente a los límites."""
+    return acta_service.estado_carga()
+
+@app.get("/plantillas", response_model=List[UsoPlantilla], tags=["General"])
+async def plantillas():
+    """Aciertos de cada plantilla de diseño aprendida desde el arranque (la más usada primero)."""
+    return acta_service.uso_plantillas()
+
+def _obtener_trabajo(trabajo_id: str):
+    trabajo = acta_service.trabajos.obtener(trabajo_id)
+    if trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return trabajo
+
+def _obtener_sesion(trabajo_id: Optional[str]):
+    """Trabajo indicado o, si no se indica, la última sesión con espacio de trabajo."""
+    sesion = _obtener_trabajo(trabajo_id) if trabajo_id else acta_service.trabajos.ultimo()
+    if sesion is None or not sesion.directorio.exists():
+        raise HTTPException(status_code=404, detail="No hay actas procesadas para descargar")
+    return sesion
+
+@app.post("/procesar-carpeta", response_model=BatchProcessResponse, tags=["Procesamiento"],
+          responses={200: {"content": {"application/x-ndjson": {}}}})
+async def procesar_carpeta(request: Request, files: List[UploadFile] = File(...), trabajo: Optional[str] = None,
+                           dividir: bool = False, formato: Literal["json", "ndjson"] = "json"):
+    """
+    Recibe múltiples archivos PDF (subidos vía webkitdirectory o drag & drop); los demás se ignoran.
+    Sin `trabajo` se inicia una sesión nueva; con el `trabajo_id` de la respuesta
+    se pueden enviar más lotes (también en paralelo) a la misma sesión.
+    `dividir` (al iniciar la sesión) separa los PDF consolidados en un archivo por acta.
+    Con `formato=ndjson` la respuesta es un flujo: una línea {"tipo": "resultado", ...} por
+    archivo, en orden de finalización, y al final una línea {"tipo": "resumen", ...}.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No se enviaron archivos")
+    # Una carpeta subida trae también otros archivos: se ignoran, como en las carpetas locales
+    files = [file for file in files if (file.filename or "").lower().endswith(".pdf")]
+    if not files:
+        raise HTTPException(status_code=400, detail="No se enviaron archivos PDF")
+    sesion = _obtener_trabajo(trabajo) if trabajo else acta_service.crear_trabajo(dividir=dividir)
+    permiso = _tomar_permiso(request)
+    if formato == "ndjson":
+        return StreamingResponse(
+            await acta_service.procesar_lote_en_flujo(files, sesion, permiso),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    return await acta_service.procesar_lote_archivos(files, sesion, permiso)
+
+@app.post("/trabajos", response_model=JobCreatedResponse, status_code=status.HTTP_202_ACCEPTED, tags=["Trabajos"])
+async def crear_trabajo(request: Request, files: Optional[List[UploadFile]] = File(None),
+                        total: Optional[int] = Form(None), dividir: bool = Form(False)):
+    """
+    Crea un trabajo (sesión) de procesamiento en segundo plano y responde apenas los
+    archivos están recibidos. `total` indica cuántos archivos tendrá el trabajo cuando se suben
+    en varias partes (POST /trabajos/{id}/archivos); sin él, son los de esta petición.
+    Con `dividir`, cada PDF consolidado produce un resultado por acta (el total puede crecer).
+    El avance se sigue con GET /trabajos/{id}/eventos (Server-Sent Events).
+    """
+    files = files or []
+    if not files and not total:
+        raise HTTPException(status_code=400, detail="No se enviaron archivos")
+    
+    trabajo = acta_service.crear_trabajo(total, dividir)
+    await acta_service.agregar_a_trabajo(trabajo, files, _tomar_permiso(request))
+    return JobCreatedResponse(
+        trabajo_id=trabajo.id,
+        total=trabajo.total or 0,
+        recibidos=trabajo.recibidos,
+        eventos_url=f"/trabajos/{trabajo.id}/eventos"
+    )
+
+@app.post("/procesar-ruta", response_model=JobCreatedResponse, status_code=status.HTTP_202_ACCEPTED,
+          tags=["Procesamiento"], dependencies=[Depends(verificar_origen)])
+async def procesar_ruta(solicitud: ProcesarRutaRequest):
+    """
+    Procesa una carpeta del disco local sin subir los archivos desde el navegador.
+    Los PDF se leen en su lugar y se enlazan (o mueven) al espacio de trabajo de una
+    sesión nueva; el avance se sigue igual que en /trabajos.
+    Solo se aceptan carpetas dentro de las permitidas (ACTAS_RUTAS_PERMITIDAS).
+    """
+    origen = await asyncio.to_thread(_validar_ruta_local, solicitud.ruta)
+    
+    trabajo = acta_service.crear_trabajo(dividir=solicitud.dividir)
+    encontrados = await acta_service.agregar_ruta_a_trabajo(trabajo, origen, solicitud.mover)
+    if not encontrados:
+        raise HTTPException(status_code=400, detail="No se encontraron archivos PDF en la carpeta")
+    return JobCreatedResponse(
+        trabajo_id=trabajo.id,
+        total=trabajo.total or 0,
+        recibidos=trabajo.recibidos,
+        eventos_url=f"/trabajos/{trabajo.id}/eventos"
+    )
+
+@app.post("/trabajos/{trabajo_id}/archivos", response_model=JobStatusResponse,
+          status_code=status.HTTP_202_ACCEPTED, tags=["Trabajos"])
+async def agregar_archivos(trabajo_id: str, request: Request, files: List[UploadFile] = File(...)):
+    """Agrega otra parte de archivos a un trabajo existente."""
+    trabajo = _obtener_trabajo(trabajo_id)
+    await acta_service.agregar_a_trabajo(trabajo, files, _tomar_permiso(request))
+    return trabajo.estado()
+
+@app.post("/trabajos/{trabajo_id}/conocidos", response_model=ConocidosResponse, tags=["Trabajos"])
+async def agregar_conocidos(trabajo_id: str, solicitud: ConocidosRequest):
+    """
+    Recibe los SHA-256 calculados en el navegador. Los archivos que el servidor ya tiene
+    guardados se agregan al trabajo sin subirlos (sus resultados llegan por /eventos);
+    `pendientes` son los que hay que enviar a /trabajos/{id}/archivos.
+    """
+    trabajo = _obtener_trabajo(trabajo_id)
+    conocidos, pendientes = await acta_service.agregar_conocidos_a_trabajo(trabajo, solicitud.archivos)
+    return ConocidosResponse(trabajo_id=trabajo.id, conocidos=conocidos, pendientes=pendientes)
+
+@app.put("/trabajos/{trabajo_id}/subidas/{sha256}", response_model=SubidaEstado, tags=["Trabajos"])
+async def subir_parte(trabajo_id: str, sha256: str, nombre: str, request: Request,
+                      content_range: str = Header(...)):
+    """
+    Subida reanudable: el cuerpo es una parte del archivo (bytes crudos) y Content-Range
+    indica su posición ('bytes desde-hasta/total'). Las partes se envían en orden; si se
+    pierde la conexión, GET /trabajos/{id}/subidas dice desde qué byte seguir.
+    Ante una parte fuera de orden responde 409 con el byte esperado en Upload-Offset.
+    """
+    trabajo = _obtener_trabajo(trabajo_id)
+    if not RE_SHA256.match(sha256):
+        raise HTTPException(status_code=400, detail="El SHA-256 debe tener 64 dígitos hexadecimales")
+    try:
+        rango = leer_content_range(content_range)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    tamano = rango[1] - rango[0] + 1
+    if tamano > SUBIDA_MAX_PARTE:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Cada parte puede tener como máximo {SUBIDA_MAX_PARTE} bytes")
+    # Las partes pasan por el mismo control de admisión que las subidas multipart (429 si no hay lugar)
+    permiso = await acta_service.admision.admitir(1, tamano)
+    try:
+        datos = await _leer_parte(request, tamano)
+        return await acta_service.recibir_parte(trabajo, sha256, nombre, rango, datos)
+    except SubidaInvalida as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message,
+                            headers={"Upload-Offset": str(e.recibido)})
+    finally:
+        permiso.liberar_todo()
+
+async def _leer_parte(request: Request, tamano: int) -> bytes:
+    """
+    Lee el cuerpo de una parte contando los bytes a medida que llegan: corta en cuanto supera
+    lo declarado en Content-Range, sin leer el resto (si faltan bytes, recibir_parte la rechaza).
+    """
+    longitud = request.headers.get("content-length")
+    if longitud is not None and longitud.isdigit() and int(longitud) != tamano:
+        raise HTTPException(status_code=400, detail="El Content-Length no coincide con el Content-Range")
+    datos = bytearray()
+    async for bloque in request.stream():
+        datos += bloque
+        if len(datos) > tamano:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail="La parte es más larga que su Content-Range")
+    return bytes(datos)
+
+@app.get("/trabajos/{trabajo_id}/subidas", response_model=SubidasResponse, tags=["Trabajos"])
+async def estado_subidas(trabajo_id: str):
+    """Subidas reanudables del trabajo: bytes recibidos de cada archivo y si ya está completo."""
+    trabajo = _obtener_trabajo(trabajo_id)
+    return SubidasResponse(trabajo_id=trabajo.id, subidas=acta_service.estado_subidas(trabajo))
+
+@app.get("/trabajos/{trabajo_id}", response_model=JobStatusResponse, tags=["Trabajos"])
+async def estado_trabajo(trabajo_id: str):
+    return _obtener_trabajo(trabajo_id).estado()
+
+@app.get("/trabajos/{trabajo_id}/eventos", tags=["Trabajos"])
+async def eventos_trabajo(trabajo_id: str, last_event_id: Optional[str] = Header(None)):
+    """
+    Resultados por archivo a medida que terminan (text/event-stream).
+    Al reconectar, el navegador envía Last-Event-ID y se reanuda desde el siguiente.
+    """
+    trabajo = _obtener_trabajo(trabajo_id)
+    desde = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        trabajo.eventos(desde),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/descargar", tags=["Procesamiento"])
+async def descargar_zip(trabajo: Optional[str] = None):
+    """
+    Descarga el ZIP del espacio de trabajo de la sesión (por defecto, la última).
+    El archivo se mantiene al día mientras se procesan las actas: solo se sirve, no se genera.
+    """
+    sesion = _obtener_sesion(trabajo)
+    instantanea = await asyncio.to_thread(sesion.archivo.instantanea)
+    return StreamingResponse(
+        instantanea.leer(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": 'attachment; filename="Actas_Procesadas_Organizadas.zip"',
+            "Content-Length": str(instantanea.tamano)
+        }
+    )
+
+@app.get("/descargar/manifiesto", tags=["Procesamiento"])
+async def descargar_manifiesto(trabajo: Optional[str] = None):
+    """Lista de actas del ZIP con su archivo original, SHA-256 y metadata."""
+    return _obtener_sesion(trabajo).archivo.manifiesto()
+
+@app.post("/trabajos/{trabajo_id}/reconstruir-archivo", tags=["Trabajos"])
+async def reconstruir_archivo(trabajo_id: str):
+    """Recuperación: rehace el ZIP y el manifiesto recorriendo el espacio de trabajo."""
+    trabajo = _obtener_trabajo(trabajo_id)
+    await asyncio.to_thread(trabajo.archivo.reconstruir)
+    return {"status": "ok", "actas": len(trabajo.archivo.manifiesto())}
+
+@app.get("/catalogo/actas", response_model=CatalogoPagina, tags=["Catálogo"])
+async def catalogo_actas(
+    anio: Optional[str] = None,
+    codigo_modular: Optional[str] = None,
+    nivel: Optional[str] = None,
+    grado: Optional[int] = None,
+    seccion: Optional[str] = None,
+    recuperacion: Optional[bool] = None,
+    trabajo: Optional[str] = None,
+    sha256: Optional[str] = None,
+    pagina: int = Query(1, ge=1),
+    por_pagina: int = Query(100, ge=1, le=1000)
+):
+    """Actas guardadas que cumplen los filtros, p. ej. ?anio=2024&nivel=SECUNDARIA&recuperacion=true."""
+    return await asyncio.to_thread(
+        acta_service.catalogo.consultar, pagina, por_pagina,
+        anio=anio, codigo_modular=codigo_modular, nivel=nivel and nivel.upper(), grado=grado,
+        seccion=seccion and seccion.upper(), es_recuperacion=recuperacion, trabajo=trabajo, sha256=sha256
+    )
+
+@app.get("/catalogo/faltantes", response_model=FaltantesResponse, tags=["Catálogo"])
+async def catalogo_faltantes(codigo_modular: str, anio: Optional[str] = None, nivel: Optional[str] = None):
+    """Grados sin acta regular para una institución, por año y nivel."""
+    resultados = await asyncio.to_thread(
+        acta_service.catalogo.faltantes, codigo_modular, anio, nivel and nivel.upper()
+    )
+    return FaltantesResponse(codigo_modular=codigo_modular, resultados=resultados)
+
+@app.post("/catalogo/reparsear", response_model=ReparseoResponse, tags=["Catálogo"],
+          dependencies=[Depends(verificar_origen)])
+async def catalogo_reparsear(simular: bool = False):
+    """
+    Aplica las reglas de parsing actuales a todas las actas guardadas (desde sus instantáneas,
+    sin volver a leer los PDF) y mueve o renombra las que cambian de clasificación.
+    ?simular=true solo informa los cambios.
+    """
+    if acta_service.trabajos.en_proceso():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Hay actas en proceso; reintente el reparseo cuando terminen")
+    return await acta_service.reparsear(simular)
+
+# Servir archivos estáticos (Frontend)
+# Obtener la ruta de la carpeta 'static' relativa a este archivo (backend/main.py)
+current_dir = Path(__file__).parent.resolve()
+static_path = current_dir / "static"
+
+# Fallback para PyInstaller (recursos están en la raíz del bundle)
+if getattr(sys, 'frozen', False):
+    static_path = Path(sys._MEIPASS) / "static"
+
+logger.info("Cargando archivos estáticos desde: %s", static_path.resolve())
+
+if not static_path.exists():
+    logger.warning("La carpeta de archivos estáticos no existe en %s", static_path)
+
+app.mount("/", StaticFiles(directory=str(static_path), html=True), name="static")
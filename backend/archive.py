@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import zlib
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional
+
+from config import UPLOAD_CHUNK_SIZE
+
+# --- Formato ZIP (solo entradas sin compresión, ZIP_STORED) ---
+_CABECERA_LOCAL = struct.Struct("<IHHHHHIIIHH")
+_ENTRADA_CENTRAL = struct.Struct("<IHHHHHHIIIHHHHHII")
+_FIN_CENTRAL = struct.Struct("<IHHHHIIH")
+_FIN_CENTRAL_64 = struct.Struct("<IQHHIIQQQQ")
+_LOCALIZADOR_64 = struct.Struct("<IIQI")
+_EXTRA_OFFSET_64 = struct.Struct("<HHQ")
+_MAX_32 = 0xFFFFFFFF
+_MAX_16 = 0xFFFF
+_UTF8 = 0x800  # bit 11: nombres en UTF-8 (tildes y Ñ en los nombres de las actas)
+
+DIRECTORIO_INDICE = ".indice"
+
+@dataclass
+class _Entrada:
+    offset: int  # posición de la cabecera local
+    crc: int
+    tamano: int
+    hora: int  # formato DOS
+    fecha: int
+
+def _fecha_dos(marca: float):
+    t = time.localtime(marca)
+    anio = max(t.tm_year, 1980)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), ((anio - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+def _directorio_central(entradas: Dict[str, _Entrada], inicio: int) -> bytes:
+    """Directorio central y registro de fin (ZIP64 solo si hace falta) para las entradas dadas."""
+    partes = []
+    for nombre, e in entradas.items():
+        nombre_b = nombre.encode("utf-8")
+        extra = b""
+        offset = e.offset
+        version = 20
+        if offset > _MAX_32:
+            extra = _EXTRA_OFFSET_64.pack(1, 8, offset)
+            offset = _MAX_32
+            version = 45
+        partes.append(_ENTRADA_CENTRAL.pack(
+            0x02014B50, version, version, _UTF8, 0, e.hora, e.fecha, e.crc, e.tamano, e.tamano,
+            len(nombre_b), len(extra), 0, 0, 0, 0, offset
+        ))
+        partes.append(nombre_b)
+        partes.append(extra)
+    central = b"".join(partes)
+    total = len(entradas)
+    fin = b""
+    if total > _MAX_16 or inicio > _MAX_32 or len(central) > _MAX_32:
+        inicio_64 = inicio + len(central)
+        fin += _FIN_CENTRAL_64.pack(0x06064B50, 44, 45, 45, 0, 0, total, total, len(central), inicio)
+        fin += _LOCALIZADOR_64.pack(0x07064B50, 0, inicio_64, 1)
+        fin += _FIN_CENTRAL.pack(0x06054B50, 0, 0, _MAX_16, _MAX_16, _MAX_32, _MAX_32, 0)
+    else:
+        fin += _FIN_CENTRAL.pack(0x06054B50, 0, 0, total, total, len(central), inicio, 0)
+    return central + fin
+
+def _tamano_entrada(nombre: str, entrada: _Entrada) -> int:
+    """Bytes que ocupa una entrada en el archivo (cabecera local, nombre y datos)."""
+    return _CABECERA_LOCAL.size + len(nombre.encode("utf-8")) + entrada.tamano
+
+class ArchivoIncremental:
+    """
+    ZIP y manifiesto de un espacio de trabajo, mantenidos a medida que se guarda cada acta.
+
+    Cada acta nueva (o reemplazada) se escribe al final del archivo; los bytes ya escritos
+    nunca se modifican. El directorio central no se reescribe con cada acta (sería O(n) por
+    acta): se escribe al final solo cuando alguien lo necesita, al pedir una instantanea()
+    para descargar o al completar() el trabajo. Cualquier longitud publicada así es un ZIP
+    válido y completo: una descarga sirve ese prefijo mientras el procesamiento sigue
+    agregando actas detrás. Los directorios centrales viejos y las versiones reemplazadas
+    o quitadas quedan como espacio muerto hasta la siguiente compactación.
+
+    El manifiesto (manifiesto.jsonl) es un registro de solo agregado con una línea por
+    cambio; reconstruir() rehace ambos recorriendo el espacio de trabajo (recuperación).
+    """
+    def __init__(self, directorio: Path):
+        self.directorio = directorio
+        self.ruta_zip = directorio / DIRECTORIO_INDICE / "actas.zip"
+        self.ruta_manifiesto = directorio / DIRECTORIO_INDICE / "manifiesto.jsonl"
+        self._entradas: Dict[str, _Entrada] = {}
+        self._manifiesto: Dict[str, dict] = {}
+        self._tamano = 0  # longitud del último ZIP completo (publicado)
+        self._inicio_central = 0
+        self._fin = 0  # longitud escrita: entradas posteriores al último directorio central
+        self._pendiente = False  # hay cambios que el último directorio central no refleja
+        self._muerto = 0  # bytes que ya no pertenecen a ninguna entrada vigente
+        self._danado = False
+        self._lock = threading.Lock()
+
+    def agregar(self, ruta: Path, datos: Optional[dict] = None):
+        """Agrega (o reemplaza) el acta guardada en `ruta` y registra `datos` en el manifiesto."""
+        nombre = ruta.relative_to(self.directorio).as_posix()
+        with self._lock:
+            self._asegurar_consistente()
+            try:
+                if not self._fin:
+                    self._iniciar()
+                with open(self.ruta_zip, "r+b") as zipf:
+                    zipf.truncate(self._fin)  # descarta restos de una escritura interrumpida
+                    zipf.seek(self._fin)
+                    entrada = self._escribir_entrada(zipf, ruta, nombre)
+                    zipf.flush()
+                    self._fin = zipf.tell()
+                anterior = self._entradas.pop(nombre, None)
+                self._entradas[nombre] = entrada
+                self._pendiente = True
+                if anterior is not None:
+                    self._muerto += _tamano_entrada(nombre, anterior)
+                registro = {"ruta": nombre, "tamano": entrada.tamano, **(datos or {})}
+                self._manifiesto[nombre] = registro
+                self._anotar({"op": "agregar", **registro})
+            except Exception:
+                # El archivo quedó en un estado desconocido: se rehace en la próxima operación
+                self._danado = True
+                raise
+            self._compactar_si_conviene()
+
+    def quitar(self, ruta: Path):
+        """Quita un acta del archivo (por ejemplo, si se eliminó del espacio de trabajo)."""
+        nombre = ruta.relative_to(self.directorio).as_posix()
+        with self._lock:
+            self._asegurar_consistente()
+            if nombre not in self._entradas:
+                return
+            try:
+                # Sus datos quedan en el archivo como espacio muerto: el próximo directorio
+                # central ya no la incluye
+                self._muerto += _tamano_entrada(nombre, self._entradas.pop(nombre))
+                self._pendiente = True
+                self._manifiesto.pop(nombre, None)
+                self._anotar({"op": "quitar", "ruta": nombre})
+            except Exception:
+                self._danado = True
+                raise
+            self._compactar_si_conviene()
+
+    def instantanea(self) -> "Instantanea":
+        """
+        Fija el contenido actual para servirlo: archivo abierto y longitud válida.
+        Escribe el directorio central si hubo cambios desde el último (una vez por descarga,
+        no por acta); si no, es de tiempo constante.
+        """
+        with self._lock:
+            self._completar()
+            if not self._tamano:
+                return Instantanea(None, len(_directorio_central({}, 0)))
+            return Instantanea(open(self.ruta_zip, "rb"), self._tamano)
+
+    def completar(self):
+        """Escribe el directorio central pendiente: el ZIP en disco queda completo (fin de un trabajo)."""
+        with self._lock:
+            self._completar()
+
+    def manifiesto(self) -> list:
+        with self._lock:
+            return list(self._manifiesto.values())
+
+    def reconstruir(self):
+        """Rehace el ZIP y el manifiesto desde los archivos del espacio de trabajo."""
+        with self._lock:
+            self._reconstruir()
+
+    # --- Internos (siempre con el lock tomado) ---
+
+    def _asegurar_consistente(self):
+        if self._danado:
+            self._reconstruir()
+        elif not self._fin and self.ruta_zip.exists():
+            # Hay un índice en disco que esta instancia no conoce (p. ej. tras reiniciar)
+            self._reconstruir()
+
+    def _iniciar(self):
+        """Crea el índice vacío del espacio de trabajo."""
+        self.ruta_zip.parent.mkdir(parents=True, exist_ok=True)
+        self.ruta_zip.write_bytes(b"")
+        self.ruta_manifiesto.write_text("", encoding="utf-8")
+
+    def _escribir_entrada(self, zipf: BinaryIO, ruta: Path, nombre: str) -> _Entrada:
+        nombre_b = nombre.encode("utf-8")
+        offset = zipf.tell()
+        hora, fecha = _fecha_dos(ruta.stat().st_mtime)
+        # Cabecera provisional: el CRC se conoce al terminar de copiar los datos
+        zipf.write(_CABECERA_LOCAL.pack(0x04034B50, 20, _UTF8, 0, hora, fecha, 0, 0, 0, len(nombre_b), 0))
+        zipf.write(nombre_b)
+        crc = 0
+        tamano = 0
+        with open(ruta, "rb") as origen:
+            while True:
+                bloque = origen.read(UPLOAD_CHUNK_SIZE)
+                if not bloque:
+                    break
+                crc = zlib.crc32(bloque, crc)
+                tamano += len(bloque)
+                zipf.write(bloque)
+        if tamano > _MAX_32:
+            raise ValueError(f"{nombre} supera el tamaño admitido en el archivo ZIP")
+        # La cabecera está después del último ZIP completo: reescribirla no afecta a los lectores
+        fin_datos = zipf.tell()
+        zipf.seek(offset)
+        zipf.write(_CABECERA_LOCAL.pack(0x04034B50, 20, _UTF8, 0, hora, fecha, crc, tamano, tamano, len(nombre_b), 0))
+        zipf.seek(fin_datos)
+        return _Entrada(offset, crc, tamano, hora, fecha)
+
+    def _completar(self):
+        self._asegurar_consistente()
+        if not self._pendiente:
+            return
+        try:
+            with open(self.ruta_zip, "r+b") as zipf:
+                zipf.truncate(self._fin)
+                zipf.seek(self._fin)
+                self._cerrar_zip(zipf)
+        except Exception:
+            self._danado = True
+            raise
+
+    def _cerrar_zip(self, zipf: BinaryIO):
+        """Escribe el directorio central al final y publica la nueva longitud."""
+        inicio = zipf.tell()
+        central = _directorio_central(self._entradas, inicio)
+        zipf.write(central)
+        zipf.flush()
+        if self._tamano:
+            # El directorio central anterior deja de usarse
+            self._muerto += self._tamano - self._inicio_central
+        self._inicio_central = inicio
+        self._tamano = self._fin = inicio + len(central)
+        self._pendiente = False
+
+    def _anotar(self, registro: dict):
+        with open(self.ruta_manifiesto, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def _compactar_si_conviene(self):
+        # Compactar cuesta lo mismo que reconstruir: solo cuando la mitad del archivo es espacio muerto
+        if self._muerto > 4 * UPLOAD_CHUNK_SIZE and self._muerto * 2 > self._fin:
+            try:
+                self._reconstruir()
+            except PermissionError:
+                # En Windows no se puede reemplazar un archivo abierto por una descarga en curso
+                pass
+
+    def _datos_anotados(self) -> Dict[str, dict]:
+        """Datos del manifiesto en disco (si existe), para conservarlos al reconstruir."""
+        datos: Dict[str, dict] = {}
+        if not self.ruta_manifiesto.exists():
+            return datos
+        with open(self.ruta_manifiesto, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    continue  # línea truncada por una escritura interrumpida
+                ruta = registro.pop("ruta", None)
+                if registro.pop("op", None) == "agregar":
+                    datos[ruta] = registro
+                else:
+                    datos.pop(ruta, None)
+        return datos
+
+    def _reconstruir(self):
+        anotados = {**self._datos_anotados(), **self._manifiesto}
+        self.ruta_zip.parent.mkdir(parents=True, exist_ok=True)
+        temporal_zip = self.ruta_zip.with_suffix(".tmp")
+        temporal_manifiesto = self.ruta_manifiesto.with_suffix(".tmp")
+        entradas: Dict[str, _Entrada] = {}
+        manifiesto: Dict[str, dict] = {}
+        with open(temporal_zip, "wb") as zipf, open(temporal_manifiesto, "w", encoding="utf-8") as man:
+            for root, dirs, files in os.walk(self.directorio):
+                dirs[:] = sorted(d for d in dirs if d != DIRECTORIO_INDICE)
+                for file in sorted(files):
+                    ruta = Path(root) / file
+                    nombre = ruta.relative_to(self.directorio).as_posix()
+                    entradas[nombre] = self._escribir_entrada(zipf, ruta, nombre)
+                    registro = {**anotados.get(nombre, {}), "ruta": nombre, "tamano": entradas[nombre].tamano}
+                    manifiesto[nombre] = registro
+                    man.write(json.dumps({"op": "agregar", **registro}, ensure_ascii=False) + "\n")
+            inicio = zipf.tell()
+            zipf.write(_directorio_central(entradas, inicio))
+            tamano = zipf.tell()
+        os.replace(temporal_zip, self.ruta_zip)
+        os.replace(temporal_manifiesto, self.ruta_manifiesto)
+        self._entradas = entradas
+        self._manifiesto = manifiesto
+        self._inicio_central = inicio
+        self._tamano = self._fin = tamano
+        self._pendiente = False
+        self._muerto = 0
+        self._danado = False
+
+class Instantanea:
+    """Contenido del ZIP en un momento dado; se lee por partes sin retener el lock."""
+    def __init__(self, archivo: Optional[BinaryIO], tamano: int):
+        self.archivo = archivo
+        self.tamano = tamano
+
+    def leer(self) -> Iterator[bytes]:
+        if self.archivo is None:
+            # Espacio de trabajo sin actas: ZIP vacío
+            yield _directorio_central({}, 0)
+            return
+        with self.archivo:
+            restante = self.tamano
+            while restante > 0:
+                bloque = self.archivo.read(min(UPLOAD_CHUNK_SIZE, restante))
+                if not bloque:
+                    break
+                restante -= len(bloque)
+                yield bloque
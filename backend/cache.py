@@ -0,0 +1,137 @@
+import re
+import time
+import types
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+
+from models import ActaMetadata
+
+def _actualizar_huella(h, valor):
+    """Agrega a la huella un valor de forma determinista entre ejecuciones."""
+    if isinstance(valor, types.CodeType):
+        h.update(valor.co_code)
+        h.update(repr(valor.co_names).encode())
+        for const in valor.co_consts:
+            _actualizar_huella(h, const)
+    elif isinstance(valor, (set, frozenset)):
+        # El orden de iteración de un set de str cambia entre procesos
+        h.update(repr(sorted(repr(v) for v in valor)).encode())
+    elif isinstance(valor, re.Pattern):
+        h.update(repr((valor.pattern, valor.flags)).encode())
+    else:
+        h.update(repr(valor).encode())
+
+def version_reglas(*modulos: types.ModuleType) -> str:
+    """
+    Calcula una huella de las reglas de parsing a partir del código de los módulos.
+    Cualquier cambio en funciones o constantes de las reglas (parser, extractor...) produce otra versión,
+    lo que invalida automáticamente la caché sin tener que recordarlo a mano.
+    Funciona también en el ejecutable de PyInstaller (no depende del .py fuente).
+    """
+    h = hashlib.sha256()
+    for modulo in modulos:
+        for nombre, valor in sorted(vars(modulo).items()):
+            if nombre.startswith("__"):
+                continue
+            if isinstance(valor, types.FunctionType):
+                if valor.__module__ == modulo.__name__:
+                    h.update(nombre.encode())
+                    _actualizar_huella(h, valor.__code__)
+            elif isinstance(valor, type):
+                if valor.__module__ == modulo.__name__:
+                    for atributo, miembro in sorted(vars(valor).items()):
+                        if isinstance(miembro, types.FunctionType):
+                            h.update(f"{nombre}.{atributo}".encode())
+                            _actualizar_huella(h, miembro.__code__)
+            elif nombre.startswith("_") and nombre.islower():
+                continue  # estado del proceso (p. ej. plantillas._registro_iniciado), no reglas
+            elif isinstance(valor, (str, int, float, tuple, list, dict, set, frozenset, re.Pattern)):
+                h.update(nombre.encode())
+                _actualizar_huella(h, valor)
+    return h.hexdigest()[:16]
+
+class ParseCache:
+    """
+    Caché persistente (SQLite) de ActaMetadata indexada por el SHA-256 del PDF
+    y la versión de las reglas del parser. Sobrevive a reinicios y se limita por tamaño,
+    descartando primero las entradas usadas hace más tiempo.
+    """
+    def __init__(self, ruta: Path, max_bytes: int, version: str):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.version = version
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(ruta), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parseos (
+                clave TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                tamano INTEGER NOT NULL,
+                ultimo_uso REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_parseos_uso ON parseos(ultimo_uso)")
+        with self._conn:
+            # Las entradas de otra versión de las reglas ya no son válidas
+            self._conn.execute("DELETE FROM parseos WHERE version != ?", (version,))
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(tamano), 0) FROM parseos").fetchone()[0]
+
+    def _clave(self, sha256: str, variante: str) -> str:
+        return f"{self.version}:{sha256}:{variante}"
+
+    def obtener(self, sha256: str, variante: str, nombre_original: str) -> Optional[ActaMetadata]:
+        """Devuelve la metadata guardada para ese contenido, o None si no está en caché."""
+        clave = self._clave(sha256, variante)
+        with self._lock:
+            fila = self._conn.execute("SELECT metadata FROM parseos WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            with self._conn:
+                self._conn.execute("UPDATE parseos SET ultimo_uso = ? WHERE clave = ?", (time.time(), clave))
+        metadata = ActaMetadata.model_validate_json(fila[0])
+        # El nombre original depende de la subida, no del contenido
+        metadata.archivo_original = nombre_original
+        return metadata
+
+    def guardar(self, sha256: str, variante: str, metadata: ActaMetadata):
+        """Guarda la metadata de un contenido y aplica el límite de tamaño."""
+        datos = metadata.model_dump_json()
+        tamano = len(datos)
+        clave = self._clave(sha256, variante)
+        with self._lock, self._conn:
+            anterior = self._conn.execute("SELECT tamano FROM parseos WHERE clave = ?", (clave,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parseos (clave, version, metadata, tamano, ultimo_uso) VALUES (?, ?, ?, ?, ?)",
+                (clave, self.version, datos, tamano, time.time())
+            )
+            self._total_bytes += tamano - (anterior[0] if anterior else 0)
+            if self._total_bytes > self.max_bytes:
+                self._desalojar()
+
+    def _desalojar(self):
+        """Elimina las entradas menos usadas hasta quedar en el 90% del límite."""
+        objetivo = int(self.max_bytes * 0.9)
+        filas = self._conn.execute("SELECT clave, tamano FROM parseos ORDER BY ultimo_uso").fetchall()
+        eliminar = []
+        for clave, tamano in filas:
+            if self._total_bytes <= objetivo:
+                break
+            eliminar.append((clave,))
+            self._total_bytes -= tamano
+        self._conn.executemany("DELETE FROM parseos WHERE clave = ?", eliminar)
+
+    def cerrar(self):
+        with self._lock:
+            self._conn.close()
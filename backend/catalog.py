@@ -0,0 +1,171 @@
+import re
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from models import ActaMetadata, CatalogoActa, CatalogoPagina, GradosFaltantes
+
+# Grados que debe tener cada nivel (INICIAL: edad en años)
+GRADOS_POR_NIVEL: Dict[str, Tuple[int, ...]] = {
+    "INICIAL": (3, 4, 5),
+    "PRIMARIA": (1, 2, 3, 4, 5, 6),
+    "SECUNDARIA": (1, 2, 3, 4, 5),
+}
+
+RE_GRADO_SECCION = re.compile(r'^(\d+)\D*\s+(\S+)')
+
+COLUMNAS = ("id", "sha256", "ruta", "trabajo", "archivo_original", "anio", "codigo_modular", "anexo",
+            "nombre_ie", "nivel", "grado_seccion", "grado", "seccion", "es_recuperacion",
+            "nuevo_nombre", "registrado")
+
+# Filtros admitidos por consultar(): parámetro -> columna
+FILTROS = ("anio", "codigo_modular", "nivel", "grado", "seccion", "es_recuperacion", "trabajo", "sha256")
+
+def separar_grado_seccion(grado_seccion: str) -> Tuple[Optional[int], Optional[str]]:
+    """'5to B' -> (5, 'B'); '4a U' -> (4, 'U')."""
+    m = RE_GRADO_SECCION.match(grado_seccion or "")
+    if not m:
+        return None, None
+    return int(m.group(1)), m.group(2)
+
+class Catalogo:
+    """
+    Catálogo persistente (SQLite) de las actas guardadas, una fila por contenido (SHA-256).
+    Las consultas usan solo los índices de la base: no recorren ActasProcesadas.
+    """
+    def __init__(self, ruta: Path):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(ruta), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS actas (
+                id INTEGER PRIMARY KEY,
+                sha256 TEXT NOT NULL UNIQUE,
+                ruta TEXT NOT NULL,
+                trabajo TEXT,
+                archivo_original TEXT NOT NULL,
+                anio TEXT NOT NULL,
+                codigo_modular TEXT NOT NULL,
+                anexo TEXT NOT NULL,
+                nombre_ie TEXT NOT NULL,
+                nivel TEXT NOT NULL,
+                grado_seccion TEXT NOT NULL,
+                grado INTEGER,
+                seccion TEXT,
+                es_recuperacion INTEGER NOT NULL,
+                nuevo_nombre TEXT,
+                registrado REAL NOT NULL
+            )
+        """)
+        # Las consultas habituales: por año/nivel/recuperación y por institución
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_actas_anio_nivel ON actas(anio, nivel, es_recuperacion, grado)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_actas_codigo ON actas(codigo_modular, anio, nivel, grado)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_actas_trabajo ON actas(trabajo)")
+        self._conn.commit()
+
+    def registrar(self, sha256: str, ruta: Path, metadata: ActaMetadata, trabajo: Optional[str] = None):
+        """Agrega o actualiza el acta con ese contenido (la última ubicación conocida)."""
+        grado, seccion = separar_grado_seccion(metadata.grado_seccion)
+        fila = (sha256, str(ruta), trabajo, metadata.archivo_original, metadata.anio, metadata.codigo_modular,
+                metadata.anexo, metadata.nombre_ie, metadata.nivel, metadata.grado_seccion, grado, seccion,
+                int(metadata.es_recuperacion), metadata.nuevo_nombre, time.time())
+        with self._lock, self._conn:
+            self._conn.execute(f"""
+                INSERT INTO actas ({", ".join(COLUMNAS[1:])}) VALUES ({", ".join("?" * (len(COLUMNAS) - 1))})
+                ON CONFLICT(sha256) DO UPDATE SET
+                    {", ".join(f"{c} = excluded.{c}" for c in COLUMNAS[2:])}
+            """, fila)
+
+    def ubicaciones(self, sha256s: List[str]) -> Dict[str, Path]:
+        """Última ruta conocida de cada contenido que está en el catálogo."""
+        encontradas: Dict[str, Path] = {}
+        unicos = list(dict.fromkeys(sha256s))
+        with self._lock:
+            # Por partes: SQLite limita la cantidad de parámetros de una consulta
+            for desde in range(0, len(unicos), 500):
+                parte = unicos[desde:desde + 500]
+                filas = self._conn.execute(
+                    f"SELECT sha256, ruta FROM actas WHERE sha256 IN ({', '.join('?' * len(parte))})", parte
+                ).fetchall()
+                encontradas.update((sha256, Path(ruta)) for sha256, ruta in filas)
+        return encontradas
+
+    def todas(self) -> List[CatalogoActa]:
+        """Todas las actas del catálogo, en orden de registro."""
+        with self._lock:
+            filas = self._conn.execute(f"SELECT {', '.join(COLUMNAS)} FROM actas ORDER BY id").fetchall()
+        return [CatalogoActa(**dict(zip(COLUMNAS, fila))) for fila in filas]
+
+    def consultar(self, pagina: int = 1, por_pagina: int = 100, **filtros) -> CatalogoPagina:
+        """Actas que cumplen los filtros (ver FILTROS), paginadas y en orden estable."""
+        condiciones, valores = [], []
+        for nombre in FILTROS:
+            valor = filtros.get(nombre)
+            if valor is not None:
+                condiciones.append(f"{nombre} = ?")
+                valores.append(int(valor) if isinstance(valor, bool) else valor)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM actas {donde}", valores).fetchone()[0]
+            filas = self._conn.execute(
+                f"SELECT {', '.join(COLUMNAS)} FROM actas {donde} "
+                "ORDER BY anio, codigo_modular, nivel, grado, seccion, id LIMIT ? OFFSET ?",
+                valores + [por_pagina, (pagina - 1) * por_pagina]
+            ).fetchall()
+        return CatalogoPagina(
+            total=total,
+            pagina=pagina,
+            por_pagina=por_pagina,
+            actas=[CatalogoActa(**dict(zip(COLUMNAS, fila))) for fila in filas]
+        )
+
+    def faltantes(self, codigo_modular: str, anio: Optional[str] = None,
+                  nivel: Optional[str] = None) -> List[GradosFaltantes]:
+        """
+        Grados sin acta regular (no de recuperación) para una institución, por año y nivel.
+        Sin año o nivel, se revisan los que tengan al menos un acta en el catálogo.
+        """
+        condiciones, valores = ["codigo_modular = ?", "es_recuperacion = 0"], [codigo_modular]
+        if anio is not None:
+            condiciones.append("anio = ?")
+            valores.append(anio)
+        if nivel is not None:
+            condiciones.append("nivel = ?")
+            valores.append(nivel)
+        with self._lock:
+            filas = self._conn.execute(
+                f"SELECT DISTINCT anio, nivel, grado FROM actas WHERE {' AND '.join(condiciones)}", valores
+            ).fetchall()
+        presentes: Dict[Tuple[str, str], set] = {}
+        for anio_fila, nivel_fila, grado in filas:
+            grados = presentes.setdefault((anio_fila, nivel_fila), set())
+            if grado is not None:
+                grados.add(grado)
+        if anio is not None and nivel is not None:
+            presentes.setdefault((anio, nivel), set())
+        elif anio is not None and not presentes:
+            # Año sin ninguna acta: faltan todos los grados de todos los niveles
+            for nivel_esperado in GRADOS_POR_NIVEL:
+                presentes[(anio, nivel_esperado)] = set()
+        resultado = []
+        for (anio_fila, nivel_fila), grados in sorted(presentes.items()):
+            esperados = GRADOS_POR_NIVEL.get(nivel_fila)
+            if esperados is None:
+                continue  # nivel DESCONOCIDO u otro sin grados definidos
+            resultado.append(GradosFaltantes(
+                anio=anio_fila,
+                nivel=nivel_fila,
+                presentes=sorted(grados),
+                faltantes=[g for g in esperados if g not in grados]
+            ))
+        return resultado
+
+    def cerrar(self):
+        with self._lock:
+            self._conn.close()
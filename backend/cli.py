@@ -0,0 +1,99 @@
+"""
+Procesamiento de carpetas locales por línea de comandos, sin navegador ni servidor.
+
+Uso:
+    python cli.py "D:/Actas 2024"
+    python cli.py "D:/Actas 2024" --destino "D:/Actas 2024 - Organizadas" --mover
+    python cli.py "D:/Exportaciones SIAGIE" --dividir
+
+Los PDF se leen en su lugar y se parsean en paralelo con el mismo motor que el servidor.
+Por defecto los originales quedan intactos y el destino se arma con hard links
+(sin copiar datos); con --mover los originales se trasladan a la estructura final.
+Con --dividir, los PDF consolidados (varias actas en un archivo) se separan en un PDF por acta.
+Los datos internos (caché, catálogo, staging, log) quedan en <destino>/.indice, junto al ZIP:
+ejecutar la CLI no deja archivos en la carpeta actual.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+from pathlib import Path
+
+# Carpeta de los datos internos dentro del destino (la misma que archive.DIRECTORIO_INDICE,
+# que no se importa aquí: archive carga config antes de tiempo)
+DIRECTORIO_INDICE = ".indice"
+
+def _destino_por_defecto(origen: Path) -> Path:
+    # Junto al origen: en el mismo disco, para que los hard links y renames sean posibles
+    return origen.parent / f"{origen.name} - Organizadas"
+
+def _configurar_entorno(destino: Path):
+    """
+    Lleva los datos internos del servicio a <destino>/.indice (la staging queda en el mismo
+    disco que el destino). config lee estas variables al importarse, así que se fijan antes
+    de importar log_config o service; los procesos del pool las heredan. Las variables que
+    el usuario ya definió se respetan.
+    """
+    indice = destino.absolute() / DIRECTORIO_INDICE
+    os.environ.setdefault("ACTAS_DATA_DIR", str(indice))
+    # Raíz de las sesiones del servidor: la CLI escribe en el destino, no la usa
+    os.environ.setdefault("ACTAS_STORAGE_DIR", str(indice / "sesiones"))
+    os.environ.setdefault("ACTAS_LOG_DIR", str(indice / "logs"))
+
+async def _ejecutar(origen: Path, destino: Path, mover: bool, workers: int, archivar: bool, dividir: bool) -> int:
+    from service import acta_service
+
+    if workers is not None:
+        acta_service.engine.workers = workers
+    destino.mkdir(parents=True, exist_ok=True)
+    trabajo = acta_service.trabajos.crear(directorio=destino, archivar=archivar, dividir=dividir)
+    inicio = time.perf_counter()
+    try:
+        total = await acta_service.agregar_ruta_a_trabajo(trabajo, origen, mover)
+        print(f"[*] {total} archivos PDF encontrados en {origen}")
+        while not trabajo.terminado:
+            await trabajo.esperar_cambio()
+        if trabajo.archivo is not None:
+            # El ZIP de <destino>/.indice queda completo (directorio central al final)
+            await asyncio.to_thread(trabajo.archivo.completar)
+    finally:
+        acta_service.cerrar()
+
+    resumen = trabajo.resumen()
+    segundos = time.perf_counter() - inicio
+    for resultado in resumen.resultados:
+        if resultado.estado in ("error", "conflicto"):
+            print(f"[!] {resultado.archivo}: {resultado.mensaje}")
+    print(f"[*] {resumen.exitosos} organizadas, {resumen.duplicados} duplicadas omitidas, {resumen.fallidos} con error, "
+          f"en {segundos:.1f} s ({resumen.porcentaje_extraccion_completa}% con extracción completa)")
+    print(f"[*] Destino: {destino.resolve()}")
+    return 0 if resumen.fallidos == 0 else 1
+
+def main(argv=None) -> int:
+    parser_args = argparse.ArgumentParser(description="Organiza una carpeta de actas en PDF.")
+    parser_args.add_argument("origen", type=Path, help="Carpeta con las actas (se recorre de forma recursiva)")
+    parser_args.add_argument("--destino", type=Path, help="Carpeta de salida (por defecto, '<origen> - Organizadas')")
+    parser_args.add_argument("--mover", action="store_true", help="Mover los originales en lugar de enlazarlos")
+    parser_args.add_argument("--workers", type=int, help="Procesos de parsing (por defecto, uno por núcleo)")
+    parser_args.add_argument("--dividir", action="store_true", help="Separar los PDF con varias actas en un archivo por acta")
+    parser_args.add_argument("--zip", action="store_true", help="Mantener también el ZIP y el manifiesto en <destino>/.indice")
+    args = parser_args.parse_args(argv)
+
+    origen = args.origen.expanduser()
+    if not origen.is_dir():
+        print(f"[!] La carpeta no existe: {origen}")
+        return 2
+    destino = (args.destino or _destino_por_defecto(origen)).expanduser()
+    _configurar_entorno(destino)
+
+    from log_config import configurar_logging
+    # El detalle por archivo va solo al log; en consola, el resumen de abajo y los errores graves
+    configurar_logging(nivel_consola="ERROR")
+    return asyncio.run(_ejecutar(origen, destino, args.mover, args.workers, args.zip, args.dividir))
+
+if __name__ == "__main__":
+    # Necesario para que los procesos del pool de parsing arranquen en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
+    sys.exit(main())
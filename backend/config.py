@@ -0,0 +1,96 @@
+import os
+import logging
+from pathlib import Path
+from utils import get_executable_dir
+
+logger = logging.getLogger(__name__)
+
+def _entero_env(nombre: str, defecto: int) -> int:
+    """Lee un entero desde una variable de entorno, usando el valor por defecto si no es válido."""
+    valor = os.environ.get(nombre)
+    if valor is None or not valor.strip():
+        return defecto
+    try:
+        return int(valor)
+    except ValueError:
+        logger.warning("%s=%r no es un entero, se usa %s", nombre, valor, defecto)
+        return defecto
+
+# Número de procesos dedicados al parsing de PDFs (pdfplumber es intensivo en CPU).
+# 0 = parsear en un hilo del proceso principal (útil para depuración).
+PARSE_WORKERS = max(0, _entero_env("ACTAS_WORKERS", os.cpu_count() or 1))
+
+# Carpeta de las actas organizadas (un espacio de trabajo por sesión)
+STORAGE_ROOT = Path(os.environ.get("ACTAS_STORAGE_DIR", "ActasProcesadas"))
+
+# Carpeta de datos internos del sistema (temporales, caché, índices).
+# Debe estar en el mismo disco que ActasProcesadas para que mover archivos sea un rename atómico.
+DATA_ROOT = Path(os.environ.get("ACTAS_DATA_DIR", ".gestion_actas"))
+STAGING_ROOT = DATA_ROOT / "staging"
+# Archivos parciales de las subidas reanudables, por trabajo
+SUBIDAS_ROOT = STAGING_ROOT / "subidas"
+
+# Carpetas locales que /procesar-ruta puede leer (y mover), separadas por os.pathsep.
+# Por defecto, la carpeta del usuario y la del ejecutable; ACTAS_RUTAS_PERMITIDAS las reemplaza
+# (p. ej. "D:\\Actas;E:\\" en Windows). La CLI no tiene esta restricción.
+RUTAS_PERMITIDAS = [Path(r).expanduser() for r in os.environ.get("ACTAS_RUTAS_PERMITIDAS", "").split(os.pathsep)
+                    if r.strip()] or [Path.home(), get_executable_dir()]
+
+# Tamaño de bloque al volcar subidas a disco (bytes)
+UPLOAD_CHUNK_SIZE = max(64 * 1024, _entero_env("ACTAS_UPLOAD_CHUNK", 1024 * 1024))
+
+# Tamaño máximo de cada parte de una subida reanudable (MB): se lee entera en memoria
+# (una parte más larga se corta apenas lo supera, sin leer el resto)
+SUBIDA_MAX_PARTE = max(1, _entero_env("ACTAS_SUBIDA_PARTE_MB", 8)) * 1024 * 1024
+
+# Caché de resultados de parsing por contenido (SHA-256 del PDF)
+CACHE_PATH = DATA_ROOT / "cache_parsing.sqlite3"
+# Tamaño máximo de la caché en MB (0 = desactivada)
+CACHE_MAX_BYTES = max(0, _entero_env("ACTAS_CACHE_MB", 64)) * 1024 * 1024
+
+# Plantillas de diseño aprendidas: regiones de año, grado y sección por diseño de acta (1 = activo)
+USAR_PLANTILLAS = _entero_env("ACTAS_PLANTILLAS", 1) != 0
+PLANTILLAS_PATH = DATA_ROOT / "plantillas.sqlite3"
+
+# Instantáneas de la extracción de cada acta: reparsear tras cambiar las reglas sin leer los PDF
+EXTRACCIONES_PATH = DATA_ROOT / "extracciones.sqlite3"
+
+# Catálogo consultable de todas las actas guardadas (año, institución, nivel, grado...)
+CATALOG_PATH = DATA_ROOT / "catalogo.sqlite3"
+
+# Control de admisión: archivos y MB recibidos y aún sin terminar, en todo el servidor.
+# Las subidas que no caben esperan hasta ACTAS_ESPERA_ADMISION segundos y luego reciben
+# 429 con Retry-After; las carpetas locales esperan su turno sin rechazo.
+MAX_ARCHIVOS_EN_CURSO = max(1, _entero_env("ACTAS_MAX_ARCHIVOS", 500))
+MAX_BYTES_EN_CURSO = max(1, _entero_env("ACTAS_MAX_MB", 1024)) * 1024 * 1024
+ESPERA_ADMISION = max(0, _entero_env("ACTAS_ESPERA_ADMISION", 30))
+REINTENTAR_EN = max(1, _entero_env("ACTAS_REINTENTAR_EN", 5))
+
+# Tareas enviadas a la vez al pool de parsing (0 = el doble de los workers).
+# El resto espera en el event loop, sin acumular trabajo en la cola del pool.
+MAX_PARSEOS = max(0, _entero_env("ACTAS_MAX_PARSEOS", 0)) or 2 * max(1, PARSE_WORKERS)
+
+# Escritura de las actas en su carpeta final (ver writer.py): sincronizar con el disco antes
+# de renombrar (1 = activo). 0 = más rápido, pero un corte de luz puede dejar actas vacías.
+SINCRONIZAR_ESCRITURA = _entero_env("ACTAS_FSYNC", 1) != 0
+# Actas por lote de escritura (comparten un fsync por carpeta) y espera máxima para juntarlas (ms)
+ESCRITURA_LOTE = max(1, _entero_env("ACTAS_ESCRITURA_LOTE", 32))
+ESCRITURA_ESPERA_MS = max(0, _entero_env("ACTAS_ESCRITURA_ESPERA_MS", 10))
+
+# Modo rápido: leer primero solo el texto del encabezado y usar la extracción
+# geométrica completa únicamente si faltan nivel, grado o sección (1 = activo)
+FAST_HEADER_MODE = _entero_env("ACTAS_MODO_RAPIDO", 1) != 0
+
+# Arrancar el pool de parsing en segundo plano al iniciar el servidor (1 = activo).
+# 0 = los workers se lanzan con el primer lote (menos memoria si la app queda abierta sin uso).
+PRECALENTAR_WORKERS = _entero_env("ACTAS_PRECALENTAR", 1) != 0
+
+# Incluir en cada ProcessResult los milisegundos por etapa (1 = activo).
+# Las métricas agregadas están siempre disponibles en /metrics.
+TIEMPOS_EN_RESPUESTA = _entero_env("ACTAS_TIEMPOS", 1) != 0
+
+# Registro de eventos: archivo rotativo junto al ejecutable (visible aunque no haya consola)
+LOG_DIR = Path(os.environ.get("ACTAS_LOG_DIR", get_executable_dir() / "logs"))
+LOG_LEVEL = os.environ.get("ACTAS_LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = max(64 * 1024, _entero_env("ACTAS_LOG_MB", 5) * 1024 * 1024)
+LOG_BACKUPS = 5
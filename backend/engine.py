@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from config import PARSE_WORKERS, FAST_HEADER_MODE, MAX_PARSEOS
+from models import ActaMetadata
+from parser import ParsingError
+from metrics import medir_etapas
+from plantillas import medir_plantillas
+from extracciones import capturar, codificar
+
+def _inicializar_worker():
+    """
+    Se ejecuta una vez al arrancar cada proceso del pool.
+    Importa pdfplumber de antemano para que el primer PDF no pague el costo de carga.
+    """
+    import pdfplumber  # noqa: F401
+    import pypdfium2  # noqa: F401
+    import parser  # noqa: F401
+
+def _parsear_en_worker(ruta_pdf: str, nombre_original: str,
+                       rapido: bool) -> Tuple[ActaMetadata, bool, Dict[str, float], list, bytes]:
+    """
+    Punto de entrada dentro del proceso worker (debe ser picklable: nivel de módulo).
+    Recibe la ruta del archivo en staging, no sus bytes, para no copiarlos entre procesos.
+    Retorna: (metadata, usó_extracción_completa, segundos_por_etapa, usos_de_plantilla,
+              instantánea de la extracción)
+    """
+    from parser import parsear_acta_completo, parsear_acta_rapido
+    with medir_etapas() as tiempos, medir_plantillas() as usos, capturar() as extraccion, \
+            open(ruta_pdf, "rb") as pdf_file:
+        if rapido:
+            metadata, completa = parsear_acta_rapido(pdf_file, nombre_original)
+        else:
+            metadata, completa = parsear_acta_completo(pdf_file, nombre_original)
+    return metadata, completa, tiempos, usos, codificar(extraccion)
+
+class ParsingEngine:
+    """
+    Motor de parsing respaldado por un pool de procesos.
+    Mantiene libre el event loop de uvicorn mientras pdfplumber trabaja
+    y reparte los archivos de un lote entre los núcleos disponibles.
+    """
+    def __init__(self, workers: int = PARSE_WORKERS, rapido: bool = FAST_HEADER_MODE,
+                 max_en_curso: int = MAX_PARSEOS):
+        self.workers = workers
+        self.rapido = rapido
+        self.max_en_curso = max_en_curso
+        self.en_curso = 0
+        self.en_espera = 0
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._limite: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+    def _semaforo(self) -> asyncio.Semaphore:
+        # Uno por event loop (la CLI y los tests pueden crear más de uno en el mismo proceso)
+        loop = asyncio.get_running_loop()
+        if self._limite is None or self._limite[0] is not loop:
+            self._limite = (loop, asyncio.Semaphore(self.max_en_curso))
+        return self._limite[1]
+
+    def _obtener_executor(self) -> Executor:
+        # El pool se crea de forma perezosa: importar el servicio no lanza procesos
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    # "spawn" en todas las plataformas: mismo comportamiento que en Windows
+                    # y evita heredar hilos del servidor al hacer fork
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_inicializar_worker,
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parser")
+            return self._executor
+
+    async def parsear(self, ruta_pdf: Path, nombre_original: str) -> Tuple[ActaMetadata, bool, Dict[str, float], list, bytes]:
+        """
+        Parsea un PDF (ya guardado en disco) en el pool sin bloquear el event loop.
+        Retorna: (metadata, usó_extracción_completa, segundos_por_etapa, usos_de_plantilla,
+                  instantánea de la extracción)
+        """
+        return await self.ejecutar(_parsear_en_worker, str(ruta_pdf), nombre_original, self.rapido)
+
+    async def ejecutar(self, funcion: Callable, *args):
+        """
+        Ejecuta una función de nivel de módulo (picklable) en el pool y espera su resultado.
+        Como máximo `max_en_curso` tareas a la vez: las demás esperan aquí su turno.
+        """
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforo()
+        self.en_espera += 1
+        try:
+            await semaforo.acquire()
+        finally:
+            self.en_espera -= 1
+        self.en_curso += 1
+        executor = self._obtener_executor()
+        try:
+            return await loop.run_in_executor(executor, funcion, *args)
+        except BrokenProcessPool:
+            # Un worker murió (PDF corrupto que tumba la librería nativa, falta de memoria...).
+            # Se descarta el pool para que el siguiente archivo arranque uno nuevo.
+            self._descartar_executor(executor)
+            raise ParsingError("El proceso de lectura del PDF terminó inesperadamente.")
+        finally:
+            self.en_curso -= 1
+            semaforo.release()
+
+    def calentar(self):
+        """
+        Arranca los workers en segundo plano (sin esperar) para que importen pdfplumber
+        mientras el usuario elige los archivos, en lugar de hacerlo con el primer PDF.
+        """
+        executor = self._obtener_executor()
+        for _ in range(max(1, self.workers)):
+            # Cada tarea sin worker libre lanza un proceso nuevo (con spawn se crean a demanda)
+            executor.submit(_inicializar_worker)
+
+    def _descartar_executor(self, executor: Executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def cerrar(self):
+        """Detiene los procesos del pool (al apagar el servidor)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
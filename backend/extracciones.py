@@ -0,0 +1,165 @@
+"""
+Instantáneas de la extracción de cada acta, para volver a aplicar las reglas sin leer el PDF.
+
+Al parsear un acta se conserva lo que las reglas de parser.py leyeron de ella: el texto del
+encabezado (pdfium), los valores de las regiones de su plantilla y, si hubo extracción
+completa, las palabras con coordenadas de pdfplumber. Cuando cambian las reglas (la sección
+ÚNICA, el nombre de la IE, los códigos conocidos...), reparsear el archivo entero solo
+reinterpreta estas instantáneas: unos milisegundos por acta en lugar de volver a extraer.
+
+Formato (compacto, en columnas): las coordenadas van en arrays de doubles (las mismas que
+usa WordIndex, sin redondeo) y los textos de las palabras en una sola cadena; todo comprimido
+con zlib. Se guardan en SQLite por SHA-256 del acta, como el catálogo.
+"""
+import json
+import time
+import zlib
+import struct
+import sqlite3
+import threading
+from array import array
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Versión del formato: las instantáneas de otro formato se ignoran (el acta se vuelve a extraer)
+FORMATO = 1
+# Separador de los textos de las palabras (no aparece en el texto de un PDF)
+SEPARADOR = "\x1f"
+# Coordenadas que usan las reglas y las plantillas, en el orden en que se guardan
+COORDENADAS = ("x0", "x1", "top", "bottom")
+
+_CABECERA = struct.Struct("<BBI")  # formato, banderas, cantidad de palabras
+_LONGITUD = struct.Struct("<I")
+_DIVISION, _CON_PALABRAS, _CON_VALORES = 1, 2, 4
+
+class InstantaneaInvalida(Exception):
+    """Los datos no son una instantánea de este formato."""
+
+@dataclass
+class Extraccion:
+    """Lo extraído de la página que inicia un acta, tal como lo recibieron las reglas."""
+    encabezado: str = ""  # texto de la mitad superior (pasada rápida)
+    valores: Optional[Dict[str, str]] = None  # búsqueda -> texto de su región (plantilla)
+    palabras: Optional[list] = None  # palabras de pdfplumber (extracción completa)
+    division: bool = False  # acta separada de un PDF consolidado (título de recuperación)
+
+def _seccion(datos: bytes) -> bytes:
+    return _LONGITUD.pack(len(datos)) + datos
+
+def codificar(extraccion: Extraccion) -> bytes:
+    """Instantánea comprimida de una extracción (ver el formato al inicio del módulo)."""
+    palabras = extraccion.palabras or []
+    banderas = ((_DIVISION if extraccion.division else 0)
+                | (_CON_PALABRAS if extraccion.palabras is not None else 0)
+                | (_CON_VALORES if extraccion.valores is not None else 0))
+    partes = [
+        _CABECERA.pack(FORMATO, banderas, len(palabras)),
+        _seccion(extraccion.encabezado.encode("utf-8")),
+        _seccion(json.dumps(extraccion.valores or {}, ensure_ascii=False).encode("utf-8")),
+        _seccion(SEPARADOR.join(p['text'] for p in palabras).encode("utf-8")),
+    ]
+    for coordenada in COORDENADAS:
+        partes.append(array('d', (p[coordenada] for p in palabras)).tobytes())
+    return zlib.compress(b"".join(partes))
+
+def decodificar(datos: bytes) -> Extraccion:
+    """Lanza InstantaneaInvalida si los datos están dañados o son de otro formato."""
+    try:
+        crudo = zlib.decompress(datos)
+        formato, banderas, cantidad = _CABECERA.unpack_from(crudo)
+        if formato != FORMATO:
+            raise InstantaneaInvalida(f"formato {formato}")
+        posicion = _CABECERA.size
+        secciones = []
+        for _ in range(3):
+            longitud, = _LONGITUD.unpack_from(crudo, posicion)
+            posicion += _LONGITUD.size
+            secciones.append(crudo[posicion:posicion + longitud].decode("utf-8"))
+            posicion += longitud
+        columnas = []
+        for _ in COORDENADAS:
+            columna = array('d')
+            columna.frombytes(crudo[posicion:posicion + 8 * cantidad])
+            posicion += 8 * cantidad
+            columnas.append(columna)
+    except (zlib.error, struct.error, UnicodeDecodeError, ValueError) as e:
+        raise InstantaneaInvalida(str(e))
+    encabezado, valores, textos = secciones
+    palabras = None
+    if banderas & _CON_PALABRAS:
+        textos = textos.split(SEPARADOR) if cantidad else []
+        if len(textos) != cantidad or any(len(c) != cantidad for c in columnas):
+            raise InstantaneaInvalida("columnas de distinta longitud")
+        palabras = [{"text": texto, **dict(zip(COORDENADAS, coordenadas))}
+                    for texto, *coordenadas in zip(textos, *columnas)]
+    return Extraccion(
+        encabezado=encabezado,
+        valores=json.loads(valores) if banderas & _CON_VALORES else None,
+        palabras=palabras,
+        division=bool(banderas & _DIVISION)
+    )
+
+# Extracción del acta en curso, como los tiempos de metrics.medir_etapas
+_actual: ContextVar[Optional[Extraccion]] = ContextVar("extraccion_actual", default=None)
+
+@contextmanager
+def capturar(division: bool = False):
+    """Activa la captura de lo que extrae el parser en el bloque. Retorna la Extraccion."""
+    extraccion = Extraccion(division=division)
+    token = _actual.set(extraccion)
+    try:
+        yield extraccion
+    finally:
+        _actual.reset(token)
+
+def anotar(**campos):
+    """Registra en la extracción en curso (si se está capturando) lo que se leyó del PDF."""
+    extraccion = _actual.get()
+    if extraccion is not None:
+        for nombre, valor in campos.items():
+            setattr(extraccion, nombre, valor)
+
+class RegistroExtracciones:
+    """Instantáneas por contenido (SHA-256 del acta), en SQLite. Se conservan entre reinicios."""
+    def __init__(self, ruta: Path):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(ruta), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS extracciones (
+                sha256 TEXT PRIMARY KEY,
+                datos BLOB NOT NULL,
+                registrada REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def guardar(self, sha256: str, datos: bytes):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO extracciones (sha256, datos, registrada) VALUES (?, ?, ?)",
+                               (sha256, datos, time.time()))
+
+    def obtener(self, sha256s: List[str]) -> Dict[str, bytes]:
+        """Instantáneas guardadas de esos contenidos (los que no tienen, no aparecen)."""
+        encontradas: Dict[str, bytes] = {}
+        unicos = list(dict.fromkeys(sha256s))
+        with self._lock:
+            # Por partes: SQLite limita la cantidad de parámetros de una consulta
+            for desde in range(0, len(unicos), 500):
+                parte = unicos[desde:desde + 500]
+                filas = self._conn.execute(
+                    f"SELECT sha256, datos FROM extracciones WHERE sha256 IN ({', '.join('?' * len(parte))})", parte
+                ).fetchall()
+                encontradas.update(filas)
+        return encontradas
+
+    def cerrar(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,180 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+# --- Tabla de reglas precompiladas ---
+# Reglas de "primera coincidencia". Las de alcance "texto" no cruzan saltos de línea,
+# así que se evalúan con una sola búsqueda sobre todo el texto. Las de alcance "línea"
+# se evalúan en la pasada por las líneas con etiquetas y dejan de evaluarse al encontrar
+# su valor; la clave es un filtro barato que evita ejecutar el regex en otras líneas.
+
+@dataclass(frozen=True)
+class _Regla:
+    campo: str
+    clave: Optional[str]
+    patron: re.Pattern
+    grupo: int
+
+REGLAS_TEXTO = (
+    # 1. Año
+    _Regla("anio", None, re.compile(r'20(23|24|25)'), 0),
+)
+
+REGLAS_LINEA = (
+    # 2. Código Modular con su etiqueta
+    _Regla("codigo_modular", "MODULAR", re.compile(r'(?:C[ÓO]DIGO\s+MODULAR|MODULAR).*?(\d{7})'), 1),
+)
+
+# Respaldo del código modular (solo si no hubo etiqueta): el primer número de 7 dígitos
+RE_SIETE_DIGITOS = re.compile(r'(\d{7})')
+
+# Etiquetas que marcan las únicas líneas donde hay campos de alcance "línea"
+CLAVES_LINEA = ("MODULAR", "GRADO", "SECCI", "Y/O")
+
+NIVELES = ("INICIAL", "PRIMARIA", "SECUNDARIA")  # en orden de prioridad
+
+RE_GRADO = re.compile(r'GRADO(?:\s*\(5\))?[:\s]*(\w+)')
+RE_SECCION = re.compile(r'SECCI[ÓO]N.*?(?:[:\s]|\(8\))(?:\s*)([A-Z0-9]+|ÚNICA|UNICA)\b')
+RE_DIGITO = re.compile(r'\d')
+SECCIONES_EXCLUIDAS = ("P", "S", "M", "T", "EBR")
+
+CODIGOS_CONOCIDOS = ("0227900", "0239905", "1155530", "0478032")
+NOMBRE_IE_CONOCIDO = "27 SANTA LUCIA FE Y ALEGRIA"
+
+RE_ESPACIOS = re.compile(r'\s+')
+RE_IE_NUMERICO = re.compile(r'(?:NUMERO|NÚMERO)\s+Y/O\s+NOMBRE\s+[:\.]?\s*(\d+)')
+RE_NOMBRE = re.compile(r'NOMBRE')
+RE_PALABRA_PARADA = re.compile("|".join(re.escape(p) for p in (
+    "CODIGO", "CÓDIGO", "MODULAR", "UGEL", "DRE", "PERIODO", "PERÍODO",
+    "ANEXO", "FORMA", "ESC", "CARACTERISTICA", "TURNO"
+)))
+RE_PREFIJO_NOMBRE = re.compile(r'^[:\-\.\s]+')
+
+# Comparación literal heredada: "Recuperación" aparece como encabezado de columna también
+# en las actas regulares, así que buscarlo como texto marcaría todas las actas como REC.
+MARCA_RECUPERACION = "RECUPERACI[ÓO]N"
+
+@dataclass
+class CamposTexto:
+    """Valores encontrados en el texto del acta (None si no aparecen)."""
+    anio: Optional[str] = None
+    codigo_modular: Optional[str] = None
+    primer_codigo: Optional[str] = None
+    nivel: Optional[str] = None
+    grado: Optional[str] = None
+    grado_estricto: Optional[str] = None  # primera coincidencia que contiene un número
+    seccion: Optional[str] = None
+    seccion_estricta: Optional[str] = None  # primera coincidencia inequívoca (letra o ÚNICA)
+    codigo_conocido: bool = False
+    menciona_santa_lucia: bool = False
+    menciona_alegria: bool = False
+    nombre_ie: Optional[str] = None
+    recuperacion: bool = False
+
+def seccion_valida(candidato: str) -> bool:
+    """En la pasada rápida solo se aceptan secciones inequívocas: una letra o ÚNICA."""
+    return candidato in ("U", "UNICA") or (len(candidato) == 1 and candidato.isalpha())
+
+def _nombre_ie_en_linea(linea: str) -> Optional[str]:
+    """Nombre de la IE en una línea "Número y/o Nombre ...", o None si no se puede leer."""
+    linea_limpia = RE_ESPACIOS.sub(' ', linea)
+    if "NUMERO Y/O NOMBRE" not in linea_limpia and "NÚMERO Y/O NOMBRE" not in linea_limpia:
+        return None
+    # Intento 1: Buscar dígitos explícitos si el nombre es numérico
+    match_num = RE_IE_NUMERICO.search(linea_limpia)
+    if match_num:
+        return match_num.group(1)
+    # Intento 2: Lo que sigue a la última "NOMBRE", cortado en la primera palabra de parada
+    partes = RE_NOMBRE.split(linea_limpia)
+    if len(partes) > 1:
+        posible_nombre = partes[-1].strip()
+        parada = RE_PALABRA_PARADA.search(posible_nombre)
+        if parada:
+            posible_nombre = posible_nombre[:parada.start()].strip()
+        posible_nombre = RE_PREFIJO_NOMBRE.sub('', posible_nombre)
+        # Permitir nombres numéricos cortos o nombres largos
+        if len(posible_nombre) >= 3:
+            return posible_nombre
+    return None
+
+def _lineas_con_etiqueta(texto: str) -> List[str]:
+    """
+    Líneas (en orden) que contienen alguna de CLAVES_LINEA. Usa str.find sobre el texto
+    completo, que es mucho más rápido que recorrer todas las líneas en Python.
+    """
+    inicios = set()
+    for clave in CLAVES_LINEA:
+        pos = texto.find(clave)
+        while pos != -1:
+            inicios.add(texto.rfind('\n', 0, pos) + 1)
+            fin = texto.find('\n', pos)
+            if fin == -1:
+                break
+            pos = texto.find(clave, fin)
+    lineas = []
+    for inicio in sorted(inicios):
+        fin = texto.find('\n', inicio)
+        lineas.append(texto[inicio:] if fin == -1 else texto[inicio:fin])
+    return lineas
+
+def extraer_campos(texto_upper: str) -> CamposTexto:
+    """
+    Obtiene todos los campos textuales del acta (año, código modular, nivel, grado,
+    sección, nombre de la IE y marca de recuperación) con una sola pasada sobre las
+    líneas que tienen etiquetas. Cada campo conserva la primera coincidencia en orden
+    de lectura, igual que las búsquedas independientes a las que reemplaza.
+    """
+    campos = CamposTexto(recuperacion=MARCA_RECUPERACION in texto_upper)
+
+    # Reglas de texto completo y presencia de palabras: búsquedas en C, sin recorrer líneas
+    for regla in REGLAS_TEXTO:
+        m = regla.patron.search(texto_upper)
+        if m:
+            setattr(campos, regla.campo, m.group(regla.grupo))
+    for nivel in NIVELES:
+        if nivel in texto_upper:
+            campos.nivel = nivel
+            break
+    campos.codigo_conocido = any(codigo in texto_upper for codigo in CODIGOS_CONOCIDOS)
+    campos.menciona_santa_lucia = "SANTA LUCIA" in texto_upper
+    campos.menciona_alegria = "ALEGRIA" in texto_upper
+
+    # Pasada única por las líneas con etiquetas
+    pendientes = list(REGLAS_LINEA)
+    for linea in _lineas_con_etiqueta(texto_upper):
+        for regla in tuple(pendientes):
+            if regla.clave in linea:
+                m = regla.patron.search(linea)
+                if m:
+                    setattr(campos, regla.campo, m.group(regla.grupo))
+                    pendientes.remove(regla)
+
+        if campos.grado_estricto is None and "GRADO" in linea:
+            m = RE_GRADO.search(linea)
+            if m:
+                valor = m.group(1).strip()
+                if campos.grado is None:
+                    campos.grado = valor
+                if RE_DIGITO.search(valor):
+                    campos.grado_estricto = valor
+
+        if campos.seccion_estricta is None and "SECCI" in linea:
+            m = RE_SECCION.search(linea)
+            if m:
+                candidato = m.group(1).strip().upper().replace('Ú', 'U')
+                # Verificar que NO sea "P", "S", "M", "T"
+                if candidato not in SECCIONES_EXCLUIDAS:
+                    if campos.seccion is None:
+                        campos.seccion = candidato
+                    if seccion_valida(candidato):
+                        campos.seccion_estricta = candidato
+
+        if campos.nombre_ie is None and "Y/O" in linea:
+            campos.nombre_ie = _nombre_ie_en_linea(linea)
+
+    if campos.codigo_modular is None:
+        m = RE_SIETE_DIGITOS.search(texto_upper)
+        if m:
+            campos.primer_codigo = m.group(1)
+
+    return campos
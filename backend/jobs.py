@@ -0,0 +1,198 @@
+import json
+import time
+import uuid
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from archive import ArchivoIncremental
+from models import ProcessResult, BatchProcessResponse, JobStatusResponse
+from uploads import SubidaReanudable
+
+# Estados de un ProcessResult en los que el acta quedó guardada
+ESTADOS_GUARDADOS = ("exito", "conflicto")
+
+def _contar(resultados) -> Dict[str, int]:
+    cuentas = {"exitosos": 0, "fallidos": 0, "duplicados": 0, "conflictos": 0}
+    for r in resultados:
+        if r.estado in ESTADOS_GUARDADOS:
+            cuentas["exitosos"] += 1
+        elif r.estado == "duplicado":
+            cuentas["duplicados"] += 1
+        else:
+            cuentas["fallidos"] += 1
+        if r.estado == "conflicto":
+            cuentas["conflictos"] += 1
+    return cuentas
+
+def resumir_lote(resultados: List[ProcessResult]) -> BatchProcessResponse:
+    """Construye la respuesta resumida (contadores y estadísticas) de un conjunto de resultados."""
+    completas = sum(1 for r in resultados if r.modo_extraccion == "completa")
+    duraciones = [r.duracion_ms for r in resultados if r.duracion_ms is not None]
+    return BatchProcessResponse(
+        resultados=list(resultados),
+        total_procesados=len(resultados),
+        **_contar(resultados),
+        extracciones_completas=completas,
+        porcentaje_extraccion_completa=round(100 * completas / len(resultados), 1) if resultados else 0.0,
+        duracion_media_ms=round(sum(duraciones) / len(duraciones), 1) if duraciones else 0.0
+    )
+
+class Job:
+    """
+    Trabajo (sesión) de procesamiento. Los archivos pueden llegar en varias subidas,
+    incluso en paralelo, y todos se organizan en el mismo espacio de trabajo.
+    Cada resultado queda registrado en orden de finalización para que los clientes
+    (SSE) lo reciban apenas termina, y puedan reconectarse sin perder filas.
+    """
+    def __init__(self, raiz: Path, total: Optional[int] = None,
+                 directorio: Optional[Path] = None, archivar: bool = True, dividir: bool = False):
+        self.id = uuid.uuid4().hex[:12]
+        # Espacio de trabajo propio dentro de ActasProcesadas (o la carpeta indicada, desde la CLI)
+        self.directorio = directorio or raiz / self.id
+        # ZIP y manifiesto listos para descargar
+        self.archivo = ArchivoIncremental(self.directorio) if archivar else None
+        # Separar los PDF consolidados en un archivo por acta (ver splitter.py)
+        self.dividir = dividir
+        self.creado = time.time()
+        self.total = total
+        self.recibidos = 0
+        self.resultados: Dict[int, ProcessResult] = {}  # índice de llegada -> resultado
+        self.orden_finalizacion: List[int] = []
+        self._cambio = asyncio.Event()
+        # Índice del espacio de trabajo: contenido ya recibido (SHA-256 -> nombre del archivo)
+        # y rutas de destino ocupadas (ruta -> SHA-256 del acta guardada allí)
+        self.contenidos: Dict[str, str] = {}
+        self.destinos: Dict[Path, str] = {}
+        # Subidas reanudables en curso y archivos ya agregados sin subida multipart,
+        # por (SHA-256, nombre): reintentar una entrega no agrega el archivo dos veces
+        self.subidas: Dict[Tuple[str, str], SubidaReanudable] = {}
+        self.entregados: Set[Tuple[str, str]] = set()
+
+    def reservar(self, cantidad: int) -> range:
+        """Reserva índices para archivos recién recibidos."""
+        indices = range(self.recibidos, self.recibidos + cantidad)
+        self.recibidos += cantidad
+        if self.total is None or self.recibidos > self.total:
+            self.total = self.recibidos
+        return indices
+
+    def reclamar_contenido(self, sha256: str, nombre: str) -> Optional[str]:
+        """
+        Registra el contenido de un archivo recibido. Si ya llegó otro con el mismo
+        contenido en este trabajo, no registra nada y retorna el nombre de ese archivo.
+        """
+        anterior = self.contenidos.get(sha256)
+        if anterior is None:
+            self.contenidos[sha256] = nombre
+        return anterior
+
+    def liberar_contenido(self, sha256: str):
+        """Olvida un contenido cuyo procesamiento falló (una nueva subida se vuelve a intentar)."""
+        self.contenidos.pop(sha256, None)
+
+    def registrar(self, indice: int, resultado: ProcessResult):
+        """Guarda el resultado de un archivo y despierta a los clientes en espera."""
+        self.resultados[indice] = resultado
+        self.orden_finalizacion.append(indice)
+        self._notificar()
+
+    def _notificar(self):
+        self._cambio.set()
+        self._cambio = asyncio.Event()
+
+    async def esperar_cambio(self):
+        """Espera hasta el próximo resultado registrado."""
+        await self._cambio.wait()
+
+    @property
+    def procesados(self) -> int:
+        return len(self.orden_finalizacion)
+
+    @property
+    def terminado(self) -> bool:
+        return self.total is not None and self.procesados >= self.total
+
+    def resumen(self) -> BatchProcessResponse:
+        """Resumen de lo procesado hasta ahora, en orden de llegada de los archivos."""
+        return resumir_lote([self.resultados[i] for i in sorted(self.resultados)])
+
+    def estado(self) -> JobStatusResponse:
+        return JobStatusResponse(
+            trabajo_id=self.id,
+            estado="completado" if self.terminado else "en_proceso",
+            total=self.total or 0,
+            recibidos=self.recibidos,
+            procesados=self.procesados,
+            **_contar(self.resultados.values())
+        )
+
+    async def eventos(self, desde: int = 0) -> AsyncIterator[str]:
+        """
+        Flujo Server-Sent Events: un evento "resultado" por archivo terminado
+        (id = posición en orden de finalización) y un evento "fin" con el resumen.
+        """
+        posicion = desde
+        while True:
+            cambio = self._cambio
+            while posicion < len(self.orden_finalizacion):
+                indice = self.orden_finalizacion[posicion]
+                datos = {"indice": indice, "resultado": self.resultados[indice].model_dump(mode="json")}
+                yield f"id: {posicion}\nevent: resultado\ndata: {json.dumps(datos, ensure_ascii=False)}\n\n"
+                posicion += 1
+            if self.terminado:
+                resumen = self.resumen().model_dump(mode="json", exclude={"resultados"})
+                yield f"event: fin\ndata: {json.dumps(resumen, ensure_ascii=False)}\n\n"
+                return
+            try:
+                # El comentario periódico mantiene viva la conexión mientras no hay resultados
+                await asyncio.wait_for(cambio.wait(), timeout=15)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+
+class JobManager:
+    """Registro en memoria de los trabajos recientes."""
+    def __init__(self, raiz: Path, max_trabajos: int = 50):
+        self.raiz = raiz
+        self.max_trabajos = max_trabajos
+        self._trabajos: Dict[str, Job] = {}
+
+    def crear(self, total: Optional[int] = None, directorio: Optional[Path] = None,
+              archivar: bool = True, dividir: bool = False) -> Job:
+        job = Job(self.raiz, total, directorio, archivar, dividir)
+        job.directorio.mkdir(parents=True, exist_ok=True)
+        self._trabajos[job.id] = job
+        self._podar()
+        return job
+
+    def obtener(self, trabajo_id: str) -> Optional[Job]:
+        return self._trabajos.get(trabajo_id)
+
+    def ultimo(self) -> Optional[Job]:
+        """El trabajo creado más recientemente (la sesión actual)."""
+        return max(self._trabajos.values(), key=lambda j: j.creado, default=None)
+
+    def por_directorio(self, directorio: Path) -> Optional[Job]:
+        """El trabajo más reciente cuyo espacio de trabajo es `directorio` (None si no está en memoria)."""
+        return max((j for j in self._trabajos.values() if j.directorio == directorio),
+                   key=lambda j: j.creado, default=None)
+
+    def en_proceso(self) -> bool:
+        """Indica si algún trabajo tiene archivos sin terminar."""
+        return any(not j.terminado for j in self._trabajos.values())
+
+    def en_uso(self) -> Set[str]:
+        """Trabajos cuyo espacio no se debe borrar: el actual y los que siguen en proceso."""
+        ultimo = self.ultimo()
+        ids = {j.id for j in self._trabajos.values() if not j.terminado}
+        if ultimo is not None:
+            ids.add(ultimo.id)
+        return ids
+
+    def _podar(self):
+        """Descarta los trabajos terminados más antiguos si se supera el máximo."""
+        if len(self._trabajos) <= self.max_trabajos:
+            return
+        terminados = sorted((j for j in self._trabajos.values() if j.terminado), key=lambda j: j.creado)
+        for job in terminados[:len(self._trabajos) - self.max_trabajos]:
+            del self._trabajos[job.id]
@@ -0,0 +1,102 @@
+import sys
+import copy
+import json
+import atexit
+import logging
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from config import LOG_DIR, LOG_LEVEL, LOG_MAX_BYTES, LOG_BACKUPS
+
+LOG_FILE = LOG_DIR / "gestion_actas.log"
+
+# Campos estructurados que los módulos pasan en `extra=` (se copian tal cual al JSON)
+CAMPOS = ("archivo", "trabajo", "etapa", "estado", "modo", "duracion_ms", "tiempos", "motivo")
+
+_listener: Optional[QueueListener] = None
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro, con los campos estructurados que tenga."""
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "fecha": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        for campo in CAMPOS:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                datos[campo] = valor
+        if record.exc_text:
+            datos["excepcion"] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+class FormatoConsola(logging.Formatter):
+    """Mismo aspecto que la salida anterior por print: [*] informativo, [!] advertencias y errores."""
+    def format(self, record: logging.LogRecord) -> str:
+        prefijo = "[!]" if record.levelno >= logging.WARNING else "[*]"
+        texto = f"{prefijo} {record.getMessage()}"
+        if record.exc_text:
+            texto += "\n" + record.exc_text
+        return texto
+
+class _ColaHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # El mensaje y la traza se resuelven en el hilo que registra (los argumentos pueden
+        # cambiar después); el formato final lo aplica cada handler en el hilo del listener
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def configurar_logging(nivel_consola: Optional[str] = None) -> QueueListener:
+    """
+    Instala el registro del proceso: los módulos solo encolan (sin E/S en el event loop)
+    y un hilo aparte escribe en el archivo rotativo y, si hay consola, en stderr.
+    Llamarla más de una vez no tiene efecto.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    handlers = []
+    try:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        archivo = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+        archivo.setFormatter(FormatoJSON())
+        handlers.append(archivo)
+    except OSError as e:
+        # Carpeta de solo lectura (p. ej. el ejecutable en una unidad protegida): solo consola
+        if sys.stderr is not None:
+            sys.stderr.write(f"[!] No se pudo abrir el log en {LOG_FILE}: {e}\n")
+    # El ejecutable sin consola de PyInstaller no tiene stderr
+    if sys.stderr is not None:
+        consola = logging.StreamHandler(sys.stderr)
+        consola.setFormatter(FormatoConsola())
+        consola.setLevel(nivel_consola or LOG_LEVEL)
+        handlers.append(consola)
+
+    cola: queue.SimpleQueue = queue.SimpleQueue()
+    raiz = logging.getLogger()
+    raiz.setLevel(LOG_LEVEL)
+    raiz.handlers[:] = [_ColaHandler(cola)]
+    _listener = QueueListener(cola, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(detener_logging)
+    return _listener
+
+def detener_logging():
+    """Vacía la cola y cierra los archivos (al terminar el proceso)."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
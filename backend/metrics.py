@@ -0,0 +1,201 @@
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from models import EstadoCarga
+
+# Etapas del procesamiento de un acta, en orden
+ETAPAS = (
+    "lectura_subida",       # volcado de la subida a staging (o hash del archivo local)
+    "consulta_cache",
+    "apertura_pdf",
+    "extraccion_palabras",  # texto del encabezado o palabras con coordenadas
+    "parsing_campos",
+    "nombrado",
+    "escritura_disco",
+    "indice_zip",
+    "catalogo",
+)
+
+# Límites de los buckets de los histogramas, en segundos
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Colector de tiempos del acta en curso (en el proceso worker o en la tarea del servicio)
+_tiempos_actuales: ContextVar[Optional[Dict[str, float]]] = ContextVar("tiempos_actuales", default=None)
+
+@contextmanager
+def etapa(nombre: str):
+    """Suma la duración del bloque a la etapa `nombre` del acta en curso (si hay un colector)."""
+    tiempos = _tiempos_actuales.get()
+    if tiempos is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[nombre] = tiempos.get(nombre, 0.0) + time.perf_counter() - inicio
+
+@contextmanager
+def medir_etapas(tiempos: Optional[Dict[str, float]] = None):
+    """Activa un colector de tiempos para el bloque. Retorna el diccionario etapa -> segundos."""
+    tiempos = {} if tiempos is None else tiempos
+    token = _tiempos_actuales.set(tiempos)
+    try:
+        yield tiempos
+    finally:
+        _tiempos_actuales.reset(token)
+
+def sumar_etapas(tiempos: Dict[str, float]):
+    """Suma al acta en curso los tiempos medidos en otro proceso (el worker de parsing)."""
+    actuales = _tiempos_actuales.get()
+    if actuales is None:
+        return
+    for nombre, segundos in tiempos.items():
+        actuales[nombre] = actuales.get(nombre, 0.0) + segundos
+
+def motivo_error(mensaje: str) -> str:
+    """Motivo de un ParsingError sin el detalle variable (lo que sigue a ':')."""
+    return mensaje.split(":", 1)[0].strip().rstrip(".") or "desconocido"
+
+class _Histograma:
+    def __init__(self):
+        self.cuentas = [0] * (len(BUCKETS) + 1)  # el último es +Inf
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.cuentas[bisect_left(BUCKETS, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Metricas:
+    """Registro de métricas del proceso, exportable en el formato de texto de Prometheus."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._etapas: Dict[str, _Histograma] = {}
+        self._duracion = _Histograma()
+        self._estados: Dict[str, int] = {}
+        self._errores: Dict[str, int] = {}
+        self._plantillas: Dict[str, List[int]] = {}  # huella -> [aciertos, fallos]
+
+    def registrar(self, tiempos: Dict[str, float], duracion: float, estado: str, motivo: Optional[str] = None):
+        """Registra un acta terminada: sus tiempos por etapa, su estado y el motivo si falló."""
+        with self._lock:
+            for nombre, segundos in tiempos.items():
+                self._etapas.setdefault(nombre, _Histograma()).observar(segundos)
+            self._duracion.observar(duracion)
+            self._estados[estado] = self._estados.get(estado, 0) + 1
+            if motivo is not None:
+                self._errores[motivo] = self._errores.get(motivo, 0) + 1
+
+    def registrar_plantillas(self, usos: List[Tuple[str, bool]]):
+        """Registra los usos de plantilla medidos en el worker: [(huella, acierto)]."""
+        with self._lock:
+            for huella, acierto in usos:
+                self._plantillas.setdefault(huella, [0, 0])[0 if acierto else 1] += 1
+
+    def plantillas(self) -> Dict[str, Tuple[int, int]]:
+        """Aciertos y fallos por plantilla (huella del diseño) desde que arrancó el proceso."""
+        with self._lock:
+            return {huella: (aciertos, fallos) for huella, (aciertos, fallos) in self._plantillas.items()}
+
+    def exportar(self, cache: Optional[Tuple[int, int]] = None, carga: Optional[EstadoCarga] = None) -> str:
+        """
+        Texto para /metrics. `cache` = (aciertos, fallos) si la caché está activa;
+        `carga` = trabajo en curso y en espera en este momento.
+        """
+        lineas = []
+        with self._lock:
+            lineas += [
+                "# HELP actas_etapa_segundos Duración de cada etapa del procesamiento de un acta.",
+                "# TYPE actas_etapa_segundos histogram",
+            ]
+            orden = [e for e in ETAPAS if e in self._etapas] + sorted(set(self._etapas) - set(ETAPAS))
+            for nombre in orden:
+                lineas += self._lineas_histograma("actas_etapa_segundos", self._etapas[nombre], f'etapa="{nombre}"')
+            lineas += [
+                "# HELP actas_duracion_segundos Duración total del procesamiento de un acta.",
+                "# TYPE actas_duracion_segundos histogram",
+            ]
+            lineas += self._lineas_histograma("actas_duracion_segundos", self._duracion, "")
+            lineas += [
+                "# HELP actas_exitosas_total Actas procesadas y guardadas (incluye las renombradas por conflicto).",
+                "# TYPE actas_exitosas_total counter",
+                f"actas_exitosas_total {self._estados.get('exito', 0) + self._estados.get('conflicto', 0)}",
+                "# HELP actas_duplicadas_total Actas omitidas por tener el mismo contenido que otra.",
+                "# TYPE actas_duplicadas_total counter",
+                f"actas_duplicadas_total {self._estados.get('duplicado', 0)}",
+                "# HELP actas_conflictos_total Actas guardadas con sufijo porque su nombre oficial ya existía.",
+                "# TYPE actas_conflictos_total counter",
+                f"actas_conflictos_total {self._estados.get('conflicto', 0)}",
+                "# HELP actas_errores_total Actas con error, por motivo.",
+                "# TYPE actas_errores_total counter",
+            ]
+            for motivo, cuenta in sorted(self._errores.items()):
+                lineas.append(f'actas_errores_total{{motivo="{_escapar(motivo)}"}} {cuenta}')
+            lineas += [
+                "# HELP actas_plantilla_aciertos_total Actas leídas de las regiones de la plantilla de su diseño.",
+                "# TYPE actas_plantilla_aciertos_total counter",
+            ]
+            for huella, (aciertos, _) in sorted(self._plantillas.items()):
+                lineas.append(f'actas_plantilla_aciertos_total{{plantilla="{huella}"}} {aciertos}')
+            lineas += [
+                "# HELP actas_plantilla_fallos_total Actas de cada diseño leídas sin plantilla "
+                "(diseño nuevo, plantilla que no cubre la página o valores no válidos).",
+                "# TYPE actas_plantilla_fallos_total counter",
+            ]
+            for huella, (_, fallos) in sorted(self._plantillas.items()):
+                lineas.append(f'actas_plantilla_fallos_total{{plantilla="{huella}"}} {fallos}')
+        if cache is not None:
+            aciertos, fallos = cache
+            lineas += [
+                "# HELP actas_cache_aciertos_total Actas resueltas desde la caché de parseos.",
+                "# TYPE actas_cache_aciertos_total counter",
+                f"actas_cache_aciertos_total {aciertos}",
+                "# HELP actas_cache_fallos_total Consultas a la caché sin resultado.",
+                "# TYPE actas_cache_fallos_total counter",
+                f"actas_cache_fallos_total {fallos}",
+            ]
+        if carga is not None:
+            lineas += [
+                "# HELP actas_archivos_en_curso Archivos recibidos que aún no terminaron.",
+                "# TYPE actas_archivos_en_curso gauge",
+                f"actas_archivos_en_curso {carga.archivos_en_curso}",
+                "# HELP actas_bytes_en_curso Bytes de los archivos recibidos que aún no terminaron.",
+                "# TYPE actas_bytes_en_curso gauge",
+                f"actas_bytes_en_curso {carga.bytes_en_curso}",
+                "# HELP actas_solicitudes_en_espera Subidas o archivos locales esperando lugar para entrar.",
+                "# TYPE actas_solicitudes_en_espera gauge",
+                f"actas_solicitudes_en_espera {carga.solicitudes_en_espera}",
+                "# HELP actas_parseos_en_curso Tareas en el pool de parsing.",
+                "# TYPE actas_parseos_en_curso gauge",
+                f"actas_parseos_en_curso {carga.parseos_en_curso}",
+                "# HELP actas_parseos_en_espera Tareas esperando turno para entrar al pool de parsing.",
+                "# TYPE actas_parseos_en_espera gauge",
+                f"actas_parseos_en_espera {carga.parseos_en_espera}",
+                "# HELP actas_rechazos_total Subidas rechazadas (429) por exceso de trabajo en curso.",
+                "# TYPE actas_rechazos_total counter",
+                f"actas_rechazos_total {carga.rechazos}",
+            ]
+        return "\n".join(lineas) + "\n"
+
+    @staticmethod
+    def _lineas_histograma(nombre: str, histograma: _Histograma, etiquetas: str) -> list:
+        prefijo = f"{etiquetas}," if etiquetas else ""
+        lineas = []
+        acumulado = 0
+        for limite, cuenta in zip(BUCKETS, histograma.cuentas):
+            acumulado += cuenta
+            lineas.append(f'{nombre}_bucket{{{prefijo}le="{limite}"}} {acumulado}')
+        lineas.append(f'{nombre}_bucket{{{prefijo}le="+Inf"}} {histograma.total}')
+        sufijo = f"{{{etiquetas}}}" if etiquetas else ""
+        lineas.append(f"{nombre}_sum{sufijo} {histograma.suma}")
+        lineas.append(f"{nombre}_count{sufijo} {histograma.total}")
+        return lineas
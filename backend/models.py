@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class ActaMetadata(BaseModel):
     archivo_original: str
@@ -14,14 +14,140 @@ class ActaMetadata(BaseModel):
 
 class ProcessResult(BaseModel):
     archivo: str
-    estado: str  # "exito" | "error"
+    estado: str  # "exito" | "error" | "duplicado" (no se guardó: mismo contenido) | "conflicto" (guardada con sufijo)
     mensaje: Optional[str] = None
     metadata: Optional[ActaMetadata] = None
     nuevo_nombre: Optional[str] = None
     ruta_final: Optional[str] = None
+    modo_extraccion: Optional[str] = None  # "encabezado" | "completa" | "cache"
+    duracion_ms: Optional[float] = None
+    tiempos: Optional[Dict[str, float]] = None  # ms por etapa (ver metrics.ETAPAS)
 
 class BatchProcessResponse(BaseModel):
     resultados: List[ProcessResult]
     total_procesados: int
+    exitosos: int  # guardadas (incluye las de nombre en conflicto)
+    fallidos: int
+    duplicados: int = 0  # omitidas por tener el mismo contenido que otra ya recibida o guardada
+    conflictos: int = 0  # otra acta ya tenía el nombre oficial: se guardaron con sufijo " (2)"
+    extracciones_completas: int = 0  # archivos que necesitaron la extracción geométrica completa
+    porcentaje_extraccion_completa: float = 0.0
+    duracion_media_ms: float = 0.0
+    trabajo_id: Optional[str] = None  # sesión en la que se guardaron los archivos
+
+class ProcesarRutaRequest(BaseModel):
+    ruta: str  # carpeta local con las actas (se recorre de forma recursiva)
+    mover: bool = False  # True: mover los originales; False: dejarlos y enlazarlos (hard link)
+    dividir: bool = False  # separar los PDF consolidados en un archivo por acta
+
+class ArchivoConocido(BaseModel):
+    nombre: str  # nombre del archivo en el equipo del usuario
+    sha256: str  # calculado en el navegador
+
+class ConocidosRequest(BaseModel):
+    archivos: List[ArchivoConocido]
+
+class ConocidosResponse(BaseModel):
+    trabajo_id: str
+    conocidos: int  # agregados al trabajo desde las actas ya guardadas (sin subirlos)
+    pendientes: List[str]  # SHA-256 que el servidor no tiene: hay que subirlos
+
+class SubidaEstado(BaseModel):
+    sha256: str
+    nombre: str
+    tamano: int
+    recibido: int  # bytes ya escritos (siempre desde el principio del archivo)
+    completa: bool  # recibida y verificada: ya está en el trabajo
+
+class SubidasResponse(BaseModel):
+    trabajo_id: str
+    subidas: List[SubidaEstado]
+
+class JobCreatedResponse(BaseModel):
+    trabajo_id: str
+    total: int  # archivos esperados (puede crecer con nuevas subidas)
+    recibidos: int
+    eventos_url: str
+
+class JobStatusResponse(BaseModel):
+    trabajo_id: str
+    estado: str  # "en_proceso" | "completado"
+    total: int
+    recibidos: int
+    procesados: int
     exitosos: int
     fallidos: int
+    duplicados: int = 0
+    conflictos: int = 0
+
+class CatalogoActa(BaseModel):
+    id: int
+    sha256: str
+    ruta: str  # donde se guardó (el espacio de trabajo puede haberse limpiado después)
+    trabajo: Optional[str] = None
+    archivo_original: str
+    anio: str
+    codigo_modular: str
+    anexo: str
+    nombre_ie: str
+    nivel: str
+    grado_seccion: str
+    grado: Optional[int] = None
+    seccion: Optional[str] = None
+    es_recuperacion: bool
+    nuevo_nombre: Optional[str] = None
+    registrado: float  # marca de tiempo Unix
+
+class CatalogoPagina(BaseModel):
+    total: int  # actas que cumplen los filtros (en todas las páginas)
+    pagina: int
+    por_pagina: int
+    actas: List[CatalogoActa]
+
+class EstadoCarga(BaseModel):
+    archivos_en_curso: int  # recibidos y aún sin terminar
+    bytes_en_curso: int
+    max_archivos: int
+    max_bytes: int
+    solicitudes_en_espera: int  # subidas o archivos locales esperando lugar
+    parseos_en_curso: int  # tareas enviadas al pool de parsing
+    parseos_en_espera: int
+    max_parseos: int
+    rechazos: int  # subidas rechazadas con 429 desde el arranque
+
+class UsoPlantilla(BaseModel):
+    plantilla: str  # huella del diseño de acta (ver plantillas.py)
+    aciertos: int  # actas leídas de las regiones de la plantilla
+    fallos: int  # actas de ese diseño que se leyeron por el camino normal
+    tasa_aciertos: float  # porcentaje
+
+class CambioReparseo(BaseModel):
+    sha256: str
+    archivo_original: str
+    anterior: str  # ruta del acta antes de reparsear
+    nueva: Optional[str] = None  # ruta con la clasificación actual
+    # "movida" | "conflicto" (guardada con sufijo " (n)") | "duplicado" (el destino ya tenía el mismo
+    # contenido: se quitó la copia) | "catalogo" (el archivo ya no está: solo se actualizó el catálogo)
+    # | "simulada" | "error"
+    estado: str
+    mensaje: Optional[str] = None
+
+class ReparseoResponse(BaseModel):
+    simulado: bool
+    revisadas: int  # actas del catálogo
+    reextraidas: int  # sin instantánea utilizable: se volvió a leer el PDF (y se guardó su instantánea)
+    sin_datos: int  # sin instantánea ni PDF en su lugar: no se pudieron revisar
+    reclasificadas: int
+    errores: int
+    duracion_ms: float
+    cambios: List[CambioReparseo]
+
+class GradosFaltantes(BaseModel):
+    anio: str
+    nivel: str
+    presentes: List[int]
+    faltantes: List[int]
+
+class FaltantesResponse(BaseModel):
+    codigo_modular: str
+    resultados: List[GradosFaltantes]
@@ -1,8 +1,13 @@
 import re
 import io
-import pdfplumber
-from typing import BinaryIO
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, Optional
 from models import ActaMetadata
+from word_index import WordIndex
+from metrics import etapa
+from extractor import extraer_campos, CODIGOS_CONOCIDOS, NOMBRE_IE_CONOCIDO, REGLAS_TEXTO, RE_DIGITO
+import plantillas
+import extracciones
 
 class ParsingError(Exception):
     """Excepción lanzada cuando hay errores de validación en el parsing."""
@@ -10,148 +15,387 @@ class ParsingError(Exception):
         self.message = message
         super().__init__(self.message)
 
-def extraer_datos_pdf(pdf_file: BinaryIO) -> tuple[str, list]:
+# Título con el que empieza cada acta (oficial o de recuperación) en la parte superior de la página
+RE_INICIO_ACTA = re.compile(r'ACTA\s+(?:OFICIAL\s+)?DE\s+EVALUACI')
+# Título de las actas de recuperación ("ACTA DE EVALUACIÓN DE RECUPERACIÓN DEL NIVEL...")
+RE_TITULO_RECUPERACION = re.compile(r'ACTA\s+DE\s+EVALUACI[ÓO]N\s+DE\s+RECUPERACI[ÓO]N')
+
+# Año del acta (la misma regla que aplica extractor.extraer_campos sobre el texto)
+RE_ANIO = REGLAS_TEXTO[0].patron
+
+def recuperacion_por_nombre(nombre_original: str) -> bool:
+    """Indica si el nombre del archivo marca el acta como de recuperación ("[REC]")."""
+    return "[REC]" in nombre_original.upper()
+
+def extraer_datos_pdf(pdf_file: BinaryIO, pagina: int = 0) -> tuple[str, list]:
     """
-    Extrae texto y lista de palabras con coordenadas del PDF.
+    Extrae texto y lista de palabras con coordenadas de una página del PDF (la primera por defecto).
     Retorna: (texto_completo, lista_palabras)
     """
-    texto_lineas = []
+    # Import diferido: pdfplumber/pdfminer solo se cargan en los procesos que parsean
+    # (el pool los precarga al arrancar), no al iniciar el servidor
+    import pdfplumber
+
     todas_palabras = []
     
     try:
         if hasattr(pdf_file, 'seek'):
             pdf_file.seek(0)
             
-        with pdfplumber.open(pdf_file) as pdf:
-            # Procesar solo la primera página que es donde está la metadata
-            if len(pdf.pages) > 0:
-                page = pdf.pages[0]
-                # Extraer palabras con alta precisión
-                words = page.extract_words(
-                    keep_blank_chars=True, 
-                    use_text_flow=True,
-                    x_tolerance=3,
-                    y_tolerance=3
-                )
-                
-                # Filtrar zona superior (encabezado) para eficiencia
-                # La metadata suele estar en el tercio superior
-                height = page.height
-                words_top = [w for w in words if w['top'] < height * 0.5]
+        with etapa("apertura_pdf"):
+            # Solo la página pedida: pdfplumber no interpreta las demás
+            pdf = pdfplumber.open(pdf_file, pages=[pagina + 1])
+            paginas = pdf.pages
+        with pdf:
+            # Procesar solo la primera página del acta, que es donde está la metadata
+            if len(paginas) > 0:
+                page = paginas[0]
+                with etapa("extraccion_palabras"):
+                    # Extraer palabras con alta precisión
+                    words = page.extract_words(
+                        keep_blank_chars=True, 
+                        use_text_flow=True,
+                        x_tolerance=3,
+                        y_tolerance=3
+                    )
                 
-                todas_palabras = words_top
+                    # Filtrar zona superior (encabezado) para eficiencia
+                    # La metadata suele estar en el tercio superior
+                    height = page.height
+                    words_top = [w for w in words if w['top'] < height * 0.5]
                 
-                # Generar texto lineal para fallbacks (ordenado Y luego X)
-                words_sorted = sorted(words_top, key=lambda x: (x['top'], x['x0']))
-                
-                if words_sorted:
-                    current_y = words_sorted[0]['top']
-                    linea = []
-                    for w in words_sorted:
-                        if abs(w['top'] - current_y) > 5:
-                            texto_lineas.append(" ".join([item['text'] for item in linea]))
-                            linea = []
-                            current_y = w['top']
-                        linea.append(w)
-                    texto_lineas.append(" ".join([item['text'] for item in linea]))
+                    todas_palabras = words_top
                 
     except Exception as e:
         raise ParsingError(f"No se pudo leer el archivo PDF: {str(e)}")
     
-    return "\n".join(texto_lineas), todas_palabras
+    return texto_de_palabras(todas_palabras), todas_palabras
+
+def texto_de_palabras(palabras: list) -> str:
+    """Texto lineal para los fallbacks: las palabras por líneas (ordenadas por Y y luego por X)."""
+    texto_lineas = []
+    words_sorted = sorted(palabras, key=lambda x: (x['top'], x['x0']))
 
-def buscar_dato_derecha(words: list, regex_label: str, ancho_busqueda_max: int = 200, y_tolerance: int = 4) -> str:
+    if words_sorted:
+        current_y = words_sorted[0]['top']
+        linea = []
+        for w in words_sorted:
+            if abs(w['top'] - current_y) > 5:
+                texto_lineas.append(" ".join([item['text'] for item in linea]))
+                linea = []
+                current_y = w['top']
+            linea.append(w)
+        texto_lineas.append(" ".join([item['text'] for item in linea]))
+    return "\n".join(texto_lineas)
+
+def buscar_dato_derecha(words, regex_label: str, ancho_busqueda_max: int = 200, y_tolerance: int = 4) -> str:
     """
     Busca un valor que esté geométricamente a la derecha de un label encontrado por regex.
+    Acepta la lista de palabras o un WordIndex ya construido (recomendado si se buscan varios labels).
     """
-    # 1. Encontrar posibles candidatos para el label
-    candidatos_label = []
-    import re
-    
-    # Vamos a iterar sobre las palabras y ver si alguna matchea el regex
-    for i, w in enumerate(words):
-        if re.search(regex_label, w['text'], re.IGNORECASE):
-            candidatos_label.append(w)
-            
-    if not candidatos_label:
-        return ""
+    indice = words if isinstance(words, WordIndex) else WordIndex(words)
+    return indice.buscar_derecha(regex_label, ancho_busqueda_max, y_tolerance)
 
-    # 2. Para cada candidato, buscar la palabra más cercana a su derecha en la misma línea
-    mejor_valor = ""
-    menor_distancia = float('inf')
+@dataclass
+class Encabezado:
+    """
+    Texto de la mitad superior de una página. Con plantillas activas, también la huella
+    de su diseño y los campos leídos de las regiones de su plantilla (si ya se conoce).
+    """
+    texto: str
+    huella: Optional[str] = None
+    valores: Optional[Dict[str, str]] = None  # búsqueda -> texto de su región (plantilla conocida)
+    incompleta: bool = False  # la página necesitó una búsqueda que la plantilla no tiene
+    alto: float = 0.0
 
-    for label in candidatos_label:
-        label_y_center = (label['top'] + label['bottom']) / 2
-        label_right = label['x1']
-        
-        for w in words:
-            # Ignorar la misma palabra
-            if w == label: continue
-            
-            # Verificar alineación vertical (misma línea aprox)
-            w_y_center = (w['top'] + w['bottom']) / 2
-            if abs(w_y_center - label_y_center) > y_tolerance: 
-                continue
-                
-            # Verificar que esté a la derecha
-            if w['x0'] > label_right:
-                distancia = w['x0'] - label_right
-                
-                # Verificar que esté dentro del rango de búsqueda
-                if distancia < ancho_busqueda_max:
-                    # Es un candidato válido. Queremos el más cercano a la derecha.
-                    if distancia < menor_distancia:
-                        menor_distancia = distancia
-                        mejor_valor = w['text']
-                        
-    return mejor_valor
-
-def parsear_acta(pdf_file: BinaryIO, nombre_original: str) -> ActaMetadata:
+    @property
+    def por_aprender(self) -> bool:
+        """El diseño es nuevo o su plantilla no cubre esta página: aprender de la extracción completa."""
+        return self.huella is not None and (self.valores is None or self.incompleta)
+
+def _leer_encabezado(page, solo_actas: bool = False, con_plantilla: bool = True) -> Optional[Encabezado]:
     """
-    Parsea el contenido de un PDF de SIAGIE y extrae la metadata.
+    Lee el encabezado de una página abierta con pdfium (y, con con_plantilla=True, su huella
+    y los valores de su plantilla). Con solo_actas=True retorna None si la página no inicia un acta.
+    """
+    with etapa("extraccion_palabras"):
+        ancho, alto = page.get_size()
+        textpage = page.get_textpage()
+        try:
+            # Coordenadas PDF: el origen está abajo, el encabezado es la franja [alto/2, alto]
+            texto = textpage.get_text_bounded(left=0, bottom=alto * 0.5, right=ancho, top=alto)
+            texto = "\n".join(linea.strip() for linea in texto.splitlines() if linea.strip())
+            if solo_actas and not es_inicio_de_acta(texto):
+                return None
+            encabezado = Encabezado(texto, alto=alto)
+            registro = plantillas.registro() if con_plantilla else None
+            if registro is not None:
+                encabezado.huella = plantillas.huella_de_pagina(textpage, ancho, alto)
+                plantilla = registro.obtener(encabezado.huella)
+                if plantilla is not None:
+                    encabezado.valores = plantilla.leer(textpage)
+        finally:
+            textpage.close()
+    return encabezado
+
+def leer_encabezado(pdf_file: BinaryIO, pagina: int = 0, con_plantilla: bool = True) -> Encabezado:
+    """
+    Pasada rápida: extrae solo el texto de la mitad superior (encabezado) de una página.
+    Usa pdfium (dependencia de pdfplumber), que limita el análisis a esa región
+    sin construir palabras ni coordenadas para el resto de la página.
+    """
+    import pypdfium2 as pdfium
+
+    try:
+        if hasattr(pdf_file, 'seek'):
+            pdf_file.seek(0)
+        with etapa("apertura_pdf"):
+            documento = pdfium.PdfDocument(pdf_file)
+        try:
+            if pagina >= len(documento):
+                return Encabezado("")
+            with etapa("apertura_pdf"):
+                page = documento[pagina]
+            encabezado = _leer_encabezado(page, con_plantilla=con_plantilla)
+            page.close()
+        finally:
+            documento.close()
+    except Exception as e:
+        raise ParsingError(f"No se pudo leer el archivo PDF: {str(e)}")
+
+    return encabezado
+
+def es_inicio_de_acta(texto_encabezado: str) -> bool:
+    """Indica si el encabezado de una página es el de la primera página de un acta."""
+    return RE_INICIO_ACTA.search(texto_encabezado[:300].upper()) is not None
+
+def es_titulo_de_recuperacion(texto_encabezado: str) -> bool:
+    """
+    Indica si el encabezado es el de un acta de recuperación. Al dividir un consolidado
+    cumple el papel de la marca "[REC]" que llevaría el nombre de un archivo suelto.
+    """
+    return RE_TITULO_RECUPERACION.search(texto_encabezado[:300].upper()) is not None
+
+def inicios_de_acta(pdf_file: BinaryIO, desde: int, hasta: int,
+                    con_plantilla: bool = True) -> Iterator[tuple[int, Encabezado]]:
+    """
+    Recorre las páginas [desde, hasta) de a una (sin cargar el documento entero)
+    y produce (página, encabezado) de las que inician un acta.
+    """
+    import pypdfium2 as pdfium
+
+    try:
+        if hasattr(pdf_file, 'seek'):
+            pdf_file.seek(0)
+        with etapa("apertura_pdf"):
+            documento = pdfium.PdfDocument(pdf_file)
+        try:
+            for numero in range(desde, min(hasta, len(documento))):
+                with etapa("apertura_pdf"):
+                    page = documento[numero]
+                encabezado = _leer_encabezado(page, solo_actas=True, con_plantilla=con_plantilla)
+                page.close()
+                if encabezado is not None:
+                    yield numero, encabezado
+        finally:
+            documento.close()
+    except ParsingError:
+        raise
+    except Exception as e:
+        raise ParsingError(f"No se pudo leer el archivo PDF: {str(e)}")
+
+def contar_paginas(pdf_file: BinaryIO) -> int:
+    import pypdfium2 as pdfium
+
+    try:
+        if hasattr(pdf_file, 'seek'):
+            pdf_file.seek(0)
+        documento = pdfium.PdfDocument(pdf_file)
+        try:
+            return len(documento)
+        finally:
+            documento.close()
+    except Exception as e:
+        raise ParsingError(f"No se pudo leer el archivo PDF: {str(e)}")
+
+def parsear_acta(pdf_file: BinaryIO, nombre_original: str, pagina: int = 0,
+                 encabezado: Optional[Encabezado] = None) -> ActaMetadata:
+    """
+    Parsea el contenido de un PDF de SIAGIE y extrae la metadata
+    (del acta que empieza en `pagina`, la primera por defecto).
+    Si la plantilla del diseño del `encabezado` no existe o no cubre esta página, la aprende
+    (o la amplía) con esta extracción.
     Lanza ParsingError si faltan datos críticos.
     """
     # Extracción híbrida: Texto corrido + Coordenadas
-    texto, palabras = extraer_datos_pdf(pdf_file)
-    texto_upper = texto.upper()
+    # (la primera página con la firma de siempre: reproduce_issue.py y verify_fix.py la reemplazan)
+    texto, palabras = extraer_datos_pdf(pdf_file, pagina) if pagina else extraer_datos_pdf(pdf_file)
+    extracciones.anotar(palabras=palabras)
+    aprender = encabezado is not None and encabezado.por_aprender
+    origen: Optional[Dict[str, Optional[int]]] = {} if aprender else None
+    with etapa("parsing_campos"):
+        metadata = _interpretar_acta(texto, palabras, nombre_original, origen=origen)
+    registro = plantillas.registro()
+    if aprender and registro is not None:
+        registro.guardar(plantillas.aprender(encabezado.huella, palabras, origen, encabezado.alto))
+    return metadata
+
+def interpretar_con_plantilla(encabezado: Encabezado, nombre_original: str) -> Optional[ActaMetadata]:
+    """
+    Metadata con año, grado y sección leídos de las regiones de la plantilla del diseño.
+    None si el diseño no tiene plantilla o lo leído no es válido (se sigue por el camino normal).
+    Registra el acierto o el fallo de la plantilla (ver plantillas.medir_plantillas).
+    """
+    if encabezado.huella is None:
+        return None
+    metadata = None
+    if encabezado.valores is not None:
+        extracciones.anotar(valores=encabezado.valores)
+        with etapa("parsing_campos"):
+            try:
+                metadata = _interpretar_acta(encabezado.texto, [], nombre_original, estricto=True,
+                                             valores=encabezado.valores)
+            except plantillas.PlantillaIncompleta:
+                encabezado.incompleta = True
+    plantillas.registrar_uso(encabezado.huella, metadata is not None)
+    return metadata
+
+def parsear_acta_completo(pdf_file: BinaryIO, nombre_original: str, pagina: int = 0,
+                          encabezado: Optional[Encabezado] = None) -> tuple[ActaMetadata, bool]:
+    """
+    Modo completo: extracción geométrica, salvo que el diseño de la página tenga plantilla
+    (los mismos valores, leídos directamente de sus regiones).
+    Retorna: (metadata, usó_extracción_completa)
+    """
+    if encabezado is None and plantillas.registro() is not None:
+        encabezado = leer_encabezado(pdf_file, pagina)
+    if encabezado is not None:
+        extracciones.anotar(encabezado=encabezado.texto)
+        metadata = interpretar_con_plantilla(encabezado, nombre_original)
+        if metadata is not None:
+            return metadata, False
+    return parsear_acta(pdf_file, nombre_original, pagina, encabezado), True
+
+def parsear_acta_rapido(pdf_file: BinaryIO, nombre_original: str, pagina: int = 0,
+                        encabezado: Optional[Encabezado] = None) -> tuple[ActaMetadata, bool]:
+    """
+    Modo rápido: intenta primero con el texto del encabezado (sin geometría) y solo
+    recurre a la extracción completa si no se encuentran nivel, grado o sección.
+    Antes de la extracción completa prueba con la plantilla del diseño de la página.
+    `encabezado` evita volver a leerlo si ya se extrajo (al dividir un PDF).
+    Retorna: (metadata, usó_extracción_completa)
+    """
+    if encabezado is None:
+        encabezado = leer_encabezado(pdf_file, pagina, con_plantilla=False)
+    extracciones.anotar(encabezado=encabezado.texto)
+    with etapa("parsing_campos"):
+        metadata = _interpretar_acta(encabezado.texto, [], nombre_original, estricto=True)
+    if metadata is not None:
+        return metadata, False
+    return parsear_acta_completo(pdf_file, nombre_original, pagina,
+                                 encabezado if encabezado.huella is not None else None)
+
+def reinterpretar(extraccion: extracciones.Extraccion, nombre_original: str,
+                  rapido: bool) -> Optional[ActaMetadata]:
+    """
+    Aplica las reglas actuales a la instantánea de un acta ya extraída, por el mismo camino que
+    al parsear el PDF: en modo rápido, primero el texto del encabezado; luego las palabras de la
+    extracción completa o, si no la hubo, los valores de la plantilla.
+    Retorna None si la instantánea no alcanza (hay que volver a extraer el PDF).
+    Lanza ParsingError si faltan datos críticos.
+    """
+    metadata = None
+    if rapido and extraccion.encabezado:
+        metadata = _interpretar_acta(extraccion.encabezado, [], nombre_original, estricto=True)
+    if metadata is None and extraccion.palabras is not None:
+        metadata = interpretar_acta(texto_de_palabras(extraccion.palabras), extraccion.palabras, nombre_original)
+    if metadata is None and extraccion.valores is not None:
+        try:
+            metadata = _interpretar_acta(extraccion.encabezado, [], nombre_original, estricto=True,
+                                         valores=extraccion.valores)
+        except plantillas.PlantillaIncompleta:
+            pass  # las reglas nuevas buscan una etiqueta que la plantilla no registró
+    if metadata is not None and extraccion.division and es_titulo_de_recuperacion(extraccion.encabezado):
+        metadata.es_recuperacion = True
+    return metadata
+
+def interpretar_acta(texto: str, palabras: list, nombre_original: str) -> ActaMetadata:
+    """
+    Aplica las reglas de parsing sobre el texto y las palabras ya extraídos del PDF.
+    Lanza ParsingError si faltan datos críticos.
+    """
+    return _interpretar_acta(texto, palabras, nombre_original)
+
+def _interpretar_acta(texto: str, palabras: list, nombre_original: str, estricto: bool = False,
+                      valores: Optional[Dict[str, str]] = None, origen: Optional[Dict[str, int]] = None):
+    """
+    Reglas de parsing. En modo estricto (pasada rápida) retorna None en lugar de
+    usar valores por defecto cuando no encuentra nivel, grado o sección.
+    `valores`: resultado de cada búsqueda geométrica (y del año) leído de las regiones de una
+    plantilla, en lugar de buscarlo; lanza PlantillaIncompleta si falta alguna que se necesita.
+    `origen`: si se indica, se completa con el índice de la palabra que encontró cada búsqueda
+    (None si no encontró), para aprender la plantilla del diseño.
+    """
+    # Una sola pasada sobre las líneas obtiene todos los campos textuales
+    campos = extraer_campos(texto.upper())
     
     # 1. Año
-    anio_match = re.search(r'20(23|24|25)', texto_upper)
-    anio = anio_match.group(0) if anio_match else "2024"
+    if valores is not None:
+        if "anio" not in valores:
+            raise plantillas.PlantillaIncompleta("anio")
+        if valores["anio"]:
+            m = RE_ANIO.search(valores["anio"].upper())
+            if not m:
+                return None
+            campos.anio = m.group(0)
+    anio = campos.anio or "2024"
 
     # 2. Código Modular
-    codigo_match = re.search(r'(?:C[ÓO]DIGO\s+MODULAR|MODULAR).*?(\d{7})', texto_upper)
-    if not codigo_match:
-        codigo_match = re.search(r'(\d{7})', texto_upper)
-    codigo_modular = codigo_match.group(1) if codigo_match else "0000000"
+    codigo_modular = campos.codigo_modular or campos.primer_codigo or "0000000"
 
     # 3. Nivel
-    nivel = "DESCONOCIDO"
-    if "INICIAL" in texto_upper: nivel = "INICIAL"
-    elif "PRIMARIA" in texto_upper: nivel = "PRIMARIA"
-    elif "SECUNDARIA" in texto_upper: nivel = "SECUNDARIA"
+    nivel = campos.nivel or "DESCONOCIDO"
     
     if nivel == "DESCONOCIDO":
+        if estricto:
+            return None
         raise ParsingError("No se detectó el Nivel Educativo.")
 
     # 4. Grado y Sección (Enfoque Geométrico Prioritario)
     grado_raw = ""
     seccion_raw = ""
     
+    # Índice espacial construido una vez y compartido por todas las búsquedas geométricas
+    indice = WordIndex(palabras)
+
+    def dato_derecha(regex_label: str, ancho_busqueda_max: int = 200, y_tolerance: int = 4) -> str:
+        # Con plantilla no se buscan etiquetas: el valor es el texto de la región de esta búsqueda
+        clave = f"{regex_label}|{ancho_busqueda_max}|{y_tolerance}"
+        if valores is not None:
+            if clave not in valores:
+                raise plantillas.PlantillaIncompleta(clave)
+            return valores[clave]
+        i = indice.buscar_derecha_indice(regex_label, ancho_busqueda_max, y_tolerance)
+        if origen is not None:
+            origen[clave] = i
+        return indice.textos[i] if i is not None else ""
+
     # --- EXTRACCIÓN SECCIÓN GEOMÉTRICA ---
     # Prioridad 1: Buscar "UNICA" explícitamente a la derecha de Sección
     # Esto evita confusión con P/M si UNICA está presente
-    seccion_unica = buscar_dato_derecha(palabras, r'SECCI[ÓO]N|s\(8\)', ancho_busqueda_max=300, y_tolerance=2)
+    seccion_unica = dato_derecha(r'SECCI[ÓO]N|s\(8\)', ancho_busqueda_max=300, y_tolerance=2)
     if seccion_unica and ("UNICA" in seccion_unica.upper().replace('Ú', 'U') or seccion_unica.upper() == "U"):
           seccion_raw = "U"
     else:
         # Prioridad 2: Buscar etiqueta genérica con tolerancia estricta
         # Usamos y_tolerance=2 para evitar saltar de línea a Turno o Gestión
-        seccion_geo = buscar_dato_derecha(palabras, r'\(8\)', ancho_busqueda_max=250, y_tolerance=2)
+        # En el diseño 2025 "(8)" es el Período Lectivo (la sección es "(6)"): a su derecha
+        # está "Inicio dd/mm/aaaa", que se leía como sección "I"
+        seccion_geo = dato_derecha(r'(?<!LECTIVO )\(8\)', ancho_busqueda_max=250, y_tolerance=2)
         
         # Si no encuentra por "(8)", buscar por "SECCIÓN" simple
         if not seccion_geo:
-            seccion_geo = buscar_dato_derecha(palabras, r'SECCI[ÓO]N', ancho_busqueda_max=250, y_tolerance=2)
+            seccion_geo = dato_derecha(r'SECCI[ÓO]N', ancho_busqueda_max=250, y_tolerance=2)
             
         if seccion_geo:
             # Limpiar valor encontrado pero manteniendo 'Ú' y 'N'
@@ -166,43 +410,31 @@ def parsear_acta(pdf_file: BinaryIO, nombre_original: str) -> ActaMetadata:
 
     # --- EXTRACCIÓN GRADO GEOMÉTRICA ---
     # Buscar etiqueta "Grado" o "(5)"
-    grado_geo = buscar_dato_derecha(palabras, r'\(5\)', y_tolerance=8)
+    grado_geo = dato_derecha(r'\(5\)', y_tolerance=8)
     if not grado_geo:
-         grado_geo = buscar_dato_derecha(palabras, r'GRADO', y_tolerance=8)
+         grado_geo = dato_derecha(r'GRADO', y_tolerance=8)
          
     if grado_geo:
          grado_raw = grado_geo
 
+    if valores is not None and (not seccion_raw or not RE_DIGITO.search(grado_raw)):
+        # La región no tiene un valor válido: la página no sigue del todo la plantilla
+        return None
+    if origen is not None:
+        # El año sale del texto: la primera palabra que lo contiene en orden de lectura
+        con_anio = [i for i, p in enumerate(palabras) if RE_ANIO.search(p['text'].upper())]
+        origen["anio"] = min(con_anio, key=lambda i: (palabras[i]['top'], palabras[i]['x0']), default=None)
+
     # --- FALLBACK TEXTO SEGURO (Si falla geometría) ---
-    if not seccion_raw or not grado_raw:
-        lines = texto_upper.split('\n')
-        for line in lines:
-            if not grado_raw:
-                m = re.search(r'GRADO(?:\s*\(5\))?[:\s]*(\w+)', line)
-                if m: grado_raw = m.group(1).strip()
-            
-            if not seccion_raw:
-                # Búsqueda TEXTUAL estricta de SECCIÓN
-                # Pattern: SECCIÓN ... (valor)
-                # Ensure we capture numeric 5-digit sections like 71009 if they appear as sections (though unlikely, user mentioned it?)
-                # Actually user mentioned 71009 as IE Name, but said "nombre de la seccion en este acta es 71009".
-                # Wait, "nombre de la seccion en este acta es 71009"?
-                # USER: "el nombre de la seccion en este acta es 71009 no siempre sera nombres largos" -> Did they mean Institution Name?
-                # USER Context: "problemas para identificar el nombre correcto de la institucion educativa y la seccion... el nombre de la seccion en este acta es 71009"
-                # This is confusing. 71009 is usually a School ID (Code Modular or Number).
-                # But let's assume they might mean Institution Name is 71009.
-                # "dice unica pero si es seccion unica solo debe poner la U" -> Section logic.
-                # "el nombre de la seccion en este acta es 71009" -> Maybe they meant "el nombre de la institucion"?
-                # Because later they say "a veces solamente son numeros asi que debe analziar bien el sistema ese punto antes de renombrar"
-                # Renaming usually involves IE Name.
-                # Let's assume 71009 is the IE Name.
-                
-                m_sec = re.search(r'SECCI[ÓO]N.*?(?:[:\s]|\(8\))(?:\s*)([A-Z0-9]+|ÚNICA|UNICA)\b', line)
-                if m_sec: 
-                    candidate = m_sec.group(1).strip().upper().replace('Ú', 'U')
-                    # Verificar que NO sea "P", "S", "M", "T"
-                    if candidate not in ["P", "S", "M", "T", "EBR"]:
-                        seccion_raw = candidate
+    # En modo estricto se ignoran coincidencias sin número (ej. "grado y sección")
+    # y secciones ambiguas; ver extractor.extraer_campos
+    if not grado_raw:
+        grado_raw = (campos.grado_estricto if estricto else campos.grado) or ""
+    if not seccion_raw:
+        seccion_raw = (campos.seccion_estricta if estricto else campos.seccion) or ""
+    
+    if estricto and (not grado_raw or not seccion_raw):
+        return None
     
     # --- NOTA: ELIMINADO FALLBACK PELIGROSO "m_alt" ---
 
@@ -237,41 +469,12 @@ def parsear_acta(pdf_file: BinaryIO, nombre_original: str) -> ActaMetadata:
         grado_seccion = f"{grado_label} {seccion_raw}"
 
     # 5. Nombre IE
-    nombre_ie = "IE SIN NOMBRE"
-    codigos_conocidos = ["0227900", "0239905", "1155530", "0478032"] 
-    
-    for codigo in codigos_conocidos:
-        if codigo in codigo_modular or codigo in texto_upper:
-            nombre_ie = "27 SANTA LUCIA FE Y ALEGRIA"
-            break
-            
-    if nombre_ie == "IE SIN NOMBRE":
-        if "SANTA LUCIA" in texto_upper and "ALEGRIA" in texto_upper:
-            nombre_ie = "27 SANTA LUCIA FE Y ALEGRIA"
-        else:
-            stop_words = ["CODIGO", "CÓDIGO", "MODULAR", "UGEL", "DRE", "PERIODO", "PERÍODO", "ANEXO", "FORMA", "ESC", "CARACTERISTICA", "TURNO"]
-            for line in texto_upper.split('\n'):
-                line_clean = re.sub(r'\s+', ' ', line)
-                if "NUMERO Y/O NOMBRE" in line_clean or "NÚMERO Y/O NOMBRE" in line_clean:
-                    # Intento 1: Buscar dígitos explícitos si el nombre es numérico
-                    match_num = re.search(r'(?:NUMERO|NÚMERO)\s+Y/O\s+NOMBRE\s+[:\.]?\s*(\d+)', line_clean)
-                    if match_num:
-                        nombre_ie = match_num.group(1)
-                        break
-                    
-                    # Intento 2: Split normal
-                    partes = re.split(r'NOMBRE', line_clean)
-                    if len(partes) > 1:
-                        posible_nombre = partes[-1].strip()
-                        for stop_word in stop_words:
-                            if stop_word in posible_nombre:
-                                posible_nombre = posible_nombre.split(stop_word)[0].strip()
-                        posible_nombre = re.sub(r'^[:\-\.\s]+', '', posible_nombre)
-                        
-                        # Permitir nombres numéricos cortos o nombres largos
-                        if len(posible_nombre) >= 3:
-                            nombre_ie = posible_nombre
-                            break
+    if campos.codigo_conocido or codigo_modular in CODIGOS_CONOCIDOS:
+        nombre_ie = NOMBRE_IE_CONOCIDO
+    elif campos.menciona_santa_lucia and campos.menciona_alegria:
+        nombre_ie = NOMBRE_IE_CONOCIDO
+    else:
+        nombre_ie = campos.nombre_ie or "IE SIN NOMBRE"
 
     nombre_ie = re.sub(r'[\\/*?:"<>|]', '', nombre_ie).strip()
     if len(nombre_ie) > 50: 
@@ -281,7 +484,7 @@ def parsear_acta(pdf_file: BinaryIO, nombre_original: str) -> ActaMetadata:
         # Mejor dejar como DESCONOCIDA si falla todo
         nombre_ie = "IE DESCONOCIDA"
 
-    es_recuperacion = "RECUPERACI[ÓO]N" in texto_upper or "[REC]" in nombre_original.upper()
+    es_recuperacion = campos.recuperacion or recuperacion_por_nombre(nombre_original)
     
     return ActaMetadata(
         archivo_original=nombre_original,
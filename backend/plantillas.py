@@ -0,0 +1,200 @@
+"""
+Plantillas de los diseños de acta del SIAGIE.
+
+Las actas salen de unos pocos formularios fijos: en cada diseño las etiquetas y los valores
+ocupan siempre las mismas posiciones. La huella de una página resume dónde están sus
+etiquetas. La primera vez que aparece un diseño, la extracción completa (pdfplumber) registra
+la caja del valor que encontró cada búsqueda de etiqueta (grado, sección) y la del año, y esas
+cajas quedan guardadas como su plantilla. Las páginas siguientes con la misma huella leen los
+valores directamente de esas regiones con pdfium, sin extraer palabras ni buscar etiquetas,
+y aplican las mismas reglas: el resultado es el de la extracción completa.
+"""
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Etiquetas cuya posición en el encabezado identifica el diseño de la página
+ANCLAS = ("GRADO", "SECCI", "NIVEL", "MODULAR")
+# Resolución de la huella, en puntos: absorbe diferencias de redondeo entre exportaciones
+GRILLA = 2
+# Margen alrededor de la caja aprendida, y cuánto puede crecer a la derecha un valor más largo
+# (p. ej. "ÚNICA" donde se aprendió "A"), sin llegar a la palabra siguiente de la línea
+MARGEN = 1.0
+EXTENSION_MAX = 40.0
+
+Caja = Tuple[float, float, float, float]  # (izquierda, abajo, derecha, arriba) en coordenadas PDF
+
+class PlantillaIncompleta(Exception):
+    """La página necesita una búsqueda que la plantilla todavía no registró (otra rama de las reglas)."""
+
+def huella_de_pagina(textpage, ancho: float, alto: float) -> str:
+    """Huella del diseño: tamaño de la página y posición de las etiquetas del encabezado (pdfium)."""
+    posiciones = [round(ancho), round(alto)]
+    for ancla in ANCLAS:
+        buscador = textpage.search(ancla, match_case=False)
+        while True:
+            encontrado = buscador.get_next()
+            if not encontrado:
+                break
+            izquierda, abajo, _, _ = textpage.get_charbox(encontrado[0])
+            if abajo >= alto * 0.5:
+                posiciones.append((ancla, round(izquierda / GRILLA), round(abajo / GRILLA)))
+    return hashlib.sha1(repr(posiciones).encode()).hexdigest()[:12]
+
+@dataclass
+class Plantilla:
+    """
+    Regiones de un diseño: búsqueda (clave) -> caja del valor encontrado,
+    o None si en este diseño esa búsqueda no encuentra nada.
+    """
+    huella: str
+    regiones: Dict[str, Optional[Caja]] = field(default_factory=dict)
+
+    def leer(self, textpage) -> Dict[str, str]:
+        """Texto de cada región en una página con este diseño ("" si la búsqueda no encuentra nada)."""
+        valores = {}
+        for clave, caja in self.regiones.items():
+            if caja is None:
+                valores[clave] = ""
+            else:
+                izquierda, abajo, derecha, arriba = caja
+                valores[clave] = textpage.get_text_bounded(left=izquierda, bottom=abajo,
+                                                           right=derecha, top=arriba).strip()
+        return valores
+
+def _region(palabras: list, i: int, alto: float) -> Caja:
+    """Caja de la palabra `i` (coordenadas de pdfplumber, origen arriba) en coordenadas PDF."""
+    palabra = palabras[i]
+    centro = (palabra['top'] + palabra['bottom']) / 2
+    semialto = (palabra['bottom'] - palabra['top']) / 2
+    siguiente = min((p['x0'] for p in palabras
+                     if p['x0'] > palabra['x1'] and abs((p['top'] + p['bottom']) / 2 - centro) <= semialto),
+                    default=palabra['x1'] + EXTENSION_MAX)
+    derecha = max(palabra['x1'], min(siguiente - MARGEN, palabra['x1'] + EXTENSION_MAX))
+    return (palabra['x0'] - MARGEN, alto - palabra['bottom'] - MARGEN, derecha, alto - palabra['top'] + MARGEN)
+
+def aprender(huella: str, palabras: list, origen: Dict[str, Optional[int]], alto: float) -> Plantilla:
+    """
+    Plantilla a partir de la extracción completa de una página: `origen` indica, por cada
+    búsqueda hecha, la palabra (pdfplumber) que encontró o None.
+    """
+    return Plantilla(huella, {clave: _region(palabras, i, alto) if i is not None else None
+                              for clave, i in origen.items()})
+
+class RegistroPlantillas:
+    """
+    Plantillas aprendidas, guardadas en SQLite: las comparten los procesos del pool
+    y se conservan entre reinicios. Cada proceso mantiene en memoria las que ya leyó.
+    Como la caché de parseos, se descartan al cambiar la versión de las reglas.
+    """
+    def __init__(self, ruta: Path, version: str):
+        self.ruta = ruta
+        self.version = version
+        self._memoria: Dict[str, Plantilla] = {}
+        self._lock = threading.Lock()
+
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(ruta), check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS plantillas (
+                huella TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                regiones TEXT NOT NULL,
+                creada REAL NOT NULL
+            )
+        """)
+        with self._conn:
+            self._conn.execute("DELETE FROM plantillas WHERE version != ?", (version,))
+
+    def obtener(self, huella: str) -> Optional[Plantilla]:
+        """Plantilla del diseño, o None si todavía no se aprendió (quizá en otro proceso)."""
+        plantilla = self._memoria.get(huella)
+        if plantilla is not None:
+            return plantilla
+        with self._lock:
+            fila = self._conn.execute("SELECT regiones FROM plantillas WHERE huella = ? AND version = ?",
+                                      (huella, self.version)).fetchone()
+        if fila is None:
+            return None
+        plantilla = self._memoria[huella] = Plantilla(huella, self._regiones(fila[0]))
+        return plantilla
+
+    @staticmethod
+    def _regiones(datos: str) -> Dict[str, Optional[Caja]]:
+        return {clave: tuple(caja) if caja is not None else None for clave, caja in json.loads(datos).items()}
+
+    def guardar(self, plantilla: Plantilla):
+        """
+        Agrega a la plantilla del diseño las regiones aprendidas de una página
+        (las de otras ramas de las reglas, aprendidas antes o en otro proceso, se conservan).
+        """
+        with self._lock, self._conn:
+            fila = self._conn.execute("SELECT regiones FROM plantillas WHERE huella = ? AND version = ?",
+                                      (plantilla.huella, self.version)).fetchone()
+            regiones = {**(self._regiones(fila[0]) if fila else {}), **plantilla.regiones}
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plantillas (huella, version, regiones, creada) VALUES (?, ?, ?, ?)",
+                (plantilla.huella, self.version, json.dumps(regiones), time.time())
+            )
+        self._memoria[plantilla.huella] = Plantilla(plantilla.huella, regiones)
+        logger.info("Plantilla %s %s (%s regiones)", plantilla.huella,
+                    "ampliada" if fila else "aprendida", len(regiones))
+
+    def cerrar(self):
+        with self._lock:
+            self._conn.close()
+
+_registro: Optional[RegistroPlantillas] = None
+_registro_iniciado = False
+
+def registro() -> Optional[RegistroPlantillas]:
+    """Registro de plantillas de este proceso (None si están desactivadas o no se pudo abrir)."""
+    global _registro, _registro_iniciado
+    if not _registro_iniciado:
+        _registro_iniciado = True
+        from config import USAR_PLANTILLAS, PLANTILLAS_PATH
+        if USAR_PLANTILLAS:
+            # Las regiones dependen de cómo la extracción completa elige cada valor
+            # (la misma huella que la caché de resultados, ver service.py)
+            import parser
+            import extractor
+            import word_index
+            import plantillas
+            from cache import version_reglas
+            try:
+                _registro = RegistroPlantillas(PLANTILLAS_PATH,
+                                               version_reglas(parser, extractor, word_index, plantillas))
+            except sqlite3.Error as e:
+                logger.warning("No se pudo abrir el registro de plantillas (%s); se parsea sin plantillas", e)
+    return _registro
+
+# Usos de plantilla del acta en curso: [(huella, acierto)], como los tiempos de metrics.medir_etapas
+_usos_actuales: ContextVar[Optional[List[Tuple[str, bool]]]] = ContextVar("usos_plantillas", default=None)
+
+@contextmanager
+def medir_plantillas():
+    """Activa un colector de usos de plantilla para el bloque. Retorna la lista [(huella, acierto)]."""
+    usos: List[Tuple[str, bool]] = []
+    token = _usos_actuales.set(usos)
+    try:
+        yield usos
+    finally:
+        _usos_actuales.reset(token)
+
+def registrar_uso(huella: str, acierto: bool):
+    """Anota si los campos de una página se leyeron de la plantilla de su diseño."""
+    usos = _usos_actuales.get()
+    if usos is not None:
+        usos.append((huella, acierto))
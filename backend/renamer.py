@@ -24,14 +24,16 @@ def obtener_nombre_oficial(metadata: ActaMetadata) -> str:
         
     return limpiar_nombre(nombre_base + ".pdf")
 
-def obtener_ruta_organizacion(metadata: ActaMetadata, base_path: Path) -> Path:
+def obtener_ruta_organizacion(metadata: ActaMetadata, base_path: Path, crear_directorio: bool = True) -> Path:
     """
     Determina la ruta de destino basada en la estructura:
     /base_path/Año/Nivel/NombreOficial.pdf
+    Con crear_directorio=False solo calcula la ruta (la carpeta la crea quien escribe el acta).
     """
     # Estructura: /ActasProcesadas/Año/Nivel/
     nivel_dir = base_path / metadata.anio / metadata.nivel
-    nivel_dir.mkdir(parents=True, exist_ok=True)
+    if crear_directorio:
+        nivel_dir.mkdir(parents=True, exist_ok=True)
     
     nombre_final = obtener_nombre_oficial(metadata)
     return nivel_dir / nombre_final
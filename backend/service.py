@@ -1,116 +1,944 @@
 import os
-import io
+import json
+import asyncio
+import logging
 import shutil
-import zipfile
 import uuid
+import time
+import hashlib
+import mmap
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, BinaryIO, Dict, List, Optional, Set, Tuple
 from fastapi import UploadFile
-from parser import parsear_acta, ParsingError
-from models import ActaMetadata, ProcessResult, BatchProcessResponse
+import parser
+import extractor
+import word_index
+import plantillas
+from config import (STORAGE_ROOT, STAGING_ROOT, SUBIDAS_ROOT, UPLOAD_CHUNK_SIZE, CACHE_PATH, CACHE_MAX_BYTES,
+                    CATALOG_PATH, EXTRACCIONES_PATH, TIEMPOS_EN_RESPUESTA, MAX_ARCHIVOS_EN_CURSO,
+                    MAX_BYTES_EN_CURSO, ESPERA_ADMISION, REINTENTAR_EN, USAR_PLANTILLAS)
+from parser import ParsingError, recuperacion_por_nombre, reinterpretar
+from engine import ParsingEngine
+from uploads import SubidaReanudable, SubidaInvalida
+from admission import ControlAdmision, Permiso
+from splitter import (ActaEncontrada, bloques_de_paginas, paginas_en_worker, encabezados_en_worker,
+                      escribir_en_worker, agrupar_actas, nombre_parte, es_nombre_parte)
+from cache import ParseCache, version_reglas
+from catalog import Catalogo
+from archive import ArchivoIncremental
+from extracciones import RegistroExtracciones, InstantaneaInvalida, decodificar
+from jobs import Job, JobManager, ESTADOS_GUARDADOS, resumir_lote
+from metrics import Metricas, etapa, medir_etapas, sumar_etapas, motivo_error
+from models import (ActaMetadata, ProcessResult, BatchProcessResponse, EstadoCarga, ArchivoConocido, SubidaEstado,
+                    UsoPlantilla, CatalogoActa, CambioReparseo, ReparseoResponse)
 from renamer import obtener_ruta_organizacion, obtener_nombre_oficial
+from writer import EscritorActas
 
-STORAGE_ROOT = Path("ActasProcesadas")
+logger = logging.getLogger(__name__)
+
+def _volcar_a_disco(origen: BinaryIO, destino: Path) -> str:
+    """
+    Copia un archivo subido a disco por bloques, sin cargarlo entero en memoria.
+    Retorna el SHA-256 del contenido, calculado durante la misma copia.
+    """
+    sha256 = hashlib.sha256()
+    origen.seek(0)
+    with open(destino, "wb") as f:
+        while True:
+            bloque = origen.read(UPLOAD_CHUNK_SIZE)
+            if not bloque:
+                break
+            sha256.update(bloque)
+            f.write(bloque)
+    return sha256.hexdigest()
+
+def _hash_en_sitio(ruta: Path) -> str:
+    """SHA-256 de un archivo local leído con mmap, sin copiarlo a buffers de Python."""
+    with open(ruta, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()  # mmap no admite archivos vacíos
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            return hashlib.sha256(datos).hexdigest()
+
+def _contenido_en_disco(ruta: Path) -> Optional[str]:
+    """SHA-256 del archivo que ya ocupa `ruta`, o None si está libre."""
+    try:
+        return _hash_en_sitio(ruta)
+    except FileNotFoundError:
+        return None
+
+def descubrir_pdfs(origen: Path) -> List[Path]:
+    """Todos los PDF bajo una carpeta (recursivo), en orden estable."""
+    rutas = []
+    for root, dirs, files in os.walk(origen):
+        dirs.sort()
+        rutas.extend(Path(root) / f for f in sorted(files) if f.lower().endswith(".pdf"))
+    return rutas
+
+def _huella_de_reglas() -> str:
+    """
+    Versión de todo lo que decide la metadata de un acta: las reglas de parsing (parser,
+    extractor, word_index) y el aprendizaje y la lectura de plantillas.
+    """
+    return version_reglas(parser, extractor, word_index, plantillas)
+
+def _ms_desde(inicio: float) -> float:
+    return round((time.perf_counter() - inicio) * 1000, 1)
+
+def _clasificacion(metadata: ActaMetadata) -> tuple:
+    """Lo que decide el nombre oficial y la carpeta de un acta."""
+    return (metadata.anio, metadata.codigo_modular, metadata.anexo, metadata.nombre_ie, metadata.nivel,
+            metadata.grado_seccion, metadata.es_recuperacion)
+
+def _quitar_vacias(directorio: Path, niveles: int = 2):
+    """Borra las carpetas de nivel y de año que quedaron vacías (nunca el espacio de trabajo)."""
+    for _ in range(niveles):
+        try:
+            directorio.rmdir()
+        except OSError:
+            return  # no está vacía (o ya no existe)
+        directorio = directorio.parent
+
+@dataclass
+class ArchivoRecibido:
+    """Archivo (subido a staging o ya presente en el disco local) a la espera de ser parseado."""
+    nombre: str
+    ruta: Path
+    inicio: float
+    sha256: Optional[str] = None
+    error: Optional[str] = None  # si falló la recepción
+    colocacion: str = "staging"  # "staging" | "enlace" | "mover" (ver EscritorActas.colocar)
+    metadata: Optional[ActaMetadata] = None  # ya conocida (acta separada de un PDF consolidado)
+    modo: Optional[str] = None
+    extraccion: Optional[bytes] = None  # instantánea de su extracción (ya parseada al dividir)
+    tiempos: Dict[str, float] = field(default_factory=dict)  # segundos por etapa (ver metrics.ETAPAS)
+    tamano: int = 0  # bytes del original (lo que ocupa en el control de admisión)
 
 class ActaService:
     def __init__(self):
         # Asegurar que el directorio raíz existe
         STORAGE_ROOT.mkdir(exist_ok=True)
+        STAGING_ROOT.mkdir(parents=True, exist_ok=True)
+        # Pool de procesos para el parsing (se inicia con el primer lote)
+        self.engine = ParsingEngine()
+        # Escritura de las actas en su carpeta final: hilo propio, renombre atómico y fsync por lotes
+        self.escritor = EscritorActas()
+        # Caché persistente de resultados; se invalida sola al cambiar las reglas de parsing
+        # (parser, extractor, word_index) o el aprendizaje y la lectura de plantillas
+        self.cache: Optional[ParseCache] = None
+        if CACHE_MAX_BYTES > 0:
+            self.cache = ParseCache(CACHE_PATH, CACHE_MAX_BYTES, _huella_de_reglas())
+        # Catálogo de todas las actas guardadas (consultas por año, institución, nivel...)
+        self.catalogo = Catalogo(CATALOG_PATH)
+        # Lo extraído de cada acta guardada: permite reparsear sin volver a leer los PDF
+        self.extracciones = RegistroExtracciones(EXTRACCIONES_PATH)
+        # Sesiones de trabajo (cada una con su carpeta dentro de ActasProcesadas) y tareas pendientes
+        self.trabajos = JobManager(STORAGE_ROOT)
+        self._tareas: Set[asyncio.Task] = set()
+        # Tiempos por etapa y contadores de resultados (expuestos en /metrics)
+        self.metricas = Metricas()
+        # Límite de archivos y bytes en curso (las subidas en exceso esperan o reciben 429)
+        self.admision = ControlAdmision(MAX_ARCHIVOS_EN_CURSO, MAX_BYTES_EN_CURSO, ESPERA_ADMISION, REINTENTAR_EN)
 
-    async def procesar_lote_archivos(self, files: List[UploadFile]) -> BatchProcessResponse:
+    async def procesar_lote_archivos(self, files: List[UploadFile], trabajo: Job,
+                                     permiso: Optional[Permiso] = None) -> BatchProcessResponse:
         """
-        Procesa múltiples archivos UploadFile secuencialmente.
+        Procesa múltiples archivos UploadFile en paralelo sobre el pool de parsing,
+        dentro del espacio de trabajo indicado, y espera a que terminen todos.
+        Los resultados se devuelven en el mismo orden en que llegaron los archivos.
         """
-        # Limpiar procesamiento anterior para evitar mezclar datos si es necesario
-        # En una app multiusuario esto requeriría sesiones, para local/portátil
-        # usaremos una carpeta temporal por ejecución si fuera necesario, 
-        # pero aquí seguiremos el requisito de /ActasProcesadas/
-        
-        resultados = []
-        exitosos = 0
-        fallidos = 0
+        permiso, recibidos = await self._admitir_y_recibir(files, permiso)
+        indices = trabajo.reservar(len(recibidos))
+        por_archivo = await asyncio.gather(
+            *(self._procesar_admitido(trabajo, i, r, permiso) for i, r in zip(indices, recibidos))
+        )
+        resumen = resumir_lote([resultado for resultados in por_archivo for resultado in resultados])
+        resumen.trabajo_id = trabajo.id
+        logger.info("Lote: %s archivos, %s%% con extracción completa, latencia media %s ms",
+                    resumen.total_procesados, resumen.porcentaje_extraccion_completa,
+                    resumen.duracion_media_ms, extra={"trabajo": trabajo.id})
+        return resumen
+
+    async def procesar_lote_en_flujo(self, files: List[UploadFile], trabajo: Job,
+                                     permiso: Optional[Permiso] = None) -> AsyncIterator[str]:
+        """
+        Como procesar_lote_archivos, pero entrega el resultado de cada archivo apenas termina:
+        una línea JSON (NDJSON) por resultado y una última con el resumen del lote.
+        Los archivos se reciben antes de retornar (la petición cierra las subidas al responder).
+        Si el cliente se desconecta, el procesamiento sigue y los resultados quedan en el trabajo.
+        """
+        permiso, recibidos = await self._admitir_y_recibir(files, permiso)
+        indices = trabajo.reservar(len(recibidos))
+        tareas = []
+        for indice, recibido in zip(indices, recibidos):
+            tarea = asyncio.create_task(self._procesar_admitido(trabajo, indice, recibido, permiso))
+            self._tareas.add(tarea)
+            tarea.add_done_callback(self._tareas.discard)
+            tareas.append((indice, tarea))
+        return self._flujo_de_resultados(trabajo, tareas)
+
+    async def _flujo_de_resultados(self, trabajo: Job, tareas: List[Tuple[int, asyncio.Task]]) -> AsyncIterator[str]:
+        por_tarea = {tarea: indice for indice, tarea in tareas}
+        resultados: List[ProcessResult] = []
+        pendientes = set(por_tarea)
+        while pendientes:
+            terminadas, pendientes = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+            for tarea in terminadas:
+                for resultado in tarea.result():
+                    resultados.append(resultado)
+                    datos = {"tipo": "resultado", "indice": por_tarea[tarea],
+                             "resultado": resultado.model_dump(mode="json")}
+                    yield json.dumps(datos, ensure_ascii=False) + "\n"
+        resumen = resumir_lote(resultados)
+        resumen.trabajo_id = trabajo.id
+        logger.info("Lote: %s archivos, %s%% con extracción completa, latencia media %s ms",
+                    resumen.total_procesados, resumen.porcentaje_extraccion_completa,
+                    resumen.duracion_media_ms, extra={"trabajo": trabajo.id})
+        datos = {"tipo": "resumen", **resumen.model_dump(mode="json", exclude={"resultados"})}
+        yield json.dumps(datos, ensure_ascii=False) + "\n"
+
+    def crear_trabajo(self, total: Optional[int] = None, dividir: bool = False) -> Job:
+        """
+        Inicia una sesión nueva con su propio espacio de trabajo. Los espacios de las sesiones
+        más antiguas se borran en segundo plano, fuera del camino de la petición.
+        Con dividir=True, cada PDF consolidado se separa en un archivo por acta.
+        """
+        # La sesión anterior se conserva hasta la siguiente: sus actas se pueden enlazar
+        # a esta sin volver a subirlas (ver agregar_conocidos_a_trabajo)
+        anterior = self.trabajos.ultimo()
+        trabajo = self.trabajos.crear(total, dividir=dividir)
+        self._en_segundo_plano(self._limpiar_espacios_anteriores({anterior.id} if anterior else set()))
+        return trabajo
+
+    def _en_segundo_plano(self, corrutina):
+        tarea = asyncio.create_task(corrutina)
+        # Referencia fuerte: el event loop solo guarda referencias débiles a las tareas
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+
+    async def agregar_a_trabajo(self, trabajo: Job, files: List[UploadFile], permiso: Optional[Permiso] = None) -> int:
+        """
+        Recibe los archivos (volcado a staging) y deja su procesamiento en segundo plano.
+        Retorna en cuanto los archivos están en disco, sin esperar al parsing.
+        """
+        permiso, recibidos = await self._admitir_y_recibir(files, permiso)
+        for indice, recibido in zip(trabajo.reservar(len(recibidos)), recibidos):
+            self._en_segundo_plano(self._procesar_admitido(trabajo, indice, recibido, permiso))
+        return len(recibidos)
+
+    async def agregar_conocidos_a_trabajo(self, trabajo: Job, archivos: List[ArchivoConocido]) -> Tuple[int, List[str]]:
+        """
+        Agrega al trabajo, sin subirlos, los archivos cuyo contenido ya está guardado en el
+        servidor (según el catálogo): se enlazan desde esa copia y siguen el camino normal
+        (caché, nombre, ZIP). Retorna (archivos agregados, SHA-256 que el navegador debe subir).
+        Se puede repetir al reanudar: lo ya entregado a este trabajo no se agrega de nuevo.
+        """
+        nuevos = [a for a in archivos if (a.sha256, a.nombre) not in trabajo.entregados]
+        rutas = await asyncio.to_thread(self.catalogo.ubicaciones, [a.sha256 for a in nuevos])
+        # Se marcan antes de verificar (sin await de por medio): una consulta repetida
+        # en paralelo no los agrega dos veces
+        candidatos = [a for a in nuevos if a.sha256 in rutas and (a.sha256, a.nombre) not in trabajo.subidas
+                      and (a.sha256, a.nombre) not in trabajo.entregados]
+        trabajo.entregados.update((a.sha256, a.nombre) for a in candidatos)
+        recibidos = await asyncio.gather(*(self._recibir_conocido(a, rutas[a.sha256]) for a in candidatos))
+        conocidos = []
+        for archivo, recibido in zip(candidatos, recibidos):
+            if recibido is None:
+                trabajo.entregados.discard((archivo.sha256, archivo.nombre))
+            else:
+                conocidos.append(recibido)
+        for indice, recibido in zip(trabajo.reservar(len(conocidos)), conocidos):
+            self._en_segundo_plano(self._admitir_y_procesar(trabajo, indice, recibido))
+        disponibles = {r.sha256 for r in conocidos}
+        return len(conocidos), list(dict.fromkeys(
+            a.sha256 for a in nuevos if a.sha256 not in disponibles and (a.sha256, a.nombre) not in trabajo.entregados
+        ))
+
+    async def _recibir_conocido(self, archivo: ArchivoConocido, ruta: Path) -> Optional[ArchivoRecibido]:
+        """La copia guardada, si sigue en su lugar y con el mismo contenido (None si no)."""
+        recibido = await self._recibir_local(ruta, mover=False)
+        if recibido.error is not None or recibido.sha256 != archivo.sha256:
+            return None
+        try:
+            recibido.tamano = (await asyncio.to_thread(ruta.stat)).st_size
+        except OSError:
+            return None
+        recibido.nombre = archivo.nombre
+        return recibido
+
+    async def _admitir_y_procesar(self, trabajo: Job, indice: int, recibido: ArchivoRecibido):
+        # Archivo ya en disco (sin la petición que lo trajo esperando): espera su turno
+        # en lugar de rechazarse
+        permiso = await self.admision.admitir(1, recibido.tamano, esperar=True)
+        await self._procesar_admitido(trabajo, indice, recibido, permiso)
+
+    async def recibir_parte(self, trabajo: Job, sha256: str, nombre: str,
+                            rango: Tuple[int, int, int], datos: bytes) -> SubidaEstado:
+        """
+        Escribe una parte de una subida reanudable (rango = desde, hasta inclusive, total).
+        Con la última parte se verifica el SHA-256 y el archivo entra al trabajo como cualquier otro.
+        Lanza SubidaInvalida si la parte no continúa lo ya recibido o el contenido no coincide.
+        """
+        desde, hasta, total = rango
+        if hasta - desde + 1 != len(datos):
+            raise SubidaInvalida("El Content-Range no coincide con el tamaño de la parte", desde)
+        clave = (sha256, nombre)
+        subida = trabajo.subidas.get(clave)
+        if subida is None:
+            if clave in trabajo.entregados:
+                # Ya agregado (desde el catálogo o en un intento anterior): nada que escribir
+                return SubidaEstado(sha256=sha256, nombre=nombre, tamano=total, recibido=total, completa=True)
+            subida = SubidaReanudable(sha256, nombre, total, SUBIDAS_ROOT / trabajo.id / f"{uuid.uuid4().hex}.part")
+            trabajo.subidas[clave] = subida
+        if total != subida.tamano:
+            raise SubidaInvalida(f"El archivo se anunció con {subida.tamano} bytes", subida.recibido)
+        async with subida.lock:
+            if subida.completa:
+                return subida.estado()
+            inicio = time.perf_counter()
+            faltante = subida.recortar(desde, datos)
+            if faltante or subida.recibido == 0:  # la primera parte crea el archivo (aunque esté vacío)
+                await asyncio.to_thread(subida.escribir, faltante)
+            if subida.recibido >= subida.tamano:
+                await self._completar_subida(trabajo, subida, inicio)
+        return subida.estado()
+
+    def estado_subidas(self, trabajo: Job) -> List[SubidaEstado]:
+        """Subidas reanudables del trabajo y cuánto llegó de cada una (para continuar)."""
+        return [subida.estado() for subida in trabajo.subidas.values()]
+
+    async def _completar_subida(self, trabajo: Job, subida: SubidaReanudable, inicio: float):
+        if not await asyncio.to_thread(subida.verificar):
+            await asyncio.to_thread(subida.descartar)
+            raise SubidaInvalida("El contenido recibido no coincide con su SHA-256; se debe enviar de nuevo", 0)
+        recibido = ArchivoRecibido(
+            nombre=subida.nombre,
+            ruta=STAGING_ROOT / f"{uuid.uuid4().hex}.pdf",
+            inicio=inicio,
+            sha256=subida.sha256,
+            tamano=subida.tamano
+        )
+        await asyncio.to_thread(os.replace, subida.ruta, recibido.ruta)
+        subida.completa = True
+        trabajo.entregados.add((subida.sha256, subida.nombre))
+        indice, = trabajo.reservar(1)
+        self._en_segundo_plano(self._admitir_y_procesar(trabajo, indice, recibido))
+
+    async def agregar_ruta_a_trabajo(self, trabajo: Job, origen: Path, mover: bool = False) -> int:
+        """
+        Agrega al trabajo todos los PDF de una carpeta local. Los archivos se leen en su
+        lugar (sin subida ni staging) y se procesan en segundo plano como cualquier otro.
+        Con mover=False los originales quedan intactos y el destino es un hard link.
+        """
+        rutas = await asyncio.to_thread(descubrir_pdfs, origen)
+        for indice, ruta in zip(trabajo.reservar(len(rutas)), rutas):
+            self._en_segundo_plano(self._procesar_local(trabajo, indice, ruta, mover))
+        return len(rutas)
+
+    async def _procesar_local(self, trabajo: Job, indice: int, ruta: Path, mover: bool):
+        # Sin subida de por medio: la carpeta entra de a poco, a medida que hay lugar
+        try:
+            tamano = (await asyncio.to_thread(ruta.stat)).st_size
+        except OSError:
+            tamano = 0
+        permiso = await self.admision.admitir(1, tamano, esperar=True)
+        recibido = await self._recibir_local(ruta, mover)
+        recibido.tamano = tamano
+        await self._procesar_admitido(trabajo, indice, recibido, permiso)
+
+    async def _admitir_y_recibir(self, files: List[UploadFile],
+                                 permiso: Optional[Permiso] = None) -> Tuple[Permiso, List[ArchivoRecibido]]:
+        """
+        Reserva lugar para las subidas (o lanza Saturado) y recién entonces las vuelca a staging.
+        Las subidas HTTP ya llegan con `permiso` (admitidas antes de leer el cuerpo, ver
+        api.AdmisionSubidas): solo se ajusta a los archivos recibidos.
+        Cada archivo devuelve su parte del permiso al terminar (ver _procesar_admitido).
+        """
+        tamano = sum(file.size or 0 for file in files)
+        if permiso is None:
+            permiso = await self.admision.admitir(len(files), tamano)
+        else:
+            permiso.ajustar(len(files), tamano)
+        try:
+            recibidos = await asyncio.gather(*(self._recibir(file) for file in files))
+        except BaseException:
+            permiso.liberar_todo()
+            raise
+        return permiso, list(recibidos)
+
+    async def _procesar_admitido(self, trabajo: Job, indice: int, recibido: ArchivoRecibido,
+                                 permiso: Permiso) -> List[ProcessResult]:
+        try:
+            return await self._procesar_archivo(trabajo, indice, recibido)
+        finally:
+            permiso.liberar(1, recibido.tamano)
+
+    async def _procesar_archivo(self, trabajo: Job, indice: int, recibido: ArchivoRecibido) -> List[ProcessResult]:
+        """Procesa un archivo recibido; retorna un resultado por acta (varios si se dividió)."""
+        if trabajo.dividir and recibido.error is None:
+            return await self._procesar_dividiendo(trabajo, indice, recibido)
+        return [await self._procesar_en_trabajo(trabajo, indice, recibido)]
+
+    async def _procesar_dividiendo(self, trabajo: Job, indice: int, recibido: ArchivoRecibido) -> List[ProcessResult]:
+        """
+        Separa un PDF consolidado en un archivo por acta. Los encabezados se leen y parsean
+        en paralelo (rangos de páginas en el pool) y cada acta se escribe en staging
+        para seguir el camino normal: duplicados, nombre oficial y guardado.
+        """
+        try:
+            with medir_etapas(recibido.tiempos):
+                actas = await self._detectar_actas(recibido)
+        except Exception as e:
+            actas = []
+            recibido.error = str(e) if isinstance(e, ParsingError) else f"Error inesperado: {str(e)}"
+        if len(actas) <= 1:
+            # Un acta (o ninguna reconocible): el archivo se procesa entero, sin reescribirlo
+            if actas and actas[0].metadata is not None:
+                recibido.metadata = actas[0].metadata
+                recibido.modo = "completa" if actas[0].completa else "encabezado"
+                recibido.extraccion = actas[0].extraccion
+            elif recibido.error is not None and recibido.colocacion == "staging":
+                recibido.ruta.unlink(missing_ok=True)
+            return [await self._procesar_en_trabajo(trabajo, indice, recibido)]
+
+        # El trabajo no debe darse por terminado antes de registrar todas las actas
+        indices = [indice, *trabajo.reservar(len(actas) - 1)]
+        partes = [
+            ArchivoRecibido(
+                nombre=nombre_parte(recibido.nombre, acta),
+                ruta=STAGING_ROOT / f"{uuid.uuid4().hex}.pdf",
+                inicio=recibido.inicio,
+                error=acta.error,
+                metadata=acta.metadata,
+                modo="completa" if acta.completa else "encabezado",
+                extraccion=acta.extraccion,
+                tiempos=recibido.tiempos if i == 0 else {}
+            )
+            for i, acta in enumerate(actas)
+        ]
+        for parte in partes:
+            if parte.metadata is not None:
+                parte.metadata.archivo_original = parte.nombre
+        await self._escribir_partes(recibido, actas, partes)
+        try:
+            resultados = await asyncio.gather(
+                *(self._procesar_en_trabajo(trabajo, i, parte) for i, parte in zip(indices, partes))
+            )
+        finally:
+            if recibido.colocacion == "staging":
+                recibido.ruta.unlink(missing_ok=True)
+        # Al mover, el original se borra solo si todas sus actas quedaron en el destino
+        if recibido.colocacion == "mover" and all(r.estado in ESTADOS_GUARDADOS + ("duplicado",) for r in resultados):
+            await asyncio.to_thread(recibido.ruta.unlink, missing_ok=True)
+        return list(resultados)
+
+    async def _detectar_actas(self, recibido: ArchivoRecibido) -> List[ActaEncontrada]:
+        paginas = await self.engine.ejecutar(paginas_en_worker, str(recibido.ruta))
+        bloques = bloques_de_paginas(paginas, self.engine.workers)
+        por_bloque = await asyncio.gather(*(
+            self.engine.ejecutar(encabezados_en_worker, str(recibido.ruta), recibido.nombre,
+                                 desde, hasta, self.engine.rapido)
+            for desde, hasta in bloques
+        ))
+        encabezados = []
+        for encontrados, tiempos, usos in por_bloque:
+            encabezados.extend(encontrados)
+            sumar_etapas(tiempos)
+            self.metricas.registrar_plantillas(usos)
+        return agrupar_actas(encabezados, paginas)
+
+    async def _escribir_partes(self, recibido: ArchivoRecibido, actas: List[ActaEncontrada],
+                               partes: List[ArchivoRecibido]):
+        """Escribe en staging las actas reconocidas, repartidas entre los workers del pool."""
+        pendientes = [(acta, parte) for acta, parte in zip(actas, partes) if parte.error is None]
+        por_worker = max(1, -(-len(pendientes) // max(1, self.engine.workers)))
+        grupos = [pendientes[i:i + por_worker] for i in range(0, len(pendientes), por_worker)]
+        with medir_etapas(recibido.tiempos), etapa("escritura_disco"):
+            escritos = await asyncio.gather(*(
+                self.engine.ejecutar(escribir_en_worker, str(recibido.ruta),
+                                     [(acta.desde, acta.hasta, str(parte.ruta)) for acta, parte in grupo])
+                for grupo in grupos
+            ), return_exceptions=True)
+        for grupo, resultado in zip(grupos, escritos):
+            for i, (_, parte) in enumerate(grupo):
+                if isinstance(resultado, BaseException):
+                    parte.error = f"No se pudo escribir el acta: {str(resultado)}"
+                else:
+                    parte.sha256, parte.error = resultado[i]
+
+    async def _procesar_en_trabajo(self, trabajo: Job, indice: int, recibido: ArchivoRecibido) -> ProcessResult:
+        with medir_etapas(recibido.tiempos):
+            resultado = await self._procesar_recibido(recibido, trabajo)
+            if resultado.estado in ESTADOS_GUARDADOS and trabajo.archivo is not None:
+                with etapa("indice_zip"):
+                    await self._archivar(trabajo, resultado, recibido.sha256)
+            if resultado.metadata is not None:
+                # También los duplicados ya presentes en el destino (p. ej. otra ejecución de la CLI)
+                with etapa("catalogo"):
+                    await self._catalogar(trabajo, resultado, recibido.sha256)
+        self._registrar_resultado(trabajo, recibido, resultado)
+        trabajo.registrar(indice, resultado)
+        if trabajo.terminado:
+            resumen = trabajo.resumen()
+            logger.info("Trabajo %s: %s archivos, %s%% con extracción completa, latencia media %s ms",
+                        trabajo.id, resumen.total_procesados, resumen.porcentaje_extraccion_completa,
+                        resumen.duracion_media_ms, extra={"trabajo": trabajo.id})
+            if trabajo.archivo is not None:
+                await self._completar_archivo(trabajo)
+        return resultado
+
+    async def _completar_archivo(self, trabajo: Job):
+        """Escribe el directorio central del ZIP del trabajo (las descargas lo hacen igual al pedirlo)."""
+        try:
+            await asyncio.to_thread(trabajo.archivo.completar)
+        except Exception as e:
+            logger.warning("No se pudo completar el archivo del trabajo: %s", e,
+                           extra={"trabajo": trabajo.id, "etapa": "indice_zip"})
+
+    def _registrar_resultado(self, trabajo: Job, recibido: ArchivoRecibido, resultado: ProcessResult):
+        """Métricas y un registro estructurado por archivo terminado."""
+        error = motivo_error(resultado.mensaje or "") if resultado.estado == "error" else None
+        self.metricas.registrar(recibido.tiempos, time.perf_counter() - recibido.inicio, resultado.estado, error)
+        tiempos = {nombre: round(s * 1000, 1) for nombre, s in recibido.tiempos.items()}
+        if TIEMPOS_EN_RESPUESTA:
+            resultado.tiempos = tiempos
+        logger.log(
+            logging.WARNING if resultado.estado in ("error", "conflicto") else logging.INFO,
+            "%s -> %s" if resultado.estado == "exito" else "%s: %s",
+            recibido.nombre, resultado.nuevo_nombre if resultado.estado == "exito" else resultado.mensaje,
+            extra={"archivo": recibido.nombre, "trabajo": trabajo.id, "estado": resultado.estado,
+                   "modo": resultado.modo_extraccion, "duracion_ms": resultado.duracion_ms,
+                   "tiempos": tiempos, "motivo": error}
+        )
+
+    async def reparsear(self, simular: bool = False) -> ReparseoResponse:
+        """
+        Vuelve a aplicar las reglas de parser.py a todas las actas del catálogo desde sus
+        instantáneas (sin leer los PDF) y mueve o renombra, dentro de su espacio de trabajo,
+        las que ahora se clasifican distinto. Las actas sin instantánea se extraen una vez
+        en el pool y su instantánea queda guardada para el próximo reparseo.
+        Con simular=True solo informa qué cambiaría.
+        """
+        inicio = time.perf_counter()
+        filas = await asyncio.to_thread(self.catalogo.todas)
+        guardadas = await asyncio.to_thread(self.extracciones.obtener, [f.sha256 for f in filas])
+        nuevas = await asyncio.to_thread(self._reinterpretar, filas, guardadas)
+
+        # Sin instantánea (actas anteriores a las instantáneas o leídas de la caché): se extraen
+        pendientes = [i for i, (metadata, error) in enumerate(nuevas) if metadata is None and error is None]
+        existentes = await asyncio.to_thread(lambda: [Path(filas[i].ruta).exists() for i in pendientes])
+        reextraer = [i for i, existe in zip(pendientes, existentes) if existe]
+        extraidas = await asyncio.gather(*(self._reextraer(filas[i]) for i in reextraer))
+        for i, nueva in zip(reextraer, extraidas):
+            nuevas[i] = nueva
 
-        for file in files:
+        cambios: List[CambioReparseo] = []
+        reclasificar = []
+        archivados: Dict[Path, list] = {}
+        destinos: Dict[Path, Dict[Path, str]] = {}
+        for fila, (metadata, error) in zip(filas, nuevas):
+            if error is not None:
+                cambios.append(CambioReparseo(sha256=fila.sha256, archivo_original=fila.archivo_original,
+                                              anterior=fila.ruta, estado="error", mensaje=error))
+            elif metadata is not None and _clasificacion(metadata) != _clasificacion(ActaMetadata(**fila.model_dump())):
+                reclasificar.append(self._reclasificar(fila, metadata, simular, destinos, archivados))
+        # En paralelo: el escritor junta los movimientos en lotes (ver writer.py)
+        cambios.extend(await asyncio.gather(*reclasificar))
+        for directorio, movidas in archivados.items():
+            await self._actualizar_archivo(directorio, movidas)
+
+        resumen = ReparseoResponse(
+            simulado=simular,
+            revisadas=len(filas),
+            reextraidas=len(reextraer),
+            sin_datos=len(pendientes) - len(reextraer),
+            reclasificadas=sum(1 for c in cambios if c.estado != "error"),
+            errores=sum(1 for c in cambios if c.estado == "error"),
+            duracion_ms=_ms_desde(inicio),
+            cambios=cambios
+        )
+        logger.info("Reparseo%s: %s actas, %s reclasificadas, %s extraídas de nuevo, %s con error, en %s ms",
+                    " (simulado)" if simular else "", resumen.revisadas, resumen.reclasificadas,
+                    resumen.reextraidas, resumen.errores, resumen.duracion_ms)
+        return resumen
+
+    def _reinterpretar(self, filas: List[CatalogoActa],
+                       guardadas: Dict[str, bytes]) -> List[Tuple[Optional[ActaMetadata], Optional[str]]]:
+        """(metadata | None, error | None) por fila; (None, None) si hay que volver a extraer el PDF."""
+        resultados = []
+        for fila in filas:
+            datos = guardadas.get(fila.sha256)
+            try:
+                extraccion = decodificar(datos) if datos is not None else None
+            except InstantaneaInvalida:
+                extraccion = None
+            if extraccion is None:
+                resultados.append((None, None))
+                continue
             try:
-                # Leer el contenido del archivo en memoria para parsing
-                content = await file.read()
-                pdf_buffer = io.BytesIO(content)
-                
-                # 1. Parsear metadata
-                metadata = parsear_acta(pdf_buffer, file.filename)
-                
-                # 2. Obtener nombre oficial
+                resultados.append((reinterpretar(extraccion, fila.archivo_original, self.engine.rapido), None))
+            except ParsingError as e:
+                resultados.append((None, str(e)))
+        return resultados
+
+    async def _reextraer(self, fila: CatalogoActa) -> Tuple[Optional[ActaMetadata], Optional[str]]:
+        """Vuelve a leer el PDF guardado (en el pool) por el mismo camino por el que entró."""
+        try:
+            if not es_nombre_parte(fila.archivo_original):
+                metadata, _ = await self._parsear_en_pool(Path(fila.ruta), fila.archivo_original, fila.sha256)
+                return metadata, None
+            # Acta separada de un consolidado: su primer encabezado, con las reglas de la división
+            paginas = await self.engine.ejecutar(paginas_en_worker, fila.ruta)
+            encontradas, _, usos = await self.engine.ejecutar(encabezados_en_worker, fila.ruta, fila.archivo_original,
+                                                              0, paginas, self.engine.rapido)
+            self.metricas.registrar_plantillas(usos)
+            if not encontradas:
+                return None, "No se encontró el encabezado del acta"
+            _, metadata, _, error, extraccion = min(encontradas, key=lambda e: e[0])
+            if extraccion is not None:
+                await self._guardar_extraccion(fila.sha256, extraccion)
+            return metadata, error
+        except ParsingError as e:
+            return None, str(e)
+        except Exception as e:
+            return None, f"Error inesperado: {str(e)}"
+
+    async def _reclasificar(self, fila: CatalogoActa, metadata: ActaMetadata, simular: bool,
+                            destinos: Dict[Path, Dict[Path, str]], archivados: Dict[Path, list]) -> CambioReparseo:
+        """Lleva el acta a la ruta de su nueva clasificación y actualiza el catálogo."""
+        ruta = Path(fila.ruta)
+        # Espacio de trabajo: <directorio>/<año>/<nivel>/<acta>.pdf
+        directorio = ruta.parents[2]
+        metadata.nuevo_nombre = obtener_nombre_oficial(metadata)
+        cambio = CambioReparseo(sha256=fila.sha256, archivo_original=fila.archivo_original, anterior=fila.ruta,
+                                nueva=str(directorio / metadata.anio / metadata.nivel / metadata.nuevo_nombre),
+                                estado="simulada")
+        if simular:
+            return cambio
+        if not await asyncio.to_thread(ruta.exists):
+            # El espacio de trabajo ya se limpió: queda la clasificación nueva en el catálogo
+            cambio.estado, cambio.nueva = "catalogo", None
+            await asyncio.to_thread(self.catalogo.registrar, fila.sha256, ruta, metadata, fila.trabajo)
+            return cambio
+
+        trabajo = self.trabajos.por_directorio(directorio)
+        ocupadas = trabajo.destinos if trabajo is not None else destinos.setdefault(directorio, {})
+        ruta_final, estado = await self._reservar_destino(
+            ocupadas, obtener_ruta_organizacion(metadata, directorio, crear_directorio=False), fila.sha256
+        )
+        try:
+            if estado == "duplicado":
+                await asyncio.to_thread(ruta.unlink)
+            else:
+                await self.escritor.colocar(ruta, ruta_final, "mover")
+        except Exception as e:
+            if estado != "duplicado" and ocupadas.get(ruta_final) == fila.sha256:
+                del ocupadas[ruta_final]
+            cambio.estado, cambio.mensaje = "error", f"No se pudo mover el acta: {str(e)}"
+            return cambio
+        if ocupadas.get(ruta) == fila.sha256:
+            del ocupadas[ruta]
+        await asyncio.to_thread(_quitar_vacias, ruta.parent)
+        self.escritor.olvidar(ruta.parent.parent)
+
+        metadata.nuevo_nombre = ruta_final.name
+        await asyncio.to_thread(self.catalogo.registrar, fila.sha256, ruta_final, metadata, fila.trabajo)
+        archivados.setdefault(directorio, []).append((ruta, ruta_final if estado != "duplicado" else None, {
+            "archivo_original": fila.archivo_original,
+            "sha256": fila.sha256,
+            "metadata": metadata.model_dump(mode="json")
+        }))
+        cambio.nueva = str(ruta_final)
+        cambio.estado = "movida" if estado == "exito" else estado
+        return cambio
+
+    async def _actualizar_archivo(self, directorio: Path, movidas: list):
+        """Refleja en el ZIP y el manifiesto de un espacio de trabajo las actas movidas por el reparseo."""
+        trabajo = self.trabajos.por_directorio(directorio)
+        if trabajo is not None:
+            archivo = trabajo.archivo
+        else:
+            # Espacio de una sesión anterior (o de la CLI con --zip): solo si tiene ZIP
+            # (en el destino de la CLI, .indice existe siempre: guarda sus datos internos)
+            archivo = ArchivoIncremental(directorio)
+            if not await asyncio.to_thread(archivo.ruta_zip.exists):
+                archivo = None
+        if archivo is None:
+            return
+
+        def actualizar():
+            for anterior, nueva, datos in movidas:
+                archivo.quitar(anterior)
+                if nueva is not None:
+                    archivo.agregar(nueva, datos)
+            archivo.completar()
+        try:
+            await asyncio.to_thread(actualizar)
+        except Exception as e:
+            # Las actas ya están en su lugar; el archivo se reconstruye en la próxima operación
+            logger.warning("No se pudo actualizar el archivo de %s tras el reparseo: %s", directorio, e)
+
+    def estado_carga(self) -> EstadoCarga:
+        """Trabajo en curso y en espera frente a los límites configurados."""
+        return EstadoCarga(
+            archivos_en_curso=self.admision.archivos_en_curso,
+            bytes_en_curso=self.admision.bytes_en_curso,
+            max_archivos=self.admision.max_archivos,
+            max_bytes=self.admision.max_bytes,
+            solicitudes_en_espera=self.admision.en_espera,
+            parseos_en_curso=self.engine.en_curso,
+            parseos_en_espera=self.engine.en_espera,
+            max_parseos=self.engine.max_en_curso,
+            rechazos=self.admision.rechazos
+        )
+
+    def uso_plantillas(self) -> List[UsoPlantilla]:
+        usos = [
+            UsoPlantilla(plantilla=huella, aciertos=aciertos, fallos=fallos,
+                         tasa_aciertos=round(100 * aciertos / (aciertos + fallos), 1))
+            for huella, (aciertos, fallos) in self.metricas.plantillas().items()
+        ]
+        return sorted(usos, key=lambda u: u.aciertos + u.fallos, reverse=True)
+
+    def exportar_metricas(self) -> str:
+        """Métricas en el formato de texto de Prometheus (para /metrics)."""
+        cache = (self.cache.aciertos, self.cache.fallos) if self.cache is not None else None
+        return self.metricas.exportar(cache, self.estado_carga())
+
+    async def _archivar(self, trabajo: Job, resultado: ProcessResult, sha256: str):
+        """Agrega el acta guardada al ZIP y al manifiesto del espacio de trabajo."""
+        datos = {
+            "archivo_original": resultado.archivo,
+            "sha256": sha256,
+            "metadata": resultado.metadata.model_dump(mode="json")
+        }
+        try:
+            await asyncio.to_thread(trabajo.archivo.agregar, Path(resultado.ruta_final), datos)
+        except Exception as e:
+            # El acta ya está en su carpeta; el archivo se reconstruye en la próxima operación
+            logger.warning("No se pudo agregar %s al archivo del trabajo: %s", resultado.nuevo_nombre, e,
+                           extra={"archivo": resultado.archivo, "trabajo": trabajo.id, "etapa": "indice_zip"})
+
+    async def _catalogar(self, trabajo: Job, resultado: ProcessResult, sha256: str):
+        try:
+            await asyncio.to_thread(self.catalogo.registrar, sha256, Path(resultado.ruta_final),
+                                    resultado.metadata, trabajo.id)
+        except Exception as e:
+            # El acta ya está guardada: solo falta en las consultas del catálogo
+            logger.warning("No se pudo registrar %s en el catálogo: %s", resultado.nuevo_nombre, e,
+                           extra={"archivo": resultado.archivo, "trabajo": trabajo.id, "etapa": "catalogo"})
+
+    async def _limpiar_espacios_anteriores(self, conservar: Set[str] = frozenset()):
+        """Borra los espacios de trabajo de sesiones que ya no están en uso (salvo `conservar`)."""
+        entradas = await asyncio.to_thread(lambda: [e for e in STORAGE_ROOT.iterdir() if e.is_dir()])
+        for entrada in entradas:
+            # Se consulta justo antes de borrar: una sesión pudo empezar mientras tanto
+            if entrada.name not in self.trabajos.en_uso() and entrada.name not in conservar:
+                await asyncio.to_thread(shutil.rmtree, entrada, ignore_errors=True)
+                self.escritor.olvidar(entrada)
+                # Partes de subidas que quedaron sin terminar en esa sesión
+                await asyncio.to_thread(shutil.rmtree, SUBIDAS_ROOT / entrada.name, ignore_errors=True)
+
+    async def _recibir(self, file: UploadFile) -> ArchivoRecibido:
+        """Vuelca la subida a un archivo de staging y calcula su SHA-256."""
+        # Archivo de staging en el mismo disco que ActasProcesadas (el destino final es un rename)
+        recibido = ArchivoRecibido(
+            nombre=file.filename,
+            ruta=STAGING_ROOT / f"{uuid.uuid4().hex}.pdf",
+            inicio=time.perf_counter(),
+            tamano=file.size or 0
+        )
+        try:
+            # Volcar la subida a disco por bloques (sin mantener el PDF en memoria)
+            with medir_etapas(recibido.tiempos), etapa("lectura_subida"):
+                recibido.sha256 = await asyncio.to_thread(_volcar_a_disco, file.file, recibido.ruta)
+        except Exception as e:
+            recibido.ruta.unlink(missing_ok=True)
+            recibido.error = f"Error inesperado: {str(e)}"
+        finally:
+            await file.close()
+        return recibido
+
+    async def _recibir_local(self, ruta: Path, mover: bool) -> ArchivoRecibido:
+        """Registra un PDF del disco local sin copiarlo: solo se calcula su SHA-256."""
+        recibido = ArchivoRecibido(
+            nombre=ruta.name,
+            ruta=ruta,
+            inicio=time.perf_counter(),
+            colocacion="mover" if mover else "enlace"
+        )
+        try:
+            with medir_etapas(recibido.tiempos), etapa("lectura_subida"):
+                recibido.sha256 = await asyncio.to_thread(_hash_en_sitio, ruta)
+        except Exception as e:
+            recibido.error = f"No se pudo leer el archivo: {str(e)}"
+        return recibido
+
+    async def _procesar_recibido(self, recibido: ArchivoRecibido, trabajo: Job) -> ProcessResult:
+        """Procesa un archivo ya recibido: parsing en el pool, renombrado y guardado en el trabajo."""
+        if recibido.error is not None:
+            return ProcessResult(
+                archivo=recibido.nombre,
+                estado="error",
+                mensaje=recibido.error,
+                duracion_ms=_ms_desde(recibido.inicio)
+            )
+        reclamado = False
+        ruta_final = None
+        try:
+            # 0. Contenido ya recibido en este trabajo: se omite antes de parsear
+            anterior = trabajo.reclamar_contenido(recibido.sha256, recibido.nombre)
+            if anterior is not None:
+                return ProcessResult(
+                    archivo=recibido.nombre,
+                    estado="duplicado",
+                    mensaje=f"Mismo contenido que {anterior}; no se volvió a procesar",
+                    duracion_ms=_ms_desde(recibido.inicio)
+                )
+            reclamado = True
+
+            # 1. Parsear metadata desde el archivo recibido (caché o proceso del pool)
+            if recibido.metadata is not None:
+                metadata, modo = recibido.metadata, recibido.modo
+                if recibido.extraccion is not None:
+                    await self._guardar_extraccion(recibido.sha256, recibido.extraccion)
+            else:
+                metadata, modo = await self._parsear(recibido.ruta, recibido.nombre, recibido.sha256)
+            
+            # 2. Obtener nombre oficial
+            with etapa("nombrado"):
                 nombre_oficial = obtener_nombre_oficial(metadata)
-                metadata.nuevo_nombre = nombre_oficial
-                print(f"[*] Archivo: {file.filename}")
-                print(f"[*] Metadata.ie: {metadata.nombre_ie}")
-                print(f"[*] Nombre oficial: {nombre_oficial} (len: {len(nombre_oficial)})")
-                
-                # 3. Determinar ruta de destino y organizar
-                ruta_final = obtener_ruta_organizacion(metadata, STORAGE_ROOT)
-                print(f"[*] Ruta final: {ruta_final}")
-                
-                # 4. Guardar archivo
-                with open(ruta_final, "wb") as f:
-                    f.write(content)
-                
-                resultados.append(ProcessResult(
-                    archivo=file.filename,
-                    estado="exito",
+            metadata.nuevo_nombre = nombre_oficial
+            logger.debug("%s: IE %s, nombre oficial %s (len: %s)", recibido.nombre,
+                         metadata.nombre_ie, nombre_oficial, len(nombre_oficial))
+            
+            # 3. Determinar ruta de destino sin pisar otra acta con el mismo nombre
+            with etapa("nombrado"):
+                ruta_oficial = obtener_ruta_organizacion(metadata, trabajo.directorio, crear_directorio=False)
+                ruta_final, estado = await self._reservar_destino(trabajo.destinos, ruta_oficial, recibido.sha256)
+            logger.debug("%s: ruta final %s (%s)", recibido.nombre, ruta_final, estado)
+            if estado == "duplicado":
+                return ProcessResult(
+                    archivo=recibido.nombre,
+                    estado="duplicado",
+                    mensaje=f"{ruta_final.name} ya existe con el mismo contenido",
                     metadata=metadata,
-                    nuevo_nombre=nombre_oficial,
-                    ruta_final=str(ruta_final)
-                ))
-                exitosos += 1
+                    nuevo_nombre=ruta_final.name,
+                    ruta_final=str(ruta_final),
+                    modo_extraccion=modo,
+                    duracion_ms=_ms_desde(recibido.inicio)
+                )
+            
+            # 4. Llevar el archivo a su ubicación final (rename o hard link, sin segunda copia),
+            # en la etapa de escritura: carpeta, fsync por lotes y renombre atómico
+            with etapa("escritura_disco"):
+                await self.escritor.colocar(recibido.ruta, ruta_final, recibido.colocacion)
+            
+            return ProcessResult(
+                archivo=recibido.nombre,
+                estado=estado,
+                mensaje=(f"Otra acta ya se llama {ruta_oficial.name}; se guardó como {ruta_final.name}"
+                         if estado == "conflicto" else None),
+                metadata=metadata,
+                nuevo_nombre=ruta_final.name,
+                ruta_final=str(ruta_final),
+                modo_extraccion=modo,
+                duracion_ms=_ms_desde(recibido.inicio)
+            )
 
-            except ParsingError as e:
-                resultados.append(ProcessResult(
-                    archivo=file.filename,
-                    estado="error",
-                    mensaje=str(e)
-                ))
-                fallidos += 1
-            except Exception as e:
-                resultados.append(ProcessResult(
-                    archivo=file.filename,
-                    estado="error",
-                    mensaje=f"Error inesperado: {str(e)}"
-                ))
-                fallidos += 1
-            finally:
-                # El puntero ya se leyó, no es necesario seek(0) aquí si no se vuelve a usar el mismo UploadFile
-                pass
-
-        return BatchProcessResponse(
-            resultados=resultados,
-            total_procesados=len(files),
-            exitosos=exitosos,
-            fallidos=fallidos
+        except ParsingError as e:
+            mensaje = str(e)
+        except Exception as e:
+            mensaje = f"Error inesperado: {str(e)}"
+        finally:
+            # Si el archivo no llegó a su destino, descartar el temporal (nunca el original local)
+            if recibido.colocacion == "staging":
+                recibido.ruta.unlink(missing_ok=True)
+        # Falló: se liberan el contenido y la ruta reservados para que una nueva subida se reintente
+        if reclamado:
+            trabajo.liberar_contenido(recibido.sha256)
+        if ruta_final is not None and trabajo.destinos.get(ruta_final) == recibido.sha256:
+            del trabajo.destinos[ruta_final]
+        return ProcessResult(
+            archivo=recibido.nombre,
+            estado="error",
+            mensaje=mensaje,
+            duracion_ms=_ms_desde(recibido.inicio)
         )
 
-    def generar_zip(self) -> str:
+    async def _reservar_destino(self, destinos: Dict[Path, str], ruta: Path, sha256: str) -> Tuple[Path, str]:
         """
-        Genera un archivo ZIP con toda la estructura de ActasProcesadas.
-        Retorna la ruta al archivo ZIP generado.
+        Elige dónde guardar el acta sin sobrescribir otra. Retorna (ruta, estado):
+        la ruta oficial si está libre ("exito"), la que ya tiene este mismo contenido
+        ("duplicado") o la primera "<nombre> (n).pdf" libre ("conflicto").
         """
-        zip_filename = f"Actas_Procesadas_{uuid.uuid4().hex[:8]}.zip"
-        zip_path = Path(zip_filename)
+        candidata, numero = ruta, 2
+        while True:
+            ocupante = destinos.get(candidata)
+            if ocupante is None:
+                # Acta de una ejecución anterior sobre el mismo destino (p. ej. la CLI):
+                # el disco se consulta fuera del event loop
+                contenido = await asyncio.to_thread(_contenido_en_disco, candidata)
+                # Otra tarea pudo reservar la ruta durante la consulta: vale su reserva
+                ocupante = destinos.get(candidata)
+                if ocupante is None and contenido is not None:
+                    ocupante = destinos[candidata] = contenido
+            if ocupante is None:
+                # Sin await entre la consulta y la reserva: ninguna otra tarea toma la misma ruta
+                destinos[candidata] = sha256
+                return candidata, "exito" if candidata == ruta else "conflicto"
+            if ocupante == sha256:
+                return candidata, "duplicado"
+            candidata = ruta.with_name(f"{ruta.stem} ({numero}){ruta.suffix}")
+            numero += 1
+
+    async def _parsear(self, ruta_pdf: Path, nombre_original: str, sha256: str) -> Tuple[ActaMetadata, str]:
+        """
+        Obtiene la metadata desde la caché o, si no está, parseando el PDF en el pool.
+        Retorna: (metadata, modo de extracción: "cache" | "encabezado" | "completa")
+        """
+        if self.cache is None:
+            metadata, completa = await self._parsear_en_pool(ruta_pdf, nombre_original, sha256)
+            return metadata, "completa" if completa else "encabezado"
         
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(STORAGE_ROOT):
-                for file in files:
-                    file_path = Path(root) / file
-                    # El nombre en el zip debe ser relativo a STORAGE_ROOT
-                    arcname = file_path.relative_to(STORAGE_ROOT)
-                    zipf.write(file_path, arcname)
+        # El marcador [REC] del nombre, el modo rápido y las plantillas también influyen en el resultado
+        variante = ("rec" if recuperacion_por_nombre(nombre_original) else "") + \
+                   ("|rapido" if self.engine.rapido else "|completo") + \
+                   ("|plantillas" if USAR_PLANTILLAS else "")
+        with etapa("consulta_cache"):
+            metadata = await asyncio.to_thread(self.cache.obtener, sha256, variante, nombre_original)
+        if metadata is not None:
+            logger.debug("Caché: %s ya fue parseado (sin pdfplumber)", nombre_original)
+            return metadata, "cache"
         
-        return str(zip_path)
+        metadata, completa = await self._parsear_en_pool(ruta_pdf, nombre_original, sha256)
+        await asyncio.to_thread(self.cache.guardar, sha256, variante, metadata)
+        return metadata, "completa" if completa else "encabezado"
 
-    def limpiar_procesados(self):
-        """Limpia la carpeta de procesados."""
-        if STORAGE_ROOT.exists():
-            shutil.rmtree(STORAGE_ROOT)
-        STORAGE_ROOT.mkdir(exist_ok=True)
+    async def _parsear_en_pool(self, ruta_pdf: Path, nombre_original: str, sha256: str) -> Tuple[ActaMetadata, bool]:
+        metadata, completa, tiempos, usos, extraccion = await self.engine.parsear(ruta_pdf, nombre_original)
+        # Las etapas de apertura, extracción y parsing se midieron dentro del worker
+        sumar_etapas(tiempos)
+        self.metricas.registrar_plantillas(usos)
+        await self._guardar_extraccion(sha256, extraccion)
+        return metadata, completa
+
+    async def _guardar_extraccion(self, sha256: str, datos: bytes):
+        try:
+            await asyncio.to_thread(self.extracciones.guardar, sha256, datos)
+        except Exception as e:
+            # Sin instantánea, un reparseo futuro vuelve a extraer esta acta
+            logger.warning("No se pudo guardar la extracción de %s: %s", sha256[:12], e)
+
+    def cerrar(self):
+        """Libera los procesos del motor de parsing y la caché."""
+        self.engine.cerrar()
+        self.escritor.cerrar()
+        if self.cache is not None:
+            self.cache.cerrar()
+        self.catalogo.cerrar()
+        self.extracciones.cerrar()
 
 # Instancia singleton del servicio
 acta_service = ActaService()
@@ -0,0 +1,169 @@
+"""
+División de PDF consolidados (exportaciones del SIAGIE con un acta por sección) en un PDF por acta.
+
+Las páginas se recorren de a una con pdfium: de cada una solo se lee el texto del encabezado
+para saber si inicia un acta. Los rangos de páginas se reparten entre los procesos del pool,
+y cada acta se escribe copiando sus páginas a un documento nuevo (sin rasterizar ni cargar
+el PDF completo en memoria).
+"""
+import io
+import re
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from models import ActaMetadata
+from metrics import medir_etapas
+from plantillas import medir_plantillas
+from extracciones import capturar, codificar
+
+# Nombre de referencia de las actas extraídas de un consolidado (ver nombre_parte)
+RE_NOMBRE_PARTE = re.compile(r' \[págs\. \d+-\d+\]\.pdf$')
+
+# Páginas mínimas por tarea: con menos, abrir el documento en otro proceso cuesta más que leerlas
+MIN_PAGINAS_POR_BLOQUE = 16
+
+@dataclass
+class ActaEncontrada:
+    """Acta dentro de un PDF consolidado: páginas [desde, hasta) y su metadata (o el error)."""
+    desde: int
+    hasta: int
+    metadata: Optional[ActaMetadata] = None
+    completa: bool = False
+    error: Optional[str] = None
+    extraccion: Optional[bytes] = None  # instantánea de la página que la inicia (ver extracciones.py)
+
+def bloques_de_paginas(paginas: int, workers: int) -> List[Tuple[int, int]]:
+    """Reparte [0, paginas) en rangos contiguos, uno por worker (sin bajar de MIN_PAGINAS_POR_BLOQUE)."""
+    tamano = max(MIN_PAGINAS_POR_BLOQUE, -(-paginas // max(1, workers)))
+    return [(inicio, min(inicio + tamano, paginas)) for inicio in range(0, paginas, tamano)]
+
+def paginas_en_worker(ruta_pdf: str) -> int:
+    """Punto de entrada en el proceso worker: cantidad de páginas del PDF."""
+    from parser import contar_paginas
+    with open(ruta_pdf, "rb") as pdf_file:
+        return contar_paginas(pdf_file)
+
+def encabezados_en_worker(ruta_pdf: str, nombre_original: str, desde: int, hasta: int,
+                          rapido: bool) -> Tuple[list, Dict[str, float], list]:
+    """
+    Punto de entrada en el proceso worker: páginas del rango que inician un acta, ya parseadas.
+    Retorna: ([(página, metadata | None, usó_extracción_completa, error | None, instantánea | None)],
+              segundos_por_etapa, usos_de_plantilla)
+    """
+    from parser import (inicios_de_acta, es_titulo_de_recuperacion, parsear_acta_completo,
+                        parsear_acta_rapido, ParsingError)
+    encontradas = []
+    with medir_etapas() as tiempos, medir_plantillas() as usos, \
+            open(ruta_pdf, "rb") as recorrido, open(ruta_pdf, "rb") as pdf_file:
+        # El recorrido usa su propio descriptor: cada acta se parsea apenas aparece y la
+        # plantilla aprendida con la primera ya sirve para las siguientes del mismo rango.
+        # En modo rápido la plantilla solo se consulta si falla la pasada por el texto.
+        for pagina, encabezado in inicios_de_acta(recorrido, desde, hasta, con_plantilla=not rapido):
+            try:
+                with capturar(division=True) as extraccion:
+                    if rapido:
+                        metadata, completa = parsear_acta_rapido(pdf_file, nombre_original, pagina, encabezado)
+                    else:
+                        metadata, completa = parsear_acta_completo(pdf_file, nombre_original, pagina, encabezado)
+                if es_titulo_de_recuperacion(encabezado.texto):
+                    metadata.es_recuperacion = True
+                encontradas.append((pagina, metadata, completa, None, codificar(extraccion)))
+            except ParsingError as e:
+                encontradas.append((pagina, None, False, str(e), None))
+    return encontradas, tiempos, usos
+
+def _clave(metadata: ActaMetadata) -> tuple:
+    return (metadata.anio, metadata.codigo_modular, metadata.anexo, metadata.nivel,
+            metadata.grado_seccion, metadata.es_recuperacion)
+
+def agrupar_actas(encabezados: list, paginas: int) -> List[ActaEncontrada]:
+    """
+    Convierte las páginas con encabezado en actas. Las actas con muchas áreas repiten el
+    encabezado en cada hoja: páginas seguidas con la misma metadata son la misma acta.
+    Las páginas previas al primer encabezado (p. ej. una carátula) van con la primera acta.
+    """
+    actas: List[ActaEncontrada] = []
+    for pagina, metadata, completa, error, extraccion in sorted(encabezados, key=lambda e: e[0]):
+        anterior = actas[-1] if actas else None
+        if (anterior is not None and metadata is not None and anterior.metadata is not None
+                and _clave(anterior.metadata) == _clave(metadata)):
+            anterior.completa = anterior.completa or completa
+            continue
+        if anterior is not None:
+            anterior.hasta = pagina
+        actas.append(ActaEncontrada(desde=pagina if actas else 0, hasta=paginas, metadata=metadata,
+                                    completa=completa, error=error, extraccion=extraccion))
+    return actas
+
+# Lo que pdfium cambia en cada guardado: la fecha de creación (la hora actual) y el
+# identificador del trailer (al azar)
+RE_FECHA_CREACION = re.compile(rb'/CreationDate\s*\(D:(\d{14})')
+RE_ID_TRAILER = re.compile(rb'/ID\s*\[\s*<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*\]')
+FECHA_POR_DEFECTO = b"19700101000000"
+
+def _fecha_de_origen(documento) -> bytes:
+    """Fecha de creación del consolidado (AAAAMMDDHHMMSS), o una fija si no la declara."""
+    fecha = (documento.get_metadata_value("CreationDate") or "").encode("ascii", "ignore")
+    return fecha[2:16] if re.fullmatch(rb'D:\d{14}.*', fecha) else FECHA_POR_DEFECTO
+
+def _determinista(datos: bytes, fecha: bytes) -> bytes:
+    """
+    Fija la fecha de creación (la del consolidado) y reemplaza el /ID por uno derivado del
+    contenido, sin cambiar longitudes (las posiciones del xref siguen valiendo). Así la misma
+    acta produce siempre los mismos bytes y el índice de duplicados la reconoce al volver
+    a dividir el mismo consolidado.
+    """
+    fecha_nueva = RE_FECHA_CREACION.search(datos)
+    if fecha_nueva is not None:
+        datos = datos[:fecha_nueva.start(1)] + fecha + datos[fecha_nueva.end(1):]
+    coincidencias = list(RE_ID_TRAILER.finditer(datos))
+    if not coincidencias:
+        return datos
+    ultima = coincidencias[-1]
+    inicio, fin = ultima.span()
+    huella = hashlib.md5(datos[:inicio] + datos[fin:]).hexdigest().upper().encode()
+    nuevo_id = ultima.group(0).replace(ultima.group(1), huella[:len(ultima.group(1))])
+    nuevo_id = nuevo_id.replace(ultima.group(2), huella[:len(ultima.group(2))])
+    return datos[:inicio] + nuevo_id + datos[fin:]
+
+def escribir_en_worker(ruta_pdf: str, partes: List[Tuple[int, int, str]]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Punto de entrada en el proceso worker: escribe cada rango de páginas [desde, hasta)
+    como un PDF nuevo en la ruta indicada. Retorna [(sha256 | None, error | None)] por parte.
+    """
+    import pypdfium2 as pdfium
+    resultados = []
+    origen = pdfium.PdfDocument(ruta_pdf)
+    try:
+        fecha = _fecha_de_origen(origen)
+        for desde, hasta, destino in partes:
+            try:
+                # Cada acta son unas pocas páginas: se arma en memoria y se escribe de una vez
+                nuevo = pdfium.PdfDocument.new()
+                salida = io.BytesIO()
+                try:
+                    nuevo.import_pages(origen, list(range(desde, hasta)))
+                    nuevo.save(salida)
+                finally:
+                    nuevo.close()
+                datos = _determinista(salida.getvalue(), fecha)
+                with open(destino, "wb") as f:
+                    f.write(datos)
+                resultados.append((hashlib.sha256(datos).hexdigest(), None))
+            except Exception as e:
+                Path(destino).unlink(missing_ok=True)
+                resultados.append((None, f"No se pudo escribir el acta: {str(e)}"))
+    finally:
+        origen.close()
+    return resultados
+
+def nombre_parte(nombre_original: str, acta: ActaEncontrada) -> str:
+    """Nombre de referencia de un acta extraída: 'consolidado [págs. 5-8].pdf'."""
+    base = nombre_original[:-4] if nombre_original.lower().endswith(".pdf") else nombre_original
+    return f"{base} [págs. {acta.desde + 1}-{acta.hasta}].pdf"
+
+def es_nombre_parte(nombre: str) -> bool:
+    """Indica si el nombre es el de un acta extraída de un consolidado."""
+    return RE_NOMBRE_PARTE.search(nombre) is not None
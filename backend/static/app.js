@@ -42,8 +42,11 @@ fileInput.addEventListener('change', (e) => handleFiles(e.target.files), false);
 // However, I'll comment out the generic dropZone click to force user to use the specific buttons.
 // dropZone.addEventListener('click', () => folderInput.click());
 
+// Sesión (trabajo) cuyos resultados se muestran y se descargan
+let trabajoActual = null;
+
 btnDownload.addEventListener('click', () => {
-    window.location.href = '/descargar';
+    window.location.href = trabajoActual ? `/descargar?trabajo=${trabajoActual}` : '/descargar';
 });
 
 // --- Handlers ---
@@ -81,42 +84,376 @@ async function handleFiles(files) {
 
     let exitososTotal = 0;
     let fallidosTotal = 0;
-    const batchSize = 10;
+    let procesados = 0;
+    // Lotes chicos: una sola petición. Lotes grandes: sesión con partes en paralelo (ver subirAdaptativo)
+    const chunkSize = 50;
     const totalFiles = pdfFiles.length;
+    let totalEsperado = totalFiles;
 
-    for (let i = 0; i < totalFiles; i += batchSize) {
-        const batch = pdfFiles.slice(i, i + batchSize);
+    const formDataDe = (desde) => {
         const formData = new FormData();
-        batch.forEach(file => formData.append('files', file));
-
-        const currentStep = i + batch.length;
-        updateProgress(Math.round((i / totalFiles) * 100), `Procesando lote ${Math.floor(i / batchSize) + 1}... (${currentStep}/${totalFiles})`);
-
+        pdfFiles.slice(desde, desde + chunkSize).forEach(file => formData.append('files', file));
+        return formData;
+    };
+
+    const registrar = (resultado) => {
+        procesados++;
+        // Los duplicados no se guardan de nuevo pero tampoco son errores
+        if (resultado.estado === 'error') fallidosTotal++; else exitososTotal++;
+        appendResults([resultado], exitososTotal, fallidosTotal);
+        updateProgress(Math.round((procesados / totalEsperado) * 100),
+            `Procesando... (${procesados}/${totalEsperado})`);
+    };
+
+    updateProgress(0, `Subiendo archivos... (0/${totalFiles})`);
+
+    // Un lote que cabe en una sola parte va en una petición, con los resultados en flujo
+    if (totalFiles <= chunkSize) {
         try {
-            const response = await fetch('/procesar-carpeta', {
-                method: 'POST',
-                body: formData
+            const response = await enviarConReintento('/procesar-carpeta?formato=ndjson', formDataDe(0));
+            if (!response.ok) {
+                const errorData = await response.json();
+                throw new Error(errorData.detail || "Error al subir archivos");
+            }
+            await leerNDJSON(response, (linea) => {
+                if (linea.tipo === 'resultado') {
+                    registrar(linea.resultado);
+                } else if (linea.tipo === 'resumen') {
+                    trabajoActual = linea.trabajo_id;
+                }
             });
+            updateProgress(100, "¡Todo el procesamiento completado!");
+        } catch (error) {
+            console.error(error);
+            alert(`Error en el procesamiento: ${error.message}`);
+        }
+        return;
+    }
 
+    let eventos = null;
+    try {
+        // 1. SHA-256 de cada archivo (en el navegador): el servidor no recibe lo que ya tiene
+        //    y cada archivo se sube por partes que se pueden reanudar
+        const huellas = await calcularHuellas(pdfFiles, (listas) => {
+            updateProgress(0, `Calculando huellas... (${listas}/${totalFiles})`);
+        });
+        // Mismo nombre y contenido dos veces (otra subcarpeta): se envía una sola vez
+        const entradas = [];
+        const vistas = new Set();
+        pdfFiles.forEach((file, i) => {
+            const clave = huellas ? `${huellas[i]}|${file.name}` : `${i}`;
+            if (vistas.has(clave)) return;
+            vistas.add(clave);
+            entradas.push({ file, huella: huellas ? huellas[i] : null });
+        });
+        totalEsperado = entradas.length;
+
+        // 2. Retomar la sesión interrumpida de esta misma selección o crear una nueva
+        const firma = huellas ? await firmaDeSeleccion(entradas) : null;
+        let trabajoId = firma ? await sesionPendiente(firma) : null;
+        if (!trabajoId) {
+            const inicial = new FormData();
+            inicial.append('total', totalEsperado);
+            const response = await enviarConReintento('/trabajos', inicial);
             if (!response.ok) {
                 const errorData = await response.json();
-                throw new Error(errorData.detail || "Error en el procesamiento del lote");
+                throw new Error(errorData.detail || "No se pudo crear el trabajo");
+            }
+            trabajoId = (await response.json()).trabajo_id;
+            if (firma) guardarSesion(firma, trabajoId);
+        }
+        trabajoActual = trabajoId;
+
+        // Escuchar los resultados mientras se suben los archivos (al retomar, se repiten
+        // desde el principio los que ya estaban listos)
+        const terminado = new Promise((resolve, reject) => {
+            eventos = new EventSource(`/trabajos/${trabajoId}/eventos`);
+            eventos.addEventListener('resultado', (e) => {
+                const { resultado } = JSON.parse(e.data);
+                registrar(resultado);
+            });
+            eventos.addEventListener('fin', () => {
+                eventos.close();
+                resolve();
+            });
+            eventos.onerror = () => {
+                // EventSource reintenta solo; si el trabajo ya no existe, se cierra
+                if (eventos.readyState === EventSource.CLOSED) {
+                    reject(new Error("Se perdió la conexión con el servidor"));
+                }
+            };
+        });
+
+        let subidos = 0;
+        const alSubir = (cantidad) => {
+            subidos += cantidad;
+            if (procesados === 0) updateProgress(0, `Subiendo archivos... (${subidos}/${totalEsperado})`);
+        };
+
+        if (huellas) {
+            // 3. Lo que el servidor ya tiene entra sin subirse; lo demás continúa desde el
+            //    último byte recibido
+            const avance = await avanceDeSubidas(trabajoId);
+            const porSubir = await filtrarConocidos(trabajoId, entradas);
+            const unidades = porSubir
+                .map(({ file, huella }) => ({ file, huella, desde: avance.get(`${huella}|${file.name}`) }))
+                .filter(u => u.desde !== 'completa')
+                .map(u => ({ ...u, desde: u.desde || 0, cantidad: 1, bytes: Math.max(1, u.file.size - (u.desde || 0)) }));
+            await subirAdaptativo(unidades, (u, control) => subirReanudable(trabajoId, u, control), alSubir);
+        } else {
+            // Sin Web Crypto (contexto no seguro): partes multipart, sin reanudación
+            const unidades = [];
+            for (let desde = 0; desde < entradas.length; desde += 20) {
+                const archivos = entradas.slice(desde, desde + 20).map(e => e.file);
+                unidades.push({ archivos, cantidad: archivos.length, bytes: archivos.reduce((suma, f) => suma + f.size, 0) || 1 });
+            }
+            await subirAdaptativo(unidades, (u, control) => subirMultipart(trabajoId, u, control), alSubir);
+        }
+
+        await terminado;
+        olvidarSesion();
+        updateProgress(100, "¡Todo el procesamiento completado!");
+
+    } catch (error) {
+        console.error(error);
+        if (eventos) eventos.close();
+        alert(`Error en el procesamiento: ${error.message}`);
+    }
+}
+
+// SHA-256 (hex) de cada archivo, calculado en el navegador. null si no hay Web Crypto
+// (página servida fuera de un contexto seguro). Las huellas se recuerdan por nombre, tamaño
+// y fecha de modificación: al retomar una carpeta grande no se vuelven a calcular
+async function calcularHuellas(files, alAvanzar, simultaneos = 4) {
+    if (!window.crypto || !crypto.subtle) return null;
+    const guardadas = leerLocal('actas.huellas', {});
+    const huellas = new Array(files.length);
+    let siguiente = 0;
+    let listas = 0;
+    const calcular = async () => {
+        while (siguiente < files.length) {
+            const i = siguiente++;
+            const file = files[i];
+            const clave = `${file.webkitRelativePath || file.name}|${file.size}|${file.lastModified}`;
+            if (!guardadas[clave]) {
+                const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+                guardadas[clave] = Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
             }
+            huellas[i] = guardadas[clave];
+            alAvanzar(++listas);
+        }
+    };
+    await Promise.all(Array.from({ length: simultaneos }, calcular));
+    guardarLocal('actas.huellas', guardadas);
+    return huellas;
+}
 
-            const data = await response.json();
-            exitososTotal += data.exitosos;
-            fallidosTotal += data.fallidos;
+function leerLocal(clave, porDefecto) {
+    try {
+        return JSON.parse(localStorage.getItem(clave)) || porDefecto;
+    } catch (e) {
+        return porDefecto;
+    }
+}
 
-            appendResults(data.resultados, exitososTotal, fallidosTotal);
-            updateProgress(Math.round((currentStep / totalFiles) * 100));
+function guardarLocal(clave, valor) {
+    try {
+        localStorage.setItem(clave, JSON.stringify(valor));
+    } catch (e) {
+        // Sin espacio o almacenamiento deshabilitado: solo se pierde la reanudación
+        console.warn(`No se pudo guardar ${clave}`, e);
+    }
+}
+
+// Identifica una selección de archivos (la misma carpeta elegida de nuevo tras recargar)
+async function firmaDeSeleccion(entradas) {
+    const texto = entradas.map(e => `${e.huella}|${e.file.name}`).sort().join('\n');
+    const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(texto));
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// Sesión sin terminar de la misma selección, si el servidor todavía la tiene
+async function sesionPendiente(firma) {
+    const sesion = leerLocal('actas.subida', null);
+    if (!sesion || sesion.firma !== firma) return null;
+    const response = await fetch(`/trabajos/${sesion.trabajo_id}`);
+    if (!response.ok) return null;
+    const estado = await response.json();
+    return estado.estado === 'completado' ? null : sesion.trabajo_id;
+}
+
+function guardarSesion(firma, trabajoId) {
+    guardarLocal('actas.subida', { firma, trabajo_id: trabajoId });
+}
 
+function olvidarSesion() {
+    localStorage.removeItem('actas.subida');
+}
+
+// Bytes recibidos de cada subida del trabajo ('huella|nombre' -> bytes, o 'completa')
+async function avanceDeSubidas(trabajoId) {
+    const avance = new Map();
+    const response = await fetch(`/trabajos/${trabajoId}/subidas`);
+    if (!response.ok) return avance;
+    (await response.json()).subidas.forEach(s => {
+        avance.set(`${s.sha256}|${s.nombre}`, s.completa ? 'completa' : s.recibido);
+    });
+    return avance;
+}
+
+// Consulta al servidor qué contenidos ya tiene (los agrega a la sesión sin subirlos);
+// retorna las entradas que hay que subir
+async function filtrarConocidos(trabajoId, entradas, porConsulta = 500) {
+    const porSubir = [];
+    for (let desde = 0; desde < entradas.length; desde += porConsulta) {
+        const parte = entradas.slice(desde, desde + porConsulta);
+        const archivos = parte.map(e => ({ nombre: e.file.name, sha256: e.huella }));
+        const response = await fetch(`/trabajos/${trabajoId}/conocidos`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ archivos })
+        });
+        if (!response.ok) {
+            // Sin respuesta útil: se suben todos (el servidor igual detecta lo ya entregado)
+            porSubir.push(...parte);
+            continue;
+        }
+        const pendientes = new Set((await response.json()).pendientes);
+        porSubir.push(...parte.filter(e => pendientes.has(e.huella)));
+    }
+    return porSubir;
+}
+
+const esperar = (segundos) => new Promise(resolve => setTimeout(resolve, segundos * 1000));
+
+// Sube un archivo en partes con PUT + Content-Range, desde el byte `desde`. Ante un corte
+// reintenta la misma parte; ante un 409 sigue desde el byte que indica el servidor
+async function subirReanudable(trabajoId, { file, huella, desde }, control, tamanoParte = 4 * 1024 * 1024) {
+    const url = `/trabajos/${trabajoId}/subidas/${huella}?nombre=${encodeURIComponent(file.name)}`;
+    let posicion = desde;
+    let fallos = 0;
+    while (true) {
+        const hasta = Math.min(posicion + tamanoParte, file.size);
+        const rango = file.size === 0 ? 'bytes */0' : `bytes ${posicion}-${hasta - 1}/${file.size}`;
+        let response;
+        try {
+            response = await fetch(url, { method: 'PUT', headers: { 'Content-Range': rango }, body: file.slice(posicion, hasta) });
         } catch (error) {
-            console.error(error);
-            alert(`Error en lote: ${error.message}`);
+            if (++fallos > 5) throw error;
+            control.saturado();
+            await esperar(2 ** fallos);
+            continue;
+        }
+        if (response.status === 429) {
+            control.saturado();
+            await esperar(parseInt(response.headers.get('Retry-After'), 10) || 5);
+            continue;
+        }
+        if (response.status === 409) {
+            if (++fallos > 5) throw new Error(`No se pudo subir ${file.name}`);
+            posicion = parseInt(response.headers.get('Upload-Offset'), 10) || 0;
+            continue;
         }
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.detail || `Error al subir ${file.name}`);
+        }
+        const estado = await response.json();
+        if (estado.completa) return;
+        posicion = estado.recibido;
+        fallos = 0;
     }
+}
+
+// Parte multipart de varios archivos (cuando no hay huellas para la subida reanudable)
+async function subirMultipart(trabajoId, { archivos }, control) {
+    const formData = new FormData();
+    archivos.forEach(file => formData.append('files', file));
+    while (true) {
+        const response = await fetch(`/trabajos/${trabajoId}/archivos`, {
+            method: 'POST', headers: { 'X-Archivos': String(archivos.length) }, body: formData
+        });
+        if (response.status === 429) {
+            control.saturado();
+            await esperar(parseInt(response.headers.get('Retry-After'), 10) || 5);
+            continue;
+        }
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.detail || "Error al subir archivos");
+        }
+        return;
+    }
+}
+
+// Ejecuta las subidas con concurrencia adaptativa (AIMD): suma de a poco mientras la
+// latencia por byte se mantiene cerca de la mejor observada y se reduce a la mitad
+// cuando el servidor responde 429, se corta la conexión o se vuelve lento.
+// Cada petición cuenta además como 256 KB: en archivos chicos pesa más el viaje que los bytes
+async function subirAdaptativo(unidades, subir, alSubir, maxConcurrencia = 8) {
+    const costoPeticion = 256 * 1024;
+    let concurrencia = 2;
+    let mejor = Infinity;  // ms por byte de la subida más rápida
+    let siguiente = 0;
+    const enVuelo = new Set();
+    const control = { saturado: () => { concurrencia = Math.max(1, concurrencia / 2); } };
+
+    const ejecutar = async (unidad) => {
+        const inicio = performance.now();
+        await subir(unidad, control);
+        const porByte = (performance.now() - inicio) / (unidad.bytes + costoPeticion);
+        mejor = Math.min(mejor, porByte);
+        if (porByte > 2 * mejor) {
+            control.saturado();
+        } else {
+            concurrencia = Math.min(maxConcurrencia, concurrencia + 1 / concurrencia);
+        }
+        alSubir(unidad.cantidad);
+    };
+
+    while (siguiente < unidades.length || enVuelo.size > 0) {
+        while (siguiente < unidades.length && enVuelo.size < Math.floor(concurrencia)) {
+            const tarea = ejecutar(unidades[siguiente++]).finally(() => enVuelo.delete(tarea));
+            enVuelo.add(tarea);
+        }
+        await Promise.race(enVuelo);
+    }
+}
+
+// POST que respeta el control de admisión: ante un 429 espera lo indicado en Retry-After.
+// X-Archivos permite al servidor admitir (o rechazar) la subida antes de recibir los archivos
+async function enviarConReintento(url, body, intentos = 20) {
+    const headers = { 'X-Archivos': String(body.getAll('files').length) };
+    for (let intento = 1; ; intento++) {
+        const response = await fetch(url, { method: 'POST', headers, body });
+        if (response.status !== 429 || intento >= intentos) return response;
+        const segundos = parseInt(response.headers.get('Retry-After'), 10) || 5;
+        document.getElementById('status-text').textContent = `Servidor ocupado, reintentando en ${segundos} s...`;
+        await new Promise(resolve => setTimeout(resolve, segundos * 1000));
+    }
+}
+
+// Lee una respuesta NDJSON a medida que llega: llama a alLeer con cada línea ya parseada
+async function leerNDJSON(response, alLeer) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let pendiente = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        pendiente += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lineas = pendiente.split('\n');
+        pendiente = lineas.pop();
+        lineas.filter(linea => linea.trim()).forEach(linea => alLeer(JSON.parse(linea)));
+        if (done) break;
+    }
+    if (pendiente.trim()) alLeer(JSON.parse(pendiente));
+}
 
-    updateProgress(100, "¡Todo el procesamiento completado!");
+function claseEstado(estado) {
+    if (estado === 'error') return 'text-red-600 font-semibold';
+    // Duplicado (omitido) o conflicto de nombre (guardado con sufijo): revisar
+    if (estado === 'duplicado' || estado === 'conflicto') return 'text-amber-600 font-semibold';
+    return 'text-green-600 font-semibold';
 }
 
 function appendResults(resultados, exitosos, fallidos) {
@@ -127,16 +464,16 @@ function appendResults(resultados, exitosos, fallidos) {
         const tr = document.createElement('tr');
         tr.className = "hover:bg-gray-50 transition border-b border-gray-100 text-sm animate-fade-in";
 
-        const isError = res.estado === 'error';
-        const statusClass = isError ? 'text-red-600 font-semibold' : 'text-green-600 font-semibold';
+        const statusClass = claseEstado(res.estado);
         const meta = res.metadata || {};
+        const detalle = res.estado === 'exito' ? res.nuevo_nombre : (res.mensaje || res.nuevo_nombre);
 
         tr.innerHTML = `
             <td class="px-6 py-4">${meta.anio || '-'}</td>
             <td class="px-6 py-4">${meta.nivel || '-'}</td>
             <td class="px-6 py-4">${meta.grado_seccion || '-'}</td>
             <td class="px-6 py-4 ${statusClass}">${res.estado.toUpperCase()}</td>
-            <td class="px-6 py-4 max-w-xs truncate" title="${res.nuevo_nombre || res.mensaje}">${res.nuevo_nombre || res.mensaje}</td>
+            <td class="px-6 py-4 max-w-xs truncate" title="${detalle}">${detalle}</td>
         `;
         resultsBody.appendChild(tr);
     });
@@ -159,16 +496,16 @@ function renderResults(data) {
         const tr = document.createElement('tr');
         tr.className = "hover:bg-gray-50 transition border-b border-gray-100 text-sm";
 
-        const isError = res.estado === 'error';
-        const statusClass = isError ? 'text-red-600 font-semibold' : 'text-green-600 font-semibold';
+        const statusClass = claseEstado(res.estado);
         const meta = res.metadata || {};
+        const detalle = res.estado === 'exito' ? res.nuevo_nombre : (res.mensaje || res.nuevo_nombre);
 
         tr.innerHTML = `
             <td class="px-6 py-4">${meta.anio || '-'}</td>
             <td class="px-6 py-4">${meta.nivel || '-'}</td>
             <td class="px-6 py-4">${meta.grado_seccion || '-'}</td>
             <td class="px-6 py-4 ${statusClass}">${res.estado.toUpperCase()}</td>
-            <td class="px-6 py-4 max-w-xs truncate" title="${res.nuevo_nombre || res.mensaje}">${res.nuevo_nombre || res.mensaje}</td>
+            <td class="px-6 py-4 max-w-xs truncate" title="${detalle}">${detalle}</td>
         `;
         resultsBody.appendChild(tr);
     });
@@ -0,0 +1,90 @@
+"""
+Subidas reanudables: cada archivo llega en partes (PUT con Content-Range) y se va escribiendo
+en staging. Lo recibido es siempre un prefijo del archivo, así que el estado de una subida es
+un solo número (los bytes ya escritos): el navegador lo consulta para continuar donde quedó
+después de recargar la página o de un corte de conexión.
+"""
+import re
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Tuple
+
+from models import SubidaEstado
+
+RE_CONTENT_RANGE = re.compile(r'^bytes\s+(\d+)-(\d+)/(\d+)$')
+RE_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+class SubidaInvalida(Exception):
+    """La parte no se puede aceptar; `recibido` indica desde qué byte debe continuar el cliente."""
+    def __init__(self, message: str, recibido: int):
+        self.message = message
+        self.recibido = recibido
+        super().__init__(self.message)
+
+def leer_content_range(valor: str) -> Tuple[int, int, int]:
+    """
+    'bytes 0-1048575/3145728' -> (desde, hasta_inclusive, total). ValueError si no es válido.
+    Un archivo vacío se envía como 'bytes */0' -> (0, -1, 0).
+    """
+    if valor.strip() == "bytes */0":
+        return 0, -1, 0
+    m = RE_CONTENT_RANGE.match(valor.strip())
+    if not m:
+        raise ValueError(f"Content-Range inválido: {valor}")
+    desde, hasta, total = (int(g) for g in m.groups())
+    if desde > hasta or hasta >= total:
+        raise ValueError(f"Content-Range inválido: {valor}")
+    return desde, hasta, total
+
+class SubidaReanudable:
+    """Un archivo que llega en partes a un trabajo, identificado por (SHA-256, nombre)."""
+    def __init__(self, sha256: str, nombre: str, tamano: int, ruta: Path):
+        self.sha256 = sha256
+        self.nombre = nombre
+        self.tamano = tamano
+        self.ruta = ruta  # archivo parcial en staging
+        self.recibido = 0
+        self.completa = False
+        # Dos partes del mismo archivo (p. ej. un reintento) no se escriben a la vez
+        self.lock = asyncio.Lock()
+
+    def recortar(self, desde: int, datos: bytes) -> bytes:
+        """
+        Lo que falta de una parte que empieza en `desde`. Las partes que se superponen con
+        lo ya recibido (reintentos tras un corte) se aceptan sin duplicar bytes.
+        """
+        if desde > self.recibido:
+            raise SubidaInvalida(f"Falta la parte que empieza en el byte {self.recibido}", self.recibido)
+        return datos[self.recibido - desde:]
+
+    def escribir(self, datos: bytes):
+        """Agrega la parte al archivo parcial (se ejecuta en un hilo)."""
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.ruta, "r+b" if self.recibido else "wb") as f:
+            f.seek(self.recibido)
+            f.write(datos)
+            f.truncate()
+        self.recibido += len(datos)
+
+    def verificar(self) -> bool:
+        """True si el archivo completo tiene el SHA-256 anunciado (se ejecuta en un hilo)."""
+        sha256 = hashlib.sha256()
+        with open(self.ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(bloque)
+        return sha256.hexdigest() == self.sha256
+
+    def descartar(self):
+        """Vuelve a empezar (contenido que no coincide con su SHA-256)."""
+        self.ruta.unlink(missing_ok=True)
+        self.recibido = 0
+
+    def estado(self) -> SubidaEstado:
+        return SubidaEstado(
+            sha256=self.sha256,
+            nombre=self.nombre,
+            tamano=self.tamano,
+            recibido=self.recibido,
+            completa=self.completa
+        )
@@ -12,6 +12,15 @@ def get_base_path() -> Path:
     # Si se ejecuta como script normal, la raíz del proyecto
     return Path(os.path.abspath("."))
 
+def get_executable_dir() -> Path:
+    """
+    Carpeta del ejecutable (junto al .exe de PyInstaller) o, en desarrollo, la raíz del proyecto.
+    A diferencia de get_base_path, no es la carpeta temporal donde se descomprime el bundle.
+    """
+    if getattr(sys, 'frozen', False):
+        return Path(sys.executable).resolve().parent
+    return Path(os.path.abspath("."))
+
 def get_resource_path(relative_path: str) -> Path:
     """
     Obtiene la ruta absoluta a un recurso, compatible con PyInstaller.
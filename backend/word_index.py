@@ -0,0 +1,80 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional
+
+class WordIndex:
+    """
+    Índice espacial de las palabras de una página, construido una sola vez por PDF.
+
+    Guarda las coordenadas en columnas (array de doubles) y agrupa las palabras en
+    líneas según su centro vertical. Cada línea está ordenada por x0, de modo que
+    "la palabra más cercana a la derecha de un label" se resuelve con búsquedas
+    binarias en lugar de recorrer toda la página por cada label.
+    """
+    def __init__(self, words: list):
+        self.textos: List[str] = [w['text'] for w in words]
+        self.x0 = array('d', (w['x0'] for w in words))
+        self.x1 = array('d', (w['x1'] for w in words))
+        self.y_centro = array('d', ((w['top'] + w['bottom']) / 2 for w in words))
+
+        # Líneas: centro vertical -> índices de palabras ordenados por (x0, posición original)
+        lineas: Dict[float, List[int]] = {}
+        for i, y in enumerate(self.y_centro):
+            lineas.setdefault(y, []).append(i)
+        self._lineas_y = array('d', sorted(lineas))
+        self._lineas_idx: List[List[int]] = []
+        self._lineas_x0: List[array] = []
+        for y in self._lineas_y:
+            indices = sorted(lineas[y], key=lambda i: (self.x0[i], i))
+            self._lineas_idx.append(indices)
+            self._lineas_x0.append(array('d', (self.x0[i] for i in indices)))
+
+        # Resultados del regex de label, reutilizados entre búsquedas con la misma etiqueta
+        self._labels: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.textos)
+
+    def labels(self, regex_label: str) -> List[int]:
+        """Índices (en orden original) de las palabras que coinciden con el regex."""
+        if regex_label not in self._labels:
+            patron = re.compile(regex_label, re.IGNORECASE)
+            self._labels[regex_label] = [i for i, t in enumerate(self.textos) if patron.search(t)]
+        return self._labels[regex_label]
+
+    def buscar_derecha(self, regex_label: str, ancho_busqueda_max: float, y_tolerance: float) -> str:
+        """
+        Texto de la palabra más cercana a la derecha de algún label, en la misma línea
+        (|Δ centro vertical| <= y_tolerance) y a menos de ancho_busqueda_max.
+        Ante empates gana el primer label y luego la primera palabra en orden original.
+        """
+        i = self.buscar_derecha_indice(regex_label, ancho_busqueda_max, y_tolerance)
+        return self.textos[i] if i is not None else ""
+
+    def buscar_derecha_indice(self, regex_label: str, ancho_busqueda_max: float, y_tolerance: float) -> Optional[int]:
+        """Como buscar_derecha, pero retorna el índice (orden original) de la palabra, o None."""
+        if not self.textos:
+            return None
+        mejor = None  # (distancia, orden_label, indice_palabra)
+        for orden, i_label in enumerate(self.labels(regex_label)):
+            y_label = self.y_centro[i_label]
+            derecha = self.x1[i_label]
+            # Margen mínimo para no perder líneas por redondeo; se verifica la condición exacta abajo
+            desde = bisect_left(self._lineas_y, y_label - y_tolerance - 1e-9)
+            hasta = bisect_right(self._lineas_y, y_label + y_tolerance + 1e-9)
+            for linea in range(desde, hasta):
+                if abs(self._lineas_y[linea] - y_label) > y_tolerance:
+                    continue
+                xs = self._lineas_x0[linea]
+                pos = bisect_right(xs, derecha)  # primera palabra con x0 > derecha
+                if pos == len(xs):
+                    continue
+                i_palabra = self._lineas_idx[linea][pos]
+                distancia = xs[pos] - derecha
+                if distancia >= ancho_busqueda_max:
+                    continue
+                candidato = (distancia, orden, i_palabra)
+                if mejor is None or candidato < mejor:
+                    mejor = candidato
+        return mejor[2] if mejor is not None else None
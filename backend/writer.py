@@ -0,0 +1,227 @@
+"""
+Etapa de escritura: lleva cada acta a su ruta final fuera del event loop.
+
+Las actas llegan de a una (a medida que termina su parsing) y se agrupan en lotes que un único
+hilo escribe. Por lote: se crean las carpetas que faltan (las ya creadas se recuerdan), se
+sincronizan con el disco los datos de los archivos nuevos, se renombran todos a su nombre
+oficial y se sincroniza una sola vez cada carpeta tocada. Así un corte de luz nunca deja un
+acta a medio escribir con su nombre final, y en memorias USB lentas el costo de fsync se
+reparte entre las actas del lote en lugar de pagarse por cada una.
+"""
+import os
+import uuid
+import shutil
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Set
+
+from config import SINCRONIZAR_ESCRITURA, ESCRITURA_LOTE, ESCRITURA_ESPERA_MS
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _Colocacion:
+    origen: Path
+    destino: Path
+    modo: str  # "staging" | "enlace" | "mover" (ver EscritorActas.colocar)
+    futuro: asyncio.Future
+    temporal: Optional[Path] = None  # copia o enlace junto al destino, aún sin su nombre final
+    sincronizar: bool = False  # datos nuevos en el disco (no un enlace a un archivo existente)
+    borrar_origen: bool = False
+    error: Optional[BaseException] = None
+
+def _temporal_junto_a(destino: Path) -> Path:
+    # En la misma carpeta que el destino: el rename final no cambia de disco
+    return destino.with_name(f".{uuid.uuid4().hex}.tmp")
+
+def _sincronizar_archivo(ruta: Path):
+    # "r+b": en Windows FlushFileBuffers requiere permiso de escritura
+    with open(ruta, "r+b") as f:
+        os.fsync(f.fileno())
+
+def _sincronizar_directorio(directorio: Path):
+    """Hace durables los renombres de la carpeta (POSIX; en Windows no hay fsync de carpetas)."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # sistemas de archivos que no lo admiten (p. ej. algunos FAT montados)
+    finally:
+        os.close(fd)
+
+class EscritorActas:
+    """
+    Escritor de las actas en su carpeta final: un hilo dedicado, lotes con fsync compartido
+    y caché de las carpetas ya creadas.
+    """
+    def __init__(self, sincronizar: bool = SINCRONIZAR_ESCRITURA, lote_max: int = ESCRITURA_LOTE,
+                 espera_ms: int = ESCRITURA_ESPERA_MS):
+        self.sincronizar = sincronizar
+        self.lote_max = lote_max
+        self.espera = espera_ms / 1000
+        self._directorios: Set[Path] = set()  # carpetas de destino ya creadas
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cola: List[_Colocacion] = []
+        self._tarea: Optional[asyncio.Task] = None
+
+    async def colocar(self, origen: Path, destino: Path, modo: str):
+        """
+        Lleva el PDF a `destino` sin copiar su contenido cuando es posible, y retorna cuando
+        quedó en su lugar (y en el disco, con la sincronización activa).
+        - "staging": rename del temporal de la subida.
+        - "enlace": hard link al archivo original (queda intacto); copia si el disco no lo admite.
+        - "mover": traslada el archivo original; copia y borrado si está en otro disco.
+          Nunca reemplaza un destino existente: se perdería otro original.
+        """
+        loop = asyncio.get_running_loop()
+        colocacion = _Colocacion(origen, destino, modo, loop.create_future())
+        self._cola.append(colocacion)
+        # Una tarea por event loop (la CLI y los tests pueden crear más de uno en el mismo proceso)
+        if self._tarea is None or self._tarea.done() or self._tarea.get_loop() is not loop:
+            self._cola = [c for c in self._cola if c.futuro.get_loop() is loop]
+            self._tarea = asyncio.create_task(self._vaciar_cola())
+        await colocacion.futuro
+
+    async def _vaciar_cola(self):
+        loop = asyncio.get_running_loop()
+        while self._cola:
+            if len(self._cola) < self.lote_max and self.espera > 0:
+                # Junta las actas que terminan casi a la vez para sincronizarlas juntas
+                await asyncio.sleep(self.espera)
+            lote, self._cola = self._cola[:self.lote_max], self._cola[self.lote_max:]
+            try:
+                await loop.run_in_executor(self._obtener_executor(), self._escribir_lote, lote)
+            except BaseException as e:
+                for colocacion in lote:
+                    colocacion.error = colocacion.error or e
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+            finally:
+                for colocacion in lote:
+                    if colocacion.futuro.done():
+                        continue  # quien esperaba se canceló (el archivo igual quedó en su lugar)
+                    if colocacion.error is not None:
+                        colocacion.futuro.set_exception(colocacion.error)
+                    else:
+                        colocacion.futuro.set_result(None)
+
+    def _obtener_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="escritor")
+            return self._executor
+
+    # --- En el hilo del escritor ---
+
+    def _escribir_lote(self, lote: List[_Colocacion]):
+        for colocacion in lote:
+            self._intentar(colocacion, self._preparar)
+        if self.sincronizar:
+            for colocacion in lote:
+                if colocacion.error is None and colocacion.sincronizar:
+                    self._intentar(colocacion, lambda c: _sincronizar_archivo(c.temporal or c.origen))
+        for colocacion in lote:
+            if colocacion.error is None:
+                self._intentar(colocacion, self._renombrar)
+        colocadas = [c for c in lote if c.error is None]
+        if self.sincronizar:
+            for directorio in {c.destino.parent for c in colocadas}:
+                _sincronizar_directorio(directorio)
+        # El original se borra recién cuando la copia ya está en el disco
+        for colocacion in colocadas:
+            if colocacion.borrar_origen:
+                try:
+                    os.unlink(colocacion.origen)
+                except OSError as e:
+                    logger.warning("No se pudo borrar el original %s tras moverlo: %s", colocacion.origen, e)
+
+    @staticmethod
+    def _intentar(colocacion: _Colocacion, paso):
+        try:
+            paso(colocacion)
+        except Exception as e:
+            colocacion.error = e
+            if colocacion.temporal is not None:
+                colocacion.temporal.unlink(missing_ok=True)
+
+    def _carpeta(self, directorio: Path, recrear: bool = False):
+        """Crea la carpeta de destino solo la primera vez (o si desapareció desde entonces)."""
+        with self._lock:
+            if recrear:
+                self._directorios.discard(directorio)
+            elif directorio in self._directorios:
+                return
+        directorio.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._directorios.add(directorio)
+
+    def _preparar(self, c: _Colocacion):
+        """Deja el contenido junto al destino (o listo para renombrar), sin su nombre final."""
+        self._carpeta(c.destino.parent)
+        if c.modo == "staging":
+            c.sincronizar = True  # el volcado de la subida no se sincronizó
+            return
+        try:
+            enlace = _temporal_junto_a(c.destino)
+            self._reintentar_sin_carpeta(c, lambda: os.link(c.origen, enlace))
+            c.temporal = enlace  # mismo contenido que un archivo que ya estaba en el disco
+        except OSError:
+            # Otro disco o sistema de archivos sin hard links
+            copia = _temporal_junto_a(c.destino)
+            c.temporal = copia
+            shutil.copy2(c.origen, copia)
+            c.sincronizar = True
+        c.borrar_origen = c.modo == "mover"
+
+    def _renombrar(self, c: _Colocacion):
+        if c.modo == "staging":
+            self._reintentar_sin_carpeta(c, lambda: os.replace(c.origen, c.destino))
+        elif c.modo == "mover":
+            self._colocar_sin_reemplazar(c)
+        else:
+            os.replace(c.temporal, c.destino)
+        c.temporal = None
+
+    def _colocar_sin_reemplazar(self, c: _Colocacion):
+        try:
+            # link falla si el destino ya existe, sin ventana de carrera con otros archivos del lote
+            os.link(c.temporal, c.destino)
+        except FileExistsError:
+            raise FileExistsError(f"Ya existe un acta con el nombre {c.destino.name}; el original no se movió")
+        except OSError:
+            if c.destino.exists():
+                raise FileExistsError(f"Ya existe un acta con el nombre {c.destino.name}; el original no se movió")
+            os.rename(c.temporal, c.destino)
+            return
+        os.unlink(c.temporal)
+
+    def _reintentar_sin_carpeta(self, c: _Colocacion, operacion):
+        """La carpeta recordada pudo borrarse (limpieza de sesiones, reparseo): se crea de nuevo."""
+        try:
+            operacion()
+        except FileNotFoundError:
+            if not c.origen.exists():
+                raise
+            self._carpeta(c.destino.parent, recrear=True)
+            operacion()
+
+    def olvidar(self, raiz: Path):
+        """Olvida las carpetas creadas bajo `raiz` (p. ej. un espacio de trabajo que se borró)."""
+        with self._lock:
+            self._directorios = {d for d in self._directorios if d != raiz and raiz not in d.parents}
+
+    def cerrar(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
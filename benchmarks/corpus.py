@@ -0,0 +1,212 @@
+"""
+Corpus sintético de actas SIAGIE para los benchmarks.
+
+Genera PDFs con la misma disposición que las actas oficiales (A4 apaisado, Helvetica,
+encabezado con "Número y/o Nombre", "Código Modular - Anexo", "Grado (5)", "Sección(6)"
+y la tabla de estudiantes) sin dependencias externas: el PDF se escribe a mano.
+Cada acta guarda la metadata esperada para medir también la precisión del parser.
+"""
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple
+
+ANCHO, ALTO = 842, 595  # A4 apaisado, como las actas del SIAGIE
+
+NOMBRES_IE = ("SAN MARTIN DE PORRES", "JOSE CARLOS MARIATEGUI", "VIRGEN DEL CARMEN",
+              "SEÑOR DE LOS MILAGROS", "CESAR VALLEJO", "MARIA AUXILIADORA")
+APELLIDOS = ("QUISPE", "MAMANI", "HUAMAN", "CONDORI", "FLORES", "ROJAS", "CHOQUE", "TICONA",
+             "PARI", "APAZA", "CCALLO", "GUTIERREZ", "NUÑEZ", "PEÑA", "YUPANQUI")
+NOMBRES = ("JUAN", "MARIA", "LUIS", "ROSA", "JOSE", "ANA", "CARLOS", "LUZ", "MIGUEL", "DIANA")
+AREAS = ("DESARROLLO PERSONAL (A)", "CIENCIAS SOCIALES (B)", "EDUCACIÓN FÍSICA (D)",
+         "COMUNICACIÓN (E)", "ARTE Y CULTURA (F)", "MATEMÁTICA (G)", "CIENCIA Y TECNOLOGÍA (H)")
+GRADOS = {"INICIAL": ("3", "4", "5"), "PRIMARIA": ("1", "2", "3", "4", "5", "6"),
+          "SECUNDARIA": ("1", "2", "3", "4", "5")}
+SUFIJOS = {"1": "1ro", "2": "2do", "3": "3ro", "4": "4to", "5": "5to", "6": "6to"}
+
+@dataclass
+class CasoActa:
+    """Acta sintética y la metadata que el parser debería obtener de ella."""
+    nombre_archivo: str
+    anio: str
+    codigo_modular: str
+    nivel: str
+    grado: str
+    seccion: str  # letra o "UNICA"
+    nombre_ie: str
+    es_recuperacion: bool
+    estudiantes: int = 30
+    semilla: int = 0
+    esperado: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        seccion = "U" if self.seccion == "UNICA" else self.seccion
+        grado = f"{self.grado}a" if self.nivel == "INICIAL" else SUFIJOS[self.grado]
+        self.esperado = {
+            "anio": self.anio,
+            "codigo_modular": self.codigo_modular,
+            "nivel": self.nivel,
+            "grado_seccion": f"{grado} {seccion}",
+            "nombre_ie": self.nombre_ie,
+            "es_recuperacion": self.es_recuperacion,
+        }
+
+def generar_casos(cantidad: int, semilla: int = 2025) -> List[CasoActa]:
+    """Casos deterministas que cubren los tres niveles, sección única, recuperación e IE numéricas."""
+    rnd = random.Random(semilla)
+    casos = []
+    for i in range(cantidad):
+        nivel = ("INICIAL", "PRIMARIA", "SECUNDARIA")[i % 3]
+        # Una de cada cinco con sección única; las IE de inicial suelen tenerla
+        seccion = "UNICA" if i % 5 == 0 or nivel == "INICIAL" and i % 2 else rnd.choice("ABCDEFG")
+        # Una de cada cuatro con nombre numérico (p. ej. "71009")
+        nombre_ie = str(rnd.randint(70000, 72999)) if i % 4 == 1 else rnd.choice(NOMBRES_IE)
+        recuperacion = i % 7 == 3
+        anio = rnd.choice(("2023", "2024", "2025"))
+        grado = rnd.choice(GRADOS[nivel])
+        nombre = f"acta_{i:05d}{' [REC]' if recuperacion else ''}.pdf"
+        casos.append(CasoActa(
+            nombre_archivo=nombre,
+            anio=anio,
+            codigo_modular=f"{rnd.randint(200000, 1999999):07d}",
+            nivel=nivel,
+            grado=grado,
+            seccion=seccion,
+            nombre_ie=nombre_ie,
+            es_recuperacion=recuperacion,
+            estudiantes=rnd.randint(15, 35),
+            semilla=rnd.randint(0, 2**31),
+        ))
+    return casos
+
+# --- Escritura de PDF mínima (texto con Helvetica, codificación WinAnsi) ---
+
+def _texto_pdf(texto: str) -> bytes:
+    datos = texto.encode("cp1252")
+    return b"(" + datos.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+class _Pagina:
+    def __init__(self):
+        self._operaciones: List[bytes] = []
+
+    def texto(self, x: float, top: float, texto: str, tamano: float = 8):
+        """Escribe texto con su borde superior en `top` (medido desde arriba, como pdfplumber)."""
+        y = ALTO - top - tamano * 0.8  # línea base aproximada
+        self._operaciones.append(
+            b"BT /F1 %.1f Tf 1 0 0 1 %.2f %.2f Tm " % (tamano, x, y) + _texto_pdf(texto) + b" Tj ET"
+        )
+
+    def linea(self, x0: float, top: float, x1: float):
+        y = ALTO - top
+        self._operaciones.append(b"%.2f %.2f m %.2f %.2f l S" % (x0, y, x1, y))
+
+    def contenido(self) -> bytes:
+        return b"\n".join(self._operaciones)
+
+def _escribir_pdf(paginas: List[_Pagina]) -> bytes:
+    objetos: List[bytes] = []
+
+    def agregar(cuerpo: bytes) -> int:
+        objetos.append(cuerpo)
+        return len(objetos)
+
+    catalogo = agregar(b"")  # se completa al final
+    arbol = agregar(b"")
+    fuente = agregar(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    hojas = []
+    for pagina in paginas:
+        contenido = pagina.contenido()
+        flujo = agregar(b"<< /Length %d >>\nstream\n" % len(contenido) + contenido + b"\nendstream")
+        hojas.append(agregar(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >> "
+            b"/Contents %d 0 R >>" % (arbol, ANCHO, ALTO, fuente, flujo)
+        ))
+    objetos[catalogo - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % arbol
+    objetos[arbol - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % h for h in hojas), len(hojas))
+
+    salida = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    posiciones = []
+    for numero, cuerpo in enumerate(objetos, start=1):
+        posiciones.append(len(salida))
+        salida += b"%d 0 obj\n" % numero + cuerpo + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for posicion in posiciones:
+        salida += b"%010d 00000 n \n" % posicion
+    salida += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objetos) + 1, catalogo, inicio_xref)
+    return bytes(salida)
+
+def _tabla_estudiantes(pagina: _Pagina, rnd: random.Random, cantidad: int, top: float, nivel: str):
+    for j, area in enumerate(AREAS):
+        pagina.texto(370 + j * 62, top - 28, area, 4)
+    for fila in range(cantidad):
+        y = top + fila * 10
+        pagina.texto(14, y, f"{fila + 1:02d}", 6)
+        pagina.texto(60, y, f"{rnd.randint(60000000, 79999999)}", 6)
+        pagina.texto(150, y, f"{rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}, {rnd.choice(NOMBRES)}", 6)
+        pagina.texto(362, y, rnd.choice("HM"), 6)
+        notas = "ABC" if nivel == "INICIAL" else ("AD", "A", "B", "C")
+        for j in range(len(AREAS)):
+            pagina.texto(385 + j * 62, y, rnd.choice(notas), 6)
+        pagina.linea(12, y + 8, 830)
+
+def generar_pdf(caso: CasoActa) -> bytes:
+    """PDF de dos páginas con la disposición de un acta oficial del SIAGIE."""
+    rnd = random.Random(caso.semilla)
+    titulo = "ACTA DE EVALUACIÓN DE RECUPERACIÓN" if caso.es_recuperacion else "ACTA OFICIAL DE EVALUACIÓN"
+    primera = _Pagina()
+    primera.texto(280, 15, f"{titulo} DEL NIVEL {caso.nivel} EBR - {caso.anio}", 10)
+    primera.texto(102, 41, "Los resultados de aprendizaje de los estudiantes de cada grado y sección se "
+                           "reportan en el Acta Final que se encuentra en el Sistema de Información", 5)
+    primera.texto(285, 53, "SIAGIE, disponible en http://siagie.minedu.gob.pe/inicio/. Este formulario "
+                           "TIENE VALOR OFICIAL", 5)
+    primera.texto(56, 75, "Datos de la Instancia de Gestión", 5)
+    primera.texto(209, 75, "Datos de la Institución Educativa o Programa Educativo", 5)
+    primera.texto(410, 75, "Período Lectivo (8)", 5)
+    primera.texto(508, 75, f"Inicio 17/03/{caso.anio}", 5)
+    primera.texto(636, 75, f"Fin 19/12/{caso.anio}", 5)
+    primera.texto(63, 83, "Educativa Descentralizada", 5)
+    primera.texto(183, 87, "Número y/o Nombre", 5)
+    primera.texto(265, 87, caso.nombre_ie, 5)
+    primera.texto(80, 92, "(UGEL) (1)", 5)
+    primera.texto(179, 99, "Código Modular - Anexo", 5)
+    primera.texto(289, 99, f"{caso.codigo_modular} - 0", 5)
+    primera.texto(23, 102, "Código", 5)
+    primera.texto(97, 102, " ".join(str(rnd.randint(0, 9)) for _ in range(6)), 5)
+    primera.texto(190, 111, "Resolución de", 5)
+    primera.texto(192, 118, "Creación N°", 5)
+    primera.texto(288, 115, f"RD. Nº {rnd.randint(100, 9999)}", 5)
+    primera.texto(24, 128, "UGEL", 5)
+    primera.texto(98, 128, rnd.choice(("UGEL Melgar", "UGEL Puno", "UGEL Azángaro")), 5)
+    primera.texto(191, 129, "Modalidad (3)", 5)
+    primera.texto(242, 130, "EBR", 5)
+    primera.texto(264, 129, "Grado (5)", 5)
+    primera.texto(296, 130, caso.grado, 5)
+    primera.texto(318, 129, "Turno (7)", 5)
+    primera.texto(357, 130, rnd.choice("MT"), 5)
+    primera.texto(194, 141, "Gestión (4)", 5)
+    primera.texto(246, 142, "P", 5)
+    primera.texto(263, 141, "Sección(6)", 5)
+    primera.texto(327, 142, caso.seccion, 5)
+    primera.texto(65, 184, "D.N.I. / Código del Estudiante (2)", 6)
+    primera.texto(229, 184, "Apellidos y Nombres (Orden Alfabético)", 6)
+    primera.texto(523, 160, "ÁREAS", 6)
+    en_primera = min(caso.estudiantes, 24)
+    _tabla_estudiantes(primera, rnd, en_primera, 230, caso.nivel)
+
+    segunda = _Pagina()
+    _tabla_estudiantes(segunda, rnd, max(caso.estudiantes - en_primera, 1), 60, caso.nivel)
+    segunda.texto(60, 520, "Firma y sello del Director(a)", 6)
+    return _escribir_pdf([primera, segunda])
+
+def escribir_corpus(directorio: Path, cantidad: int, semilla: int = 2025) -> List[Tuple[Path, CasoActa]]:
+    """Escribe el corpus en disco (~1 ms por acta). Retorna [(ruta, caso)] en orden."""
+    directorio.mkdir(parents=True, exist_ok=True)
+    resultado = []
+    for caso in generar_casos(cantidad, semilla):
+        ruta = directorio / caso.nombre_archivo
+        ruta.write_bytes(generar_pdf(caso))
+        resultado.append((ruta, caso))
+    return resultado
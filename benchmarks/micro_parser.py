@@ -0,0 +1,77 @@
+"""
+Microbenchmark de las reglas de parsing (sin pdfplumber).
+
+Mide interpretar_acta sobre los casos de reproduce_issue.py / verify_fix.py y sobre un
+encabezado SIAGIE completo, para comparar el costo por acta entre versiones del parser.
+
+Uso: python benchmarks/micro_parser.py [repeticiones]
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from parser import interpretar_acta
+
+ENCABEZADO_SIAGIE = """ACTA OFICIAL DE EVALUACIÓN DEL NIVEL SECUNDARIA EBR - 2025
+Los resultados de aprendizaje de los estudiantes de cada grado y sección se reportan en el Acta Final que se encuentra en el Sistema de Información de Apoyo a la Gestión de la Institución Educativa -
+SIAGIE, disponible en http://siagie.minedu.gob.pe/inicio/. Este formulario TIENE VALOR OFICIAL
+Período Lectivo (8) Datos de la Instancia de Gestión Inicio 17/03/2025 Fin 19/12/2025
+Educativa Descentralizada
+(UGEL) (1)
+Código 2 1 0 0 1 0
+Nombre de
+UGEL
+UGEL Melgar
+Datos de la Institución Educativa o Programa Educativo
+Número y/o Nombre 71009 SAN MARTIN
+Código Modular - Anexo 0555555 - 0
+Resolución de
+Creación N° RD. Nº 2988
+Modalidad (3) EBR Grado (5) 5 Turno (7) M
+Gestión (4) P Sección(6) B
+N° de Orden
+D.N.I. / Código del
+Estudiante (2)
+Apellidos y Nombres
+(Orden Alfabético)
+Sexo H/M
+ÁREAS
+DESARROLLO PERSONAL, CIUDADANÍA Y CÍVICA (A) CIENCIAS SOCIALES (B) EDUCACIÓN PARA EL
+TRABAJO (C) EDUCACIÓN FÍSICA (D) COMUNICACIÓN (E) ARTE Y CULTURA
+Recuperación"""
+
+CASOS = [
+    ("UNICA Section",
+     "MINISTERIO DE EDUCACION\nDatos de la Institución Educativa o Programa Educativo\nNúmero y/o Nombre 71009\nCódigo Modular - Anexo 1154814 - 0\nNivel PRIMARIA\nSección(8) UNICA",
+     [{'text': 'Sección(8)', 'top': 100, 'x0': 50, 'x1': 100, 'bottom': 110}, {'text': 'UNICA', 'top': 100, 'x0': 120, 'x1': 160, 'bottom': 110}]),
+    ("Numeric IE", "MINISTERIO DE EDUCACION\nNúmero y/o Nombre 71009\nNivel PRIMARIA", []),
+    ("Standard", "Número y/o Nombre FE Y ALEGRIA 27 SANTA LUCIA\nSección B\nNivel SECUNDARIA",
+     [{'text': 'Sección', 'top': 100, 'x0': 50, 'x1': 90, 'bottom': 110}, {'text': 'B', 'top': 100, 'x0': 110, 'x1': 120, 'bottom': 110}]),
+    ("Layout Interference", "Grado(5) 1 Turno(9) M\nGestión(4) P Sección(8) UNICA\nNivel PRIMARIA", [
+        {'text': 'Grado(5)', 'top': 50, 'bottom': 60, 'x0': 100, 'x1': 140},
+        {'text': '1', 'top': 50, 'bottom': 60, 'x0': 150, 'x1': 160},
+        {'text': 'Turno(9)', 'top': 50, 'bottom': 60, 'x0': 180, 'x1': 220},
+        {'text': 'M', 'top': 50, 'bottom': 60, 'x0': 230, 'x1': 240},
+        {'text': 'Gestión(4)', 'top': 65, 'bottom': 75, 'x0': 50, 'x1': 90},
+        {'text': 'P', 'top': 65, 'bottom': 75, 'x0': 100, 'x1': 110},
+        {'text': 'Sección(8)', 'top': 65, 'bottom': 75, 'x0': 120, 'x1': 170},
+        {'text': 'UNICA', 'top': 65, 'bottom': 75, 'x0': 180, 'x1': 220}]),
+    ("Encabezado SIAGIE (solo texto)", ENCABEZADO_SIAGIE, []),
+]
+
+def medir(repeticiones: int):
+    total = 0.0
+    for nombre, texto, palabras in CASOS:
+        metadata = interpretar_acta(texto, palabras, "bench.pdf")
+        # El mínimo de varias rondas es la medida menos sensible al ruido de la máquina
+        tiempos = timeit.repeat(lambda: interpretar_acta(texto, palabras, "bench.pdf"),
+                                number=repeticiones, repeat=7)
+        por_acta = min(tiempos) / repeticiones * 1e6
+        total += por_acta
+        print(f"{nombre:32s} {por_acta:8.1f} µs/acta  -> {metadata.grado_seccion} | {metadata.nombre_ie}")
+    print(f"{'Promedio':32s} {total / len(CASOS):8.1f} µs/acta")
+
+if __name__ == "__main__":
+    medir(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,224 @@
+"""
+Suite de benchmarks sobre un corpus sintético de actas SIAGIE (ver corpus.py).
+
+Mide, para cada tamaño de corpus:
+  - extraer_datos_pdf, buscar_dato_derecha, parsear_acta y obtener_ruta_organizacion (por archivo)
+  - un lote completo con ActaService.procesar_lote_archivos (pool de procesos, sin caché)
+y la precisión de la metadata frente a la esperada.
+
+Los resultados se guardan en benchmarks/resultados/<etiqueta>.json (por defecto, el commit
+actual) y se comparan con la ejecución anterior para detectar regresiones. Dependen de la
+máquina (CPU, disco, workers), así que no se versionan: se compara contra ejecuciones locales.
+parsear_acta (extracción completa) y el lote (modo rápido) deben dar la misma precisión.
+
+Uso:
+    python benchmarks/suite.py                      # tamaños 10, 100 y 2000
+    python benchmarks/suite.py --tamanos 10,100     # más rápido
+    python benchmarks/suite.py --comparar resultados/abc1234.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+RAIZ = Path(__file__).resolve().parent
+sys.path.append(str(RAIZ.parent / "backend"))
+sys.path.append(str(RAIZ))
+
+DIRECTORIO_RESULTADOS = RAIZ / "resultados"
+UMBRAL_REGRESION = 0.15  # 15% más lento que la ejecución anterior
+
+# Etiquetas que consulta el parser, en el mismo orden
+ETIQUETAS = (r'SECCI[ÓO]N|s\(8\)', r'(?<!LECTIVO )\(8\)', r'SECCI[ÓO]N', r'\(5\)', r'GRADO')
+
+def _etiqueta_version() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        cambios = subprocess.run(["git", "status", "--porcelain", "--", "backend"], cwd=RAIZ,
+                                 capture_output=True, text=True).stdout.strip()
+        return commit + ("-modificado" if cambios else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "sin-git"
+
+def _estadisticas(tiempos: List[float]) -> dict:
+    """Resumen en milisegundos de una lista de tiempos en segundos."""
+    ordenados = sorted(tiempos)
+    return {
+        "total_s": round(sum(tiempos), 4),
+        "media_ms": round(statistics.mean(tiempos) * 1000, 3),
+        "p50_ms": round(ordenados[len(ordenados) // 2] * 1000, 3),
+        "p95_ms": round(ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))] * 1000, 3),
+    }
+
+def _aciertos(metadatas, casos) -> float:
+    correctos = 0
+    for metadata, caso in zip(metadatas, casos):
+        if metadata is not None and all(getattr(metadata, k) == v for k, v in caso.esperado.items()):
+            correctos += 1
+    return round(100 * correctos / len(casos), 1)
+
+def medir_funciones(archivos) -> dict:
+    """Mide cada etapa del parser archivo por archivo, en el proceso actual."""
+    from parser import extraer_datos_pdf, buscar_dato_derecha, parsear_acta, ParsingError
+    from renamer import obtener_ruta_organizacion
+
+    contenidos = [(ruta.read_bytes(), caso) for ruta, caso in archivos]
+    t_extraer, t_buscar, t_parsear, t_ruta = [], [], [], []
+    metadatas = []
+    destino = Path(tempfile.mkdtemp(prefix="bench_rutas_"))
+    try:
+        for datos, caso in contenidos:
+            inicio = time.perf_counter()
+            _, palabras = extraer_datos_pdf(io.BytesIO(datos))
+            t_extraer.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            for etiqueta in ETIQUETAS:
+                buscar_dato_derecha(palabras, etiqueta)
+            t_buscar.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            try:
+                metadata = parsear_acta(io.BytesIO(datos), caso.nombre_archivo)
+            except ParsingError:
+                metadata = None
+            t_parsear.append(time.perf_counter() - inicio)
+            metadatas.append(metadata)
+
+            if metadata is not None:
+                inicio = time.perf_counter()
+                obtener_ruta_organizacion(metadata, destino)
+                t_ruta.append(time.perf_counter() - inicio)
+    finally:
+        shutil.rmtree(destino, ignore_errors=True)
+
+    return {
+        "extraer_datos_pdf": _estadisticas(t_extraer),
+        "buscar_dato_derecha": _estadisticas(t_buscar),
+        "parsear_acta": {**_estadisticas(t_parsear), "precision_pct": _aciertos(metadatas, [c for _, c in contenidos])},
+        "obtener_ruta_organizacion": _estadisticas(t_ruta) if t_ruta else None,
+    }
+
+def medir_lote(archivos) -> dict:
+    """Lote completo con el servicio (volcado, pool de parsing, renombrado y archivo ZIP)."""
+    from starlette.datastructures import UploadFile
+    from service import acta_service
+
+    # Como el navegador: el contenido llega en memoria (SpooledTemporaryFile en el servidor)
+    subidas = [UploadFile(file=io.BytesIO(ruta.read_bytes()), filename=caso.nombre_archivo)
+               for ruta, caso in archivos]
+    trabajo = acta_service.trabajos.crear()
+
+    async def ejecutar():
+        return await acta_service.procesar_lote_archivos(subidas, trabajo)
+
+    inicio = time.perf_counter()
+    respuesta = asyncio.run(ejecutar())  # sin configurar logging: el detalle por archivo no se emite
+    total = time.perf_counter() - inicio
+    metadatas = [r.metadata for r in respuesta.resultados]
+    return {
+        "total_s": round(total, 3),
+        "archivos_por_s": round(len(archivos) / total, 1),
+        "media_por_archivo_ms": respuesta.duracion_media_ms,
+        "extraccion_completa_pct": respuesta.porcentaje_extraccion_completa,
+        "fallidos": respuesta.fallidos,
+        "precision_pct": _aciertos(metadatas, [c for _, c in archivos]),
+    }
+
+def comparar(actual: dict, anterior: dict) -> List[str]:
+    """Regresiones de tiempo (> UMBRAL_REGRESION) o de precisión respecto a `anterior`."""
+    regresiones = []
+    for tamano, medidas in actual["resultados"].items():
+        previas = anterior.get("resultados", {}).get(tamano, {})
+        for nombre, valores in medidas.items():
+            antes = previas.get(nombre)
+            if not valores or not antes:
+                continue
+            clave = "media_ms" if "media_ms" in valores else "total_s"
+            if antes.get(clave) and valores[clave] > antes[clave] * (1 + UMBRAL_REGRESION):
+                regresiones.append(f"{nombre} @ {tamano}: {clave} {antes[clave]} -> {valores[clave]}")
+            if "precision_pct" in valores and valores["precision_pct"] < antes.get("precision_pct", 0):
+                regresiones.append(f"{nombre} @ {tamano}: precisión {antes['precision_pct']}% -> {valores['precision_pct']}%")
+    return regresiones
+
+def _ultimo_resultado(excluir: Path) -> Optional[Path]:
+    previos = [p for p in DIRECTORIO_RESULTADOS.glob("*.json") if p != excluir]
+    return max(previos, key=lambda p: p.stat().st_mtime, default=None)
+
+def main(argv=None) -> int:
+    args_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args_parser.add_argument("--tamanos", default="10,100,2000", help="Tamaños de corpus separados por coma")
+    args_parser.add_argument("--etiqueta", default=None, help="Nombre del archivo de resultados (por defecto, el commit)")
+    args_parser.add_argument("--comparar", type=Path, default=None, help="Resultados contra los que comparar")
+    args_parser.add_argument("--sin-lote", action="store_true", help="No medir procesar_lote_archivos")
+    args = args_parser.parse_args(argv)
+    tamanos = [int(t) for t in args.tamanos.split(",") if t.strip()]
+
+    # Entorno aislado: el servicio escribe en un directorio temporal y sin caché de parseos
+    trabajo_dir = Path(tempfile.mkdtemp(prefix="bench_actas_"))
+    os.environ["ACTAS_DATA_DIR"] = str(trabajo_dir / ".gestion_actas")
+    os.environ["ACTAS_CACHE_MB"] = "0"
+    directorio_original = Path.cwd()
+    os.chdir(trabajo_dir)
+
+    from corpus import escribir_corpus
+    from config import PARSE_WORKERS, FAST_HEADER_MODE
+
+    etiqueta = args.etiqueta or _etiqueta_version()
+    informe = {
+        "etiqueta": etiqueta,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "workers": PARSE_WORKERS,
+        "modo_rapido": FAST_HEADER_MODE,
+        "resultados": {},
+    }
+    try:
+        for tamano in tamanos:
+            archivos = escribir_corpus(trabajo_dir / "corpus" / str(tamano), tamano)
+            print(f"[*] Corpus de {tamano} actas")
+            medidas: Dict[str, dict] = medir_funciones(archivos)
+            if not args.sin_lote:
+                medidas["procesar_lote_archivos"] = medir_lote(archivos)
+            informe["resultados"][str(tamano)] = medidas
+            for nombre, valores in medidas.items():
+                print(f"    {nombre:28s} {json.dumps(valores, ensure_ascii=False)}")
+    finally:
+        os.chdir(directorio_original)
+        try:
+            from service import acta_service
+            acta_service.cerrar()
+        except ImportError:
+            pass
+        shutil.rmtree(trabajo_dir, ignore_errors=True)
+
+    DIRECTORIO_RESULTADOS.mkdir(exist_ok=True)
+    salida = DIRECTORIO_RESULTADOS / f"{etiqueta}.json"
+    referencia = args.comparar or _ultimo_resultado(salida)
+    salida.write_text(json.dumps(informe, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"[*] Resultados guardados en {salida}")
+
+    if referencia is None:
+        return 0
+    regresiones = comparar(informe, json.loads(Path(referencia).read_text(encoding="utf-8")))
+    print(f"[*] Comparación con {referencia.name}: {len(regresiones)} regresiones")
+    for regresion in regresiones:
+        print(f"[!] {regresion}")
+    return 1 if regresiones else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
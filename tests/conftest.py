@@ -0,0 +1,17 @@
+"""
+Configuración común de los tests: el backend usa imports planos (como al ejecutarlo desde
+backend/), así que su carpeta va en el path. Las carpetas del servicio (actas, datos internos,
+log) van a una carpeta temporal: importar service no escribe en la carpeta actual.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND))
+
+_DATOS = Path(tempfile.mkdtemp(prefix="actas_tests_"))
+os.environ.setdefault("ACTAS_DATA_DIR", str(_DATOS / ".gestion_actas"))
+os.environ.setdefault("ACTAS_STORAGE_DIR", str(_DATOS / "ActasProcesadas"))
+os.environ.setdefault("ACTAS_LOG_DIR", str(_DATOS / "logs"))
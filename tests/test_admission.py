@@ -0,0 +1,151 @@
+"""Control de admisión de archivos en curso (admission.py) y su middleware de subidas (api.py)."""
+import asyncio
+import json
+
+import pytest
+
+import api
+from admission import ControlAdmision, Saturado
+
+def _control(max_archivos=4, max_bytes=1000, espera_maxima=0.05, reintentar_en=7):
+    return ControlAdmision(max_archivos, max_bytes, espera_maxima, reintentar_en)
+
+def test_grupo_mas_grande_que_el_limite_se_admite_sin_nada_en_curso():
+    async def prueba():
+        control = _control()
+        permiso = await control.admitir(10, 5000)
+        assert (control.archivos_en_curso, control.bytes_en_curso) == (10, 5000)
+        permiso.liberar_todo()
+        assert (control.archivos_en_curso, control.bytes_en_curso) == (0, 0)
+    asyncio.run(prueba())
+
+def test_grupo_mas_grande_que_el_limite_espera_a_que_termine_lo_en_curso():
+    async def prueba():
+        control = _control()
+        primero = await control.admitir(1, 10)
+        grande = asyncio.ensure_future(control.admitir(10, 5000, esperar=True))
+        await asyncio.sleep(0)
+        assert not grande.done() and control.en_espera == 1
+        # Lo que llega después espera su turno aunque cabría
+        pequeno = asyncio.ensure_future(control.admitir(1, 10, esperar=True))
+        await asyncio.sleep(0)
+        assert not pequeno.done()
+
+        primero.liberar_todo()
+        permiso = await grande
+        assert permiso.archivos == 10 and not pequeno.done()
+        permiso.liberar_todo()
+        (await pequeno).liberar_todo()
+        assert (control.archivos_en_curso, control.en_espera) == (0, 0)
+    asyncio.run(prueba())
+
+def test_subida_que_no_cabe_en_la_espera_maxima_es_rechazada():
+    async def prueba():
+        control = _control()
+        en_curso = await control.admitir(4, 100)
+        with pytest.raises(Saturado) as error:
+            await control.admitir(1, 10)
+        assert error.value.reintentar_en == 7
+        assert (control.rechazos, control.en_espera, control.archivos_en_curso) == (1, 0, 4)
+        en_curso.liberar_todo()
+    asyncio.run(prueba())
+
+def _solicitud(headers, ruta="/procesar-carpeta"):
+    return {
+        "type": "http", "method": "POST", "path": ruta,
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+
+async def _llamar(middleware, scope):
+    """Llama al middleware como ASGI; devuelve los mensajes enviados y cuántas veces leyó el cuerpo."""
+    enviados, lecturas = [], []
+
+    async def receive():
+        lecturas.append(1)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    await middleware(scope, receive, send)
+    return enviados, len(lecturas)
+
+MULTIPART = {"Content-Type": "multipart/form-data; boundary=x", "Content-Length": "300", "X-Archivos": "2"}
+
+def test_middleware_rechaza_con_429_antes_de_leer_el_cuerpo(monkeypatch):
+    async def prueba():
+        control = _control()
+        monkeypatch.setattr(api.acta_service, "admision", control)
+        en_curso = await control.admitir(4, 100)
+
+        async def app(scope, receive, send):
+            raise AssertionError("la ruta no debe ejecutarse")
+
+        enviados, lecturas = await _llamar(api.AdmisionSubidas(app), _solicitud(MULTIPART))
+        en_curso.liberar_todo()
+        return enviados, lecturas
+
+    enviados, lecturas = asyncio.run(prueba())
+    inicio, cuerpo = enviados
+    assert inicio["status"] == 429
+    assert (b"retry-after", b"7") in inicio["headers"]
+    assert "reintente" in json.loads(cuerpo["body"])["detail"]
+    assert lecturas == 0
+
+def test_middleware_reserva_por_encabezados_y_devuelve_el_permiso_no_tomado(monkeypatch):
+    async def prueba():
+        control = _control()
+        monkeypatch.setattr(api.acta_service, "admision", control)
+        reservado = []
+
+        async def app(scope, receive, send):
+            # La reserva se hizo antes de que la ruta lea el cuerpo
+            reservado.append((control.archivos_en_curso, control.bytes_en_curso))
+            assert scope["state"][api.PERMISO_SUBIDA].archivos == 2
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        enviados, lecturas = await _llamar(api.AdmisionSubidas(app), _solicitud(MULTIPART))
+        return control, reservado, enviados, lecturas
+
+    control, reservado, enviados, lecturas = asyncio.run(prueba())
+    assert reservado == [(2, 300)]
+    assert enviados[0]["status"] == 404 and lecturas == 0
+    assert (control.archivos_en_curso, control.bytes_en_curso) == (0, 0)
+
+def test_middleware_deja_el_permiso_tomado_por_la_ruta(monkeypatch):
+    async def prueba():
+        control = _control()
+        monkeypatch.setattr(api.acta_service, "admision", control)
+        tomados = []
+
+        async def app(scope, receive, send):
+            tomados.append(scope["state"].pop(api.PERMISO_SUBIDA))
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        await _llamar(api.AdmisionSubidas(app), _solicitud(MULTIPART, "/trabajos/abc/archivos"))
+        return control, tomados
+
+    control, (permiso,) = asyncio.run(prueba())
+    # La ruta lo libera a medida que terminan los archivos
+    assert control.archivos_en_curso == 2
+    permiso.liberar_todo()
+    assert control.archivos_en_curso == 0
+
+@pytest.mark.parametrize("scope", [
+    _solicitud({"Content-Type": "application/json"}),
+    _solicitud(MULTIPART, "/trabajos/abc/subidas"),
+    dict(_solicitud(MULTIPART), method="GET"),
+])
+def test_middleware_no_admite_otras_peticiones(scope, monkeypatch):
+    control = _control()
+    monkeypatch.setattr(api.acta_service, "admision", control)
+    llamadas = []
+
+    async def app(scope, receive, send):
+        llamadas.append(control.archivos_en_curso)
+        assert api.PERMISO_SUBIDA not in scope.get("state", {})
+
+    asyncio.run(_llamar(api.AdmisionSubidas(app), scope))
+    assert llamadas == [0]
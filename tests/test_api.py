@@ -0,0 +1,40 @@
+"""Rutas HTTP (api.py), sin el ciclo de vida del servidor ni el pool de parsing."""
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from admission import ControlAdmision
+from jobs import resumir_lote
+
+@pytest.fixture
+def recibidos(monkeypatch):
+    """Nombres de los archivos que procesar-carpeta entrega al servicio."""
+    nombres = []
+
+    async def procesar_lote_archivos(files, trabajo, permiso=None):
+        nombres.extend(file.filename for file in files)
+        permiso.liberar_todo()
+        return resumir_lote([])
+
+    monkeypatch.setattr(api.acta_service, "admision", ControlAdmision(10, 10 ** 6, 0.05, 1))
+    monkeypatch.setattr(api.acta_service, "crear_trabajo", lambda dividir=False: None)
+    monkeypatch.setattr(api.acta_service, "procesar_lote_archivos", procesar_lote_archivos)
+    return nombres
+
+def _subir(*nombres):
+    archivos = [("files", (nombre, b"%PDF-1.4", "application/octet-stream")) for nombre in nombres]
+    return TestClient(api.app).post("/procesar-carpeta", files=archivos)
+
+def test_procesar_carpeta_ignora_los_archivos_que_no_son_pdf(recibidos):
+    respuesta = _subir("a.pdf", "notas.txt", "B.PDF", "desktop.ini")
+
+    assert respuesta.status_code == 200
+    assert recibidos == ["a.pdf", "B.PDF"]
+
+def test_procesar_carpeta_sin_ningun_pdf(recibidos):
+    respuesta = _subir("notas.txt", "foto.jpg")
+
+    assert respuesta.status_code == 400
+    assert respuesta.json()["detail"] == "No se enviaron archivos PDF"
+    assert recibidos == []
+    assert api.acta_service.admision.archivos_en_curso == 0
@@ -0,0 +1,127 @@
+"""ZIP incremental de un espacio de trabajo (archive.py)."""
+import io
+import zipfile
+
+import archive
+from archive import ArchivoIncremental
+
+def _leer(archivo: ArchivoIncremental) -> bytes:
+    return b"".join(archivo.instantanea().leer())
+
+def _acta(directorio, nombre, contenido: bytes):
+    ruta = directorio / nombre
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.write_bytes(contenido)
+    return ruta
+
+def test_vacio_es_un_zip_valido(tmp_path):
+    with zipfile.ZipFile(io.BytesIO(_leer(ArchivoIncremental(tmp_path)))) as z:
+        assert z.namelist() == []
+
+def test_agregar_solo_escribe_al_final(tmp_path):
+    archivo = ArchivoIncremental(tmp_path)
+    archivo.agregar(_acta(tmp_path, "2025/SECUNDARIA/ACTA Ñ.pdf", b"uno"))
+    primero = _leer(archivo)
+    archivo.agregar(_acta(tmp_path, "2025/SECUNDARIA/otra.pdf", b"dos"))
+    segundo = _leer(archivo)
+
+    # Las entradas ya escritas no cambian: solo se agrega detrás
+    assert segundo[:primero.index(b"PK\x01\x02")] == primero[:primero.index(b"PK\x01\x02")]
+    with zipfile.ZipFile(io.BytesIO(segundo)) as z:
+        assert z.testzip() is None
+        assert z.read("2025/SECUNDARIA/ACTA Ñ.pdf") == b"uno"
+        assert z.read("2025/SECUNDARIA/otra.pdf") == b"dos"
+
+def test_directorio_central_diferido(tmp_path):
+    archivo = ArchivoIncremental(tmp_path)
+    for i in range(5):
+        archivo.agregar(_acta(tmp_path, f"{i}.pdf", b"x" * 10))
+    # Sin instantánea ni completar() no se escribió ningún directorio central
+    assert b"PK\x01\x02" not in archivo.ruta_zip.read_bytes()
+
+    archivo.completar()
+    datos = archivo.ruta_zip.read_bytes()
+    assert datos.count(b"PK\x05\x06") == 1
+    with zipfile.ZipFile(io.BytesIO(datos)) as z:
+        assert sorted(z.namelist()) == [f"{i}.pdf" for i in range(5)]
+
+    # Sin cambios, completar() e instantanea() no escriben otro
+    archivo.completar()
+    _leer(archivo)
+    assert archivo.ruta_zip.read_bytes() == datos
+
+def test_instantanea_es_un_prefijo_estable(tmp_path):
+    archivo = ArchivoIncremental(tmp_path)
+    archivo.agregar(_acta(tmp_path, "a.pdf", b"a"))
+    instantanea = archivo.instantanea()
+    # El procesamiento sigue agregando actas mientras se descarga
+    archivo.agregar(_acta(tmp_path, "b.pdf", b"b"))
+    archivo.completar()
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(instantanea.leer()))) as z:
+        assert z.namelist() == ["a.pdf"]
+
+def test_reemplazar_y_quitar_cuentan_como_espacio_muerto(tmp_path):
+    archivo = ArchivoIncremental(tmp_path)
+    ruta = _acta(tmp_path, "a.pdf", b"v1" * 50)
+    archivo.agregar(ruta)
+    archivo.agregar(_acta(tmp_path, "b.pdf", b"b" * 30))
+    assert archivo._muerto == 0
+
+    ruta.write_bytes(b"v2" * 50)
+    archivo.agregar(ruta)
+    # La versión anterior de a.pdf queda en el archivo sin pertenecer a ninguna entrada
+    assert archivo._muerto == archive._CABECERA_LOCAL.size + len("a.pdf") + 100
+
+    archivo.quitar(tmp_path / "b.pdf")
+    assert archivo._muerto == 2 * archive._CABECERA_LOCAL.size + len("a.pdf") + 100 + len("b.pdf") + 30
+
+    with zipfile.ZipFile(io.BytesIO(_leer(archivo))) as z:
+        assert z.namelist() == ["a.pdf"]
+        assert z.read("a.pdf") == b"v2" * 50
+    assert [r["ruta"] for r in archivo.manifiesto()] == ["a.pdf"]
+
+def test_quitar_un_acta_desconocida_no_cambia_nada(tmp_path):
+    archivo = ArchivoIncremental(tmp_path)
+    archivo.agregar(_acta(tmp_path, "a.pdf", b"a"))
+    archivo.completar()
+    antes = archivo.ruta_zip.read_bytes()
+
+    archivo.quitar(tmp_path / "no_existe.pdf")
+
+    assert archivo._muerto == 0
+    _leer(archivo)
+    assert archivo.ruta_zip.read_bytes() == antes
+
+def test_compacta_cuando_la_mitad_es_espacio_muerto(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "UPLOAD_CHUNK_SIZE", 16)  # umbral de compactación: 64 bytes
+    archivo = ArchivoIncremental(tmp_path)
+    for i in range(4):
+        archivo.agregar(_acta(tmp_path, f"{i}.pdf", bytes([i]) * 200))
+    archivo.completar()
+    assert archivo._muerto == 0
+
+    for i in range(3):
+        # Con menos de la mitad muerta todavía no conviene compactar
+        assert archivo._muerto == i * archive._tamano_entrada("0.pdf", archivo._entradas["3.pdf"])
+        (tmp_path / f"{i}.pdf").unlink()
+        archivo.quitar(tmp_path / f"{i}.pdf")
+
+    # Al superar la mitad, el archivo se rehízo solo con el acta vigente
+    assert archivo._muerto == 0
+    datos = archivo.ruta_zip.read_bytes()
+    assert len(datos) == archivo._tamano
+    with zipfile.ZipFile(io.BytesIO(datos)) as z:
+        assert z.namelist() == ["3.pdf"]
+        assert z.read("3.pdf") == bytes([3]) * 200
+
+def test_reconstruye_tras_reiniciar(tmp_path):
+    archivo = ArchivoIncremental(tmp_path)
+    archivo.agregar(_acta(tmp_path, "a.pdf", b"a"), {"nivel": "PRIMARIA"})
+    archivo.agregar(_acta(tmp_path, "b.pdf", b"b"))  # el proceso se cortó antes de completar
+
+    nuevo = ArchivoIncremental(tmp_path)
+    with zipfile.ZipFile(io.BytesIO(_leer(nuevo))) as z:
+        assert sorted(z.namelist()) == ["a.pdf", "b.pdf"]
+    # Los datos anotados en el manifiesto se conservan
+    assert {r["ruta"]: r.get("nivel") for r in nuevo.manifiesto()} == {"a.pdf": "PRIMARIA", "b.pdf": None}
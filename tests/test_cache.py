@@ -0,0 +1,99 @@
+"""Caché de parsing e invalidación por versión de las reglas (cache.py)."""
+import types
+
+import cache
+from cache import ParseCache, version_reglas
+from models import ActaMetadata
+
+def _modulo(codigo: str, nombre: str = "reglas_prueba") -> types.ModuleType:
+    modulo = types.ModuleType(nombre)
+    exec(compile(codigo, nombre, "exec"), vars(modulo))
+    return modulo
+
+REGLAS = '''
+import re
+SECCIONES = {"A", "B", "UNICA"}
+RE_GRADO = re.compile(r"(\\d)(ro|do|to)")
+def leer_grado(texto):
+    return RE_GRADO.search(texto)
+class Lector:
+    def leer(self, texto):
+        return texto.strip()
+'''
+
+def _metadata(**campos) -> ActaMetadata:
+    valores = dict(archivo_original="subida.pdf", anio="2025", codigo_modular="0239905", anexo="0",
+                   nombre_ie="IE", nivel="PRIMARIA", grado_seccion="1ro A", es_recuperacion=False)
+    return ActaMetadata(**{**valores, **campos})
+
+def test_version_estable_entre_cargas():
+    assert version_reglas(_modulo(REGLAS)) == version_reglas(_modulo(REGLAS))
+
+def test_cambiar_una_regla_cambia_la_version():
+    base = version_reglas(_modulo(REGLAS))
+    cambios = [
+        REGLAS.replace('"UNICA"', '"ÚNICA"'),  # constante
+        REGLAS.replace(r"(ro|do|to)", r"(ro|do|to|vo)"),  # regex
+        REGLAS.replace("return RE_GRADO.search(texto)", "return RE_GRADO.match(texto)"),  # función
+        REGLAS.replace("texto.strip()", "texto.upper()"),  # método
+    ]
+    versiones = {version_reglas(_modulo(codigo)) for codigo in cambios}
+    assert base not in versiones and len(versiones) == len(cambios)
+
+def test_estado_del_proceso_no_cambia_la_version():
+    modulo = _modulo(REGLAS)
+    antes = version_reglas(modulo)
+    modulo._registro_iniciado = True  # como plantillas.py al abrir su registro
+    modulo.__cached__ = "otro"
+    assert version_reglas(modulo) == antes
+
+def test_version_depende_de_todos_los_modulos():
+    reglas, otras = _modulo(REGLAS), _modulo("UMBRAL = 3", "otras")
+    assert version_reglas(reglas, otras) != version_reglas(reglas)
+    assert version_reglas(reglas, otras) != version_reglas(reglas, _modulo("UMBRAL = 4", "otras"))
+
+def test_version_del_servicio_incluye_plantillas():
+    import parser, extractor, word_index, plantillas
+    assert version_reglas(parser, extractor, word_index, plantillas) != version_reglas(parser, extractor, word_index)
+
+def test_guardar_y_obtener_por_variante(tmp_path):
+    parseos = ParseCache(tmp_path / "cache.sqlite3", 1024 * 1024, "v1")
+    parseos.guardar("abc", "rapido", _metadata())
+
+    encontrada = parseos.obtener("abc", "rapido", "otro_nombre.pdf")
+    assert encontrada.grado_seccion == "1ro A"
+    assert encontrada.archivo_original == "otro_nombre.pdf"  # depende de la subida, no del contenido
+    assert parseos.obtener("abc", "completo", "x.pdf") is None
+    assert (parseos.aciertos, parseos.fallos) == (1, 1)
+    parseos.cerrar()
+
+def test_otra_version_invalida_la_cache(tmp_path):
+    ruta = tmp_path / "cache.sqlite3"
+    parseos = ParseCache(ruta, 1024 * 1024, "v1")
+    parseos.guardar("abc", "rapido", _metadata())
+    parseos.cerrar()
+
+    misma = ParseCache(ruta, 1024 * 1024, "v1")
+    assert misma.obtener("abc", "rapido", "a.pdf") is not None
+    misma.cerrar()
+
+    nueva = ParseCache(ruta, 1024 * 1024, "v2")
+    assert nueva.obtener("abc", "rapido", "a.pdf") is None
+    assert nueva._total_bytes == 0
+    nueva.cerrar()
+
+def test_desaloja_las_menos_usadas(tmp_path, monkeypatch):
+    reloj = iter(range(1000))
+    monkeypatch.setattr(cache.time, "time", lambda: next(reloj))
+    tamano = len(_metadata().model_dump_json())
+    parseos = ParseCache(tmp_path / "cache.sqlite3", 3 * tamano, "v1")
+    for sha256 in ("a", "b", "c"):
+        parseos.guardar(sha256, "", _metadata())
+    parseos.obtener("a", "", "a.pdf")  # "b" pasa a ser la usada hace más tiempo
+
+    parseos.guardar("d", "", _metadata())
+
+    # Baja al 90% del límite: salen las dos usadas hace más tiempo
+    assert [s for s in "abcd" if parseos.obtener(s, "", "x.pdf") is not None] == ["a", "d"]
+    assert parseos._total_bytes <= 3 * tamano
+    parseos.cerrar()
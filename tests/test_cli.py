@@ -0,0 +1,33 @@
+"""Procesamiento de carpetas por línea de comandos (cli.py)."""
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+ACTAS = RAIZ / "ActasProcesadas"
+
+def test_no_deja_archivos_en_la_carpeta_actual(tmp_path):
+    origen = tmp_path / "origen"
+    shutil.copytree(ACTAS, origen)
+    destino = tmp_path / "destino"
+    actual = tmp_path / "actual"
+    actual.mkdir()
+    # Sin las variables que fija conftest: la CLI decide dónde van sus datos
+    entorno = {k: v for k, v in os.environ.items() if not k.startswith("ACTAS_")}
+
+    resultado = subprocess.run(
+        [sys.executable, str(RAIZ / "backend" / "cli.py"), str(origen), "--destino", str(destino),
+         "--workers", "0", "--zip"],
+        cwd=actual, env=entorno, capture_output=True, text=True, timeout=120
+    )
+
+    assert resultado.returncode == 0, resultado.stdout + resultado.stderr
+    assert list(actual.iterdir()) == []
+    actas = sorted(p.relative_to(destino).as_posix() for p in destino.rglob("*.pdf"))
+    assert len(actas) == 2 and all(not a.startswith(".indice/") for a in actas)
+    internos = {p.name for p in (destino / ".indice").iterdir()}
+    assert {"actas.zip", "cache_parsing.sqlite3", "catalogo.sqlite3", "staging", "logs"} <= internos
+    # Los originales quedan intactos (el destino se arma con hard links)
+    assert sorted(p.name for p in origen.rglob("*.pdf")) == sorted(p.name for p in ACTAS.rglob("*.pdf"))
@@ -0,0 +1,127 @@
+"""Instantáneas de la extracción y reparseo sin leer los PDF (extracciones.py, service.reparsear)."""
+import asyncio
+import hashlib
+import zlib
+from pathlib import Path
+
+import pytest
+
+import parser
+import plantillas
+import service
+from catalog import Catalogo
+from extracciones import (FORMATO, InstantaneaInvalida, RegistroExtracciones, capturar, codificar,
+                          decodificar)
+
+RAIZ = Path(__file__).resolve().parent.parent
+ACTAS = sorted(RAIZ.glob("ActasProcesadas/**/*.pdf")) + sorted(RAIZ.glob("dist/ActasProcesadas/**/*.pdf"))
+ACTA_4TO = RAIZ / "dist/ActasProcesadas/2025/SECUNDARIA/2025 - 0239905 - 27 SANTA LUCIA FE Y ALEGRIA - 4to M.pdf"
+# Instantánea de ACTA_4TO (extracción completa, sin plantillas) guardada por la primera versión
+# de las instantáneas, cuyo parser leía el Período Lectivo "(8)" como sección: "4to I"
+INSTANTANEA_ANTERIOR = Path(__file__).resolve().parent / "datos" / "instantanea_2025_4to.bin"
+
+@pytest.fixture
+def sin_plantillas(monkeypatch):
+    monkeypatch.setattr(plantillas, "_registro", None)
+    monkeypatch.setattr(plantillas, "_registro_iniciado", True)
+
+@pytest.fixture
+def con_plantillas(tmp_path, monkeypatch):
+    registro = plantillas.RegistroPlantillas(tmp_path / "plantillas.sqlite3", "prueba")
+    monkeypatch.setattr(plantillas, "_registro", registro)
+    monkeypatch.setattr(plantillas, "_registro_iniciado", True)
+    yield registro
+    registro.cerrar()
+
+def _extraer(ruta: Path, parsear):
+    with open(ruta, "rb") as pdf_file, capturar() as extraccion:
+        metadata, _ = parsear(pdf_file, ruta.name)
+    return metadata, codificar(extraccion)
+
+def _guardar_y_leer(tmp_path, datos: bytes):
+    """Pasa la instantánea por el registro en SQLite, como entre el parseo y un reparseo."""
+    registro = RegistroExtracciones(tmp_path / "extracciones.sqlite3")
+    sha256 = hashlib.sha256(datos).hexdigest()
+    registro.guardar(sha256, datos)
+    guardada = registro.obtener([sha256, "otra"])
+    registro.cerrar()
+    assert list(guardada) == [sha256]
+    return decodificar(guardada[sha256])
+
+@pytest.mark.parametrize("ruta", ACTAS, ids=lambda ruta: ruta.name)
+def test_reparsear_extraccion_completa(ruta, tmp_path, sin_plantillas):
+    metadata, datos = _extraer(ruta, parser.parsear_acta_completo)
+
+    extraccion = _guardar_y_leer(tmp_path, datos)
+
+    assert extraccion.palabras is not None
+    assert parser.reinterpretar(extraccion, ruta.name, rapido=False) == metadata
+
+@pytest.mark.parametrize("ruta", ACTAS, ids=lambda ruta: ruta.name)
+def test_reparsear_modo_rapido(ruta, tmp_path, sin_plantillas):
+    metadata, datos = _extraer(ruta, parser.parsear_acta_rapido)
+
+    extraccion = _guardar_y_leer(tmp_path, datos)
+
+    assert extraccion.encabezado
+    assert parser.reinterpretar(extraccion, ruta.name, rapido=True) == metadata
+
+def test_reparsear_valores_de_plantilla(tmp_path, con_plantillas):
+    _extraer(ACTA_4TO, parser.parsear_acta_completo)  # aprende la plantilla del diseño
+    metadata, datos = _extraer(ACTA_4TO, parser.parsear_acta_completo)
+
+    extraccion = _guardar_y_leer(tmp_path, datos)
+
+    assert extraccion.valores and extraccion.palabras is None
+    assert parser.reinterpretar(extraccion, ACTA_4TO.name, rapido=False) == metadata
+
+def test_instantanea_de_una_version_anterior_del_parser(sin_plantillas):
+    extraccion = decodificar(INSTANTANEA_ANTERIOR.read_bytes())
+
+    metadata = parser.reinterpretar(extraccion, ACTA_4TO.name, rapido=False)
+
+    # Las reglas actuales sobre lo que se extrajo entonces: el mismo resultado que parsear hoy
+    with open(ACTA_4TO, "rb") as pdf_file:
+        actual, completa = parser.parsear_acta_completo(pdf_file, ACTA_4TO.name)
+    assert completa
+    assert metadata == actual
+    assert metadata.grado_seccion == "4to C"
+
+def test_instantanea_de_otro_formato():
+    datos = zlib.decompress(INSTANTANEA_ANTERIOR.read_bytes())
+    with pytest.raises(InstantaneaInvalida):
+        decodificar(zlib.compress(bytes([FORMATO + 1]) + datos[1:]))
+    with pytest.raises(InstantaneaInvalida):
+        decodificar(b"no es una instantanea")
+
+def test_reparseo_del_servicio_reclasifica_sin_leer_el_pdf(tmp_path, monkeypatch, sin_plantillas):
+    acta_service = service.acta_service
+    catalogo = Catalogo(tmp_path / "catalogo.sqlite3")
+    extracciones = RegistroExtracciones(tmp_path / "extracciones.sqlite3")
+    monkeypatch.setattr(acta_service, "catalogo", catalogo)
+    monkeypatch.setattr(acta_service, "extracciones", extracciones)
+    monkeypatch.setattr(acta_service.engine, "rapido", False)
+
+    async def sin_pool(*args):
+        raise AssertionError("el reparseo no debe volver a extraer el PDF")
+    monkeypatch.setattr(acta_service, "_parsear_en_pool", sin_pool)
+
+    # El acta quedó catalogada con la clasificación de la versión anterior del parser
+    datos = INSTANTANEA_ANTERIOR.read_bytes()
+    anterior = parser.reinterpretar(decodificar(datos), ACTA_4TO.name, rapido=False)
+    anterior.grado_seccion = "4to I"
+    anterior.nuevo_nombre = "2025 - 0239905 - 27 SANTA LUCIA FE Y ALEGRIA - 4to I.pdf"
+    ruta = tmp_path / "trabajo" / "2025" / "SECUNDARIA" / anterior.nuevo_nombre
+    catalogo.registrar("a" * 64, ruta, anterior, "trabajo")
+    extracciones.guardar("a" * 64, datos)
+    try:
+        resumen = asyncio.run(acta_service.reparsear(simular=True))
+    finally:
+        catalogo.cerrar()
+        extracciones.cerrar()
+
+    assert (resumen.revisadas, resumen.reextraidas, resumen.reclasificadas, resumen.errores) == (1, 0, 1, 0)
+    cambio, = resumen.cambios
+    assert cambio.estado == "simulada"
+    assert cambio.nueva == str(tmp_path / "trabajo" / "2025" / "SECUNDARIA" /
+                               "2025 - 0239905 - 27 SANTA LUCIA FE Y ALEGRIA - 4to C.pdf")
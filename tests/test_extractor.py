@@ -0,0 +1,152 @@
+"""Extracción de campos en una pasada contra las búsquedas separadas que reemplazó (extractor.py)."""
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+from extractor import CODIGOS_CONOCIDOS, NOMBRE_IE_CONOCIDO, extraer_campos, seccion_valida
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from micro_parser import CASOS, ENCABEZADO_SIAGIE
+
+def _reglas_anteriores(texto_upper: str, estricto: bool) -> dict:
+    """Las búsquedas de texto de parser._interpretar_acta antes de extractor.extraer_campos."""
+    anio_match = re.search(r'20(23|24|25)', texto_upper)
+    codigo_match = re.search(r'(?:C[ÓO]DIGO\s+MODULAR|MODULAR).*?(\d{7})', texto_upper)
+    if not codigo_match:
+        codigo_match = re.search(r'(\d{7})', texto_upper)
+    codigo_modular = codigo_match.group(1) if codigo_match else "0000000"
+    nivel = "DESCONOCIDO"
+    if "INICIAL" in texto_upper: nivel = "INICIAL"
+    elif "PRIMARIA" in texto_upper: nivel = "PRIMARIA"
+    elif "SECUNDARIA" in texto_upper: nivel = "SECUNDARIA"
+
+    grado_raw, seccion_raw = "", ""
+    for line in texto_upper.split('\n'):
+        if not grado_raw:
+            m = re.search(r'GRADO(?:\s*\(5\))?[:\s]*(\w+)', line)
+            if m and (not estricto or re.search(r'\d', m.group(1))):
+                grado_raw = m.group(1).strip()
+        if not seccion_raw:
+            m_sec = re.search(r'SECCI[ÓO]N.*?(?:[:\s]|\(8\))(?:\s*)([A-Z0-9]+|ÚNICA|UNICA)\b', line)
+            if m_sec:
+                candidate = m_sec.group(1).strip().upper().replace('Ú', 'U')
+                if candidate not in ["P", "S", "M", "T", "EBR"] and (not estricto or seccion_valida(candidate)):
+                    seccion_raw = candidate
+
+    nombre_ie = "IE SIN NOMBRE"
+    for codigo in ["0227900", "0239905", "1155530", "0478032"]:
+        if codigo in codigo_modular or codigo in texto_upper:
+            nombre_ie = "27 SANTA LUCIA FE Y ALEGRIA"
+            break
+    if nombre_ie == "IE SIN NOMBRE":
+        if "SANTA LUCIA" in texto_upper and "ALEGRIA" in texto_upper:
+            nombre_ie = "27 SANTA LUCIA FE Y ALEGRIA"
+        else:
+            stop_words = ["CODIGO", "CÓDIGO", "MODULAR", "UGEL", "DRE", "PERIODO", "PERÍODO", "ANEXO", "FORMA",
+                          "ESC", "CARACTERISTICA", "TURNO"]
+            for line in texto_upper.split('\n'):
+                line_clean = re.sub(r'\s+', ' ', line)
+                if "NUMERO Y/O NOMBRE" in line_clean or "NÚMERO Y/O NOMBRE" in line_clean:
+                    match_num = re.search(r'(?:NUMERO|NÚMERO)\s+Y/O\s+NOMBRE\s+[:\.]?\s*(\d+)', line_clean)
+                    if match_num:
+                        nombre_ie = match_num.group(1)
+                        break
+                    partes = re.split(r'NOMBRE', line_clean)
+                    if len(partes) > 1:
+                        posible_nombre = partes[-1].strip()
+                        for stop_word in stop_words:
+                            if stop_word in posible_nombre:
+                                posible_nombre = posible_nombre.split(stop_word)[0].strip()
+                        posible_nombre = re.sub(r'^[:\-\.\s]+', '', posible_nombre)
+                        if len(posible_nombre) >= 3:
+                            nombre_ie = posible_nombre
+                            break
+
+    return {
+        "anio": anio_match.group(0) if anio_match else "2024",
+        "codigo_modular": codigo_modular,
+        "nivel": nivel,
+        "grado": grado_raw,
+        "seccion": seccion_raw,
+        "nombre_ie": nombre_ie,
+        "recuperacion": "RECUPERACI[ÓO]N" in texto_upper,
+    }
+
+def _reglas_en_una_pasada(texto_upper: str, estricto: bool) -> dict:
+    """Los mismos valores, combinados desde extraer_campos como lo hace parser._interpretar_acta."""
+    campos = extraer_campos(texto_upper)
+    codigo_modular = campos.codigo_modular or campos.primer_codigo or "0000000"
+    if campos.codigo_conocido or codigo_modular in CODIGOS_CONOCIDOS:
+        nombre_ie = NOMBRE_IE_CONOCIDO
+    elif campos.menciona_santa_lucia and campos.menciona_alegria:
+        nombre_ie = NOMBRE_IE_CONOCIDO
+    else:
+        nombre_ie = campos.nombre_ie or "IE SIN NOMBRE"
+    return {
+        "anio": campos.anio or "2024",
+        "codigo_modular": codigo_modular,
+        "nivel": campos.nivel or "DESCONOCIDO",
+        "grado": (campos.grado_estricto if estricto else campos.grado) or "",
+        "seccion": (campos.seccion_estricta if estricto else campos.seccion) or "",
+        "nombre_ie": nombre_ie,
+        "recuperacion": campos.recuperacion,
+    }
+
+ENCABEZADOS = [
+    ENCABEZADO_SIAGIE,
+    *(texto for _, texto, _ in CASOS),
+    # Código modular con y sin etiqueta, y el primer número de 7 dígitos como respaldo
+    "CÓDIGO MODULAR - ANEXO 0555555 - 0\nNIVEL PRIMARIA\nGRADO 3 SECCIÓN A",
+    "CODIGO MODULAR: 1234567\nDNI 7654321",
+    "DNI 7654321\nMODULAR 1234567",
+    "RESOLUCIÓN 2988123\nNIVEL INICIAL",
+    # Grado: la primera coincidencia, o la primera con un número en modo estricto
+    "GRADO Y SECCIÓN DEL ESTUDIANTE\nGRADO (5) 4 TURNO (7) M\nSECCIÓN(6) C",
+    "GRADO: 2DO\nGRADO 5",
+    # Sección: letras, números, ÚNICA/UNICA y los valores de otras columnas que se descartan
+    "SECCIÓN(8) UNICA\nNIVEL PRIMARIA",
+    "SECCION ÚNICA",
+    "GESTIÓN (4) P SECCIÓN(6) P\nSECCIÓN: B",
+    "SECCIÓN EBR\nSECCIÓN 71009\nSECCIÓN D",
+    "SECCIÓN(8) M\nSECCIÓN(8) UNICA",
+    # Nombre de la IE: numérico, con palabras de parada y demasiado corto
+    "NÚMERO Y/O NOMBRE 71009 SAN MARTIN",
+    "NUMERO Y/O NOMBRE SAN JUAN BOSCO CODIGO MODULAR 1234567",
+    "NÚMERO Y/O NOMBRE : LA SALLE UGEL AREQUIPA",
+    "NÚMERO Y/O NOMBRE AB\nNÚMERO Y/O NOMBRE SANTA ROSA DE LIMA TURNO M",
+    "NUMERO   Y/O   NOMBRE   NUESTRA SEÑORA",
+    "NÚMERO Y/O NOMBRE COLEGIO\nSANTA LUCIA FE Y ALEGRIA",
+    "CÓDIGO MODULAR 0239905\nNÚMERO Y/O NOMBRE OTRO COLEGIO",
+    # Recuperación: con y sin tilde (la comparación literal heredada no marca ninguna)
+    "ACTA DE EVALUACIÓN DE RECUPERACIÓN 2025\nNIVEL SECUNDARIA\nGRADO 1 SECCIÓN A",
+    "ACTA DE EVALUACION DE RECUPERACION 2024\nNIVEL SECUNDARIA\nGRADO 1 SECCION A",
+    "ÁREAS\nRECUPERACIÓN",
+    "",
+]
+
+@pytest.mark.parametrize("estricto", [False, True])
+@pytest.mark.parametrize("texto", ENCABEZADOS)
+def test_mismos_campos_que_las_reglas_anteriores(texto, estricto):
+    texto_upper = texto.upper()
+    assert _reglas_en_una_pasada(texto_upper, estricto) == _reglas_anteriores(texto_upper, estricto)
+
+LINEAS = [
+    "MINISTERIO DE EDUCACIÓN", "ACTA OFICIAL DE EVALUACIÓN 2023", "PERÍODO LECTIVO 2024", "2025",
+    "NIVEL PRIMARIA", "NIVEL SECUNDARIA", "INICIAL", "CÓDIGO MODULAR 1155530", "MODULAR - ANEXO 0478032 - 0",
+    "CODIGO MODULAR 1234567", "DNI 4567890", "GRADO (5) 2", "GRADO Y SECCIÓN", "GRADO: 5TO", "GRADO(5) 1 TURNO(9) M",
+    "SECCIÓN(6) B", "SECCIÓN(8) UNICA", "SECCION ÚNICA", "GESTIÓN (4) P SECCIÓN(6) C", "SECCIÓN EBR", "SECCIÓN 12",
+    "NÚMERO Y/O NOMBRE 71009", "NUMERO Y/O NOMBRE SAN MARTIN DE PORRES UGEL", "NÚMERO Y/O NOMBRE : LA SALLE ANEXO 0",
+    "NÚMERO Y/O NOMBRE AB", "FE Y ALEGRIA", "SANTA LUCIA", "RECUPERACIÓN", "RECUPERACION", "Y/O",
+]
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_encabezados_combinados(semilla):
+    azar = random.Random(semilla)
+    for _ in range(400):
+        texto_upper = "\n".join(azar.choice(LINEAS) for _ in range(azar.randint(1, 10)))
+        for estricto in (False, True):
+            assert _reglas_en_una_pasada(texto_upper, estricto) == _reglas_anteriores(texto_upper, estricto), texto_upper
@@ -0,0 +1,65 @@
+"""Reglas de parsing sobre el encabezado SIAGIE (parser.py)."""
+import sys
+from pathlib import Path
+
+import pytest
+
+import parser
+import plantillas
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.append(str(RAIZ / "benchmarks"))
+
+from micro_parser import ENCABEZADO_SIAGIE
+
+def _palabra(texto: str, x0: float, top: float) -> dict:
+    # Como extract_words(keep_blank_chars=True): cada frase de una celda es una "palabra"
+    return {'text': texto, 'x0': x0, 'x1': x0 + 6 * len(texto), 'top': top, 'bottom': top + 8}
+
+# Palabras del encabezado de ENCABEZADO_SIAGIE (diseño 2025), con sus posiciones en la página
+PALABRAS_SIAGIE = [
+    _palabra("ACTA OFICIAL DE EVALUACIÓN DEL NIVEL SECUNDARIA EBR - 2025", 150, 20),
+    _palabra("Período Lectivo (8)", 30, 60),
+    _palabra("Inicio 17/03/2025", 150, 60),
+    _palabra("Fin 19/12/2025", 270, 60),
+    _palabra("Número y/o Nombre", 30, 120),
+    _palabra("71009 SAN MARTIN", 150, 120),
+    _palabra("Código Modular - Anexo", 30, 135),
+    _palabra("0555555 - 0", 180, 135),
+    _palabra("Modalidad (3)", 30, 170),
+    _palabra("EBR", 120, 170),
+    _palabra("Grado (5)", 160, 170),
+    _palabra("5", 220, 170),
+    _palabra("Turno (7)", 250, 170),
+    _palabra("M", 310, 170),
+    _palabra("Gestión (4)", 30, 185),
+    _palabra("P", 120, 185),
+    _palabra("Sección(6)", 160, 185),
+    _palabra("B", 230, 185),
+]
+
+def test_periodo_lectivo_no_es_la_seccion():
+    # En el diseño 2025 "(8)" es el Período Lectivo: a su derecha está "Inicio dd/mm/aaaa",
+    # que se leía como sección "I"
+    metadata = parser.interpretar_acta(ENCABEZADO_SIAGIE, PALABRAS_SIAGIE, "acta.pdf")
+    assert metadata.grado_seccion == "5to B"
+    assert (metadata.anio, metadata.nivel, metadata.codigo_modular) == ("2025", "SECUNDARIA", "0555555")
+
+def test_seccion_ocho_de_otros_disenos():
+    # En los diseños anteriores "(8)" sí es la etiqueta de la sección
+    palabras = [_palabra("Grado(5)", 30, 50), _palabra("3", 90, 50),
+                _palabra("Gestión(4) P", 30, 65), _palabra("(8)", 120, 65), _palabra("D", 150, 65)]
+    metadata = parser.interpretar_acta("NIVEL PRIMARIA 2024", palabras, "acta.pdf")
+    assert metadata.grado_seccion == "3ro D"
+
+@pytest.mark.parametrize("ruta, grado_seccion", [
+    ("dist/ActasProcesadas/2025/SECUNDARIA/2025 - 0239905 - 27 SANTA LUCIA FE Y ALEGRIA - 4to M.pdf", "4to C"),
+    ("dist/ActasProcesadas/2025/SECUNDARIA/2025 - 0239905 - 27 SANTA LUCIA FE Y ALEGRIA - 5to M.pdf", "5to B"),
+])
+def test_actas_2025_con_extraccion_completa(ruta, grado_seccion, monkeypatch):
+    # Sin plantillas: solo las reglas sobre la extracción de pdfplumber
+    monkeypatch.setattr(plantillas, "_registro", None)
+    monkeypatch.setattr(plantillas, "_registro_iniciado", True)
+    with open(RAIZ / ruta, "rb") as pdf_file:
+        metadata = parser.parsear_acta(pdf_file, "acta.pdf")
+    assert metadata.grado_seccion == grado_seccion
@@ -0,0 +1,116 @@
+"""Plantillas de diseño aprendidas (plantillas.py) y su efecto en la caché de resultados."""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+import parser
+import plantillas
+import service
+from cache import ParseCache
+from models import ActaMetadata
+
+RAIZ = Path(__file__).resolve().parent.parent
+ACTAS = sorted(RAIZ.glob("ActasProcesadas/**/*.pdf")) + sorted(RAIZ.glob("dist/ActasProcesadas/**/*.pdf"))
+ACTAS_2025 = [ruta for ruta in ACTAS if ruta.name.startswith("2025")]
+
+@pytest.fixture
+def registro(tmp_path, monkeypatch):
+    """Registro de plantillas vacío para el test (en lugar del de este proceso)."""
+    registro = plantillas.RegistroPlantillas(tmp_path / "plantillas.sqlite3", "prueba")
+    monkeypatch.setattr(plantillas, "_registro", registro)
+    monkeypatch.setattr(plantillas, "_registro_iniciado", True)
+    yield registro
+    registro.cerrar()
+
+def _completa(ruta: Path) -> ActaMetadata:
+    """Extracción completa con pdfplumber, sin leer plantillas."""
+    with open(ruta, "rb") as pdf_file:
+        return parser.parsear_acta(pdf_file, ruta.name)
+
+def _aprender(ruta: Path):
+    with open(ruta, "rb") as pdf_file:
+        encabezado = parser.leer_encabezado(pdf_file)
+        assert encabezado.por_aprender
+        parser.parsear_acta(pdf_file, ruta.name, 0, encabezado)
+
+def _con_plantilla(ruta: Path):
+    with open(ruta, "rb") as pdf_file:
+        return parser.parsear_acta_completo(pdf_file, ruta.name)
+
+@pytest.mark.parametrize("ruta", ACTAS, ids=lambda ruta: ruta.name)
+def test_plantilla_aprendida_da_la_misma_metadata(ruta, registro):
+    _aprender(ruta)
+
+    metadata, completa = _con_plantilla(ruta)
+
+    assert not completa  # leída de las regiones de la plantilla, sin pdfplumber
+    assert metadata == _completa(ruta)
+
+def test_plantilla_sirve_para_otras_actas_del_mismo_diseno(registro):
+    primera, segunda = ACTAS_2025
+    _aprender(primera)
+
+    metadata, completa = _con_plantilla(segunda)
+
+    assert not completa
+    assert metadata == _completa(segunda)
+    assert metadata.grado_seccion != _completa(primera).grado_seccion
+
+def test_sin_plantilla_usa_la_extraccion_completa(registro):
+    metadata, completa = _con_plantilla(ACTAS_2025[0])
+    assert completa
+    assert metadata == _completa(ACTAS_2025[0])
+
+class _PoolFalso:
+    """Reemplaza el parsing en el pool: cuenta las actas que no salieron de la caché."""
+    def __init__(self):
+        self.parseadas = 0
+
+    async def __call__(self, ruta_pdf, nombre_original, sha256):
+        self.parseadas += 1
+        return ActaMetadata(archivo_original=nombre_original, anio="2025", codigo_modular="0239905", anexo="0",
+                            nombre_ie="IE", nivel="SECUNDARIA", grado_seccion="4to C", es_recuperacion=False), True
+
+@pytest.fixture
+def servicio(tmp_path, monkeypatch):
+    """El servicio con una caché vacía y sin pool de procesos."""
+    pool = _PoolFalso()
+    monkeypatch.setattr(service.acta_service, "_parsear_en_pool", pool)
+    monkeypatch.setattr(service.acta_service, "cache",
+                        ParseCache(tmp_path / "cache.sqlite3", 1024 * 1024, service._huella_de_reglas()))
+    yield service.acta_service, pool
+    service.acta_service.cache.cerrar()
+
+def _parsear(acta_service) -> str:
+    _, modo = asyncio.run(acta_service._parsear(Path("acta.pdf"), "acta.pdf", "a" * 64))
+    return modo
+
+def test_cambiar_una_regla_de_plantilla_invalida_la_cache(servicio, tmp_path, monkeypatch):
+    acta_service, pool = servicio
+    assert _parsear(acta_service) == "completa"
+    assert _parsear(acta_service) == "cache"
+
+    # Cuánto puede crecer una región a la derecha: cambia lo que se lee con plantilla
+    monkeypatch.setattr(plantillas, "EXTENSION_MAX", plantillas.EXTENSION_MAX + 10)
+    version = service._huella_de_reglas()
+    assert version != acta_service.cache.version
+    acta_service.cache.cerrar()
+    # Como al reiniciar con las reglas nuevas: la misma base, otra versión
+    acta_service.cache = ParseCache(tmp_path / "cache.sqlite3", 1024 * 1024, version)
+
+    assert _parsear(acta_service) == "completa"
+    assert pool.parseadas == 2
+
+def test_activar_o_desactivar_plantillas_no_reusa_la_cache(servicio, monkeypatch):
+    acta_service, pool = servicio
+    monkeypatch.setattr(service, "USAR_PLANTILLAS", True)
+    assert _parsear(acta_service) == "completa"
+
+    monkeypatch.setattr(service, "USAR_PLANTILLAS", False)
+    assert _parsear(acta_service) == "completa"
+    assert _parsear(acta_service) == "cache"
+
+    monkeypatch.setattr(service, "USAR_PLANTILLAS", True)
+    assert _parsear(acta_service) == "cache"
+    assert pool.parseadas == 2
@@ -0,0 +1,102 @@
+"""División de PDF consolidados (splitter.py)."""
+import hashlib
+
+import pypdfium2 as pdfium
+
+from models import ActaMetadata
+from splitter import (MIN_PAGINAS_POR_BLOQUE, ActaEncontrada, agrupar_actas, bloques_de_paginas,
+                      es_nombre_parte, escribir_en_worker, nombre_parte)
+
+def _metadata(grado_seccion: str, **campos) -> ActaMetadata:
+    valores = dict(archivo_original="consolidado.pdf", anio="2025", codigo_modular="0239905", anexo="0",
+                   nombre_ie="IE", nivel="SECUNDARIA", grado_seccion=grado_seccion, es_recuperacion=False)
+    return ActaMetadata(**{**valores, **campos})
+
+def test_bloques_cubren_todas_las_paginas():
+    for paginas, workers in [(1, 4), (16, 4), (100, 4), (1000, 8), (37, 1)]:
+        bloques = bloques_de_paginas(paginas, workers)
+        assert bloques[0][0] == 0 and bloques[-1][1] == paginas
+        assert all(a[1] == b[0] for a, b in zip(bloques, bloques[1:]))
+        assert len(bloques) <= max(1, workers)
+        # Ningún bloque (salvo el último) es más chico que el mínimo
+        assert all(hasta - desde >= MIN_PAGINAS_POR_BLOQUE for desde, hasta in bloques[:-1])
+
+def test_pocas_paginas_van_en_un_solo_bloque():
+    assert bloques_de_paginas(10, 8) == [(0, 10)]
+    assert bloques_de_paginas(0, 4) == []
+
+def test_agrupar_une_paginas_con_la_misma_metadata():
+    encabezados = [
+        (0, _metadata("1ro A"), False, None, b"e0"),
+        (2, _metadata("1ro A"), True, None, None),  # el acta continúa en otra hoja
+        (4, _metadata("1ro B"), False, None, b"e4"),
+        (6, None, False, "sin encabezado legible", None),
+        (7, _metadata("1ro B", es_recuperacion=True), False, None, b"e7"),
+    ]
+    actas = agrupar_actas(list(reversed(encabezados)), 9)
+
+    assert [(a.desde, a.hasta) for a in actas] == [(0, 4), (4, 6), (6, 7), (7, 9)]
+    assert actas[0].completa and actas[0].extraccion == b"e0"
+    assert actas[2].metadata is None and actas[2].error == "sin encabezado legible"
+    assert actas[3].metadata.es_recuperacion
+
+def test_caratula_va_con_la_primera_acta():
+    actas = agrupar_actas([(2, _metadata("2do A"), False, None, None)], 5)
+    assert [(a.desde, a.hasta) for a in actas] == [(0, 5)]
+
+def test_nombre_parte():
+    acta = ActaEncontrada(desde=4, hasta=8)
+    assert nombre_parte("consolidado.PDF", acta) == "consolidado [págs. 5-8].pdf"
+    assert nombre_parte("sin extension", acta) == "sin extension [págs. 5-8].pdf"
+    assert es_nombre_parte("consolidado [págs. 5-8].pdf")
+    assert not es_nombre_parte("consolidado.pdf")
+
+def _consolidado(ruta, paginas: int):
+    documento = pdfium.PdfDocument.new()
+    try:
+        for i in range(paginas):
+            documento.new_page(595 + i, 842)  # tamaños distintos para reconocer cada página
+        documento.save(str(ruta))
+    finally:
+        documento.close()
+
+def _anchos(ruta) -> list:
+    documento = pdfium.PdfDocument(str(ruta))
+    try:
+        return [round(documento[i].get_width()) for i in range(len(documento))]
+    finally:
+        documento.close()
+
+def test_escribir_partes(tmp_path):
+    origen = tmp_path / "consolidado.pdf"
+    _consolidado(origen, 6)
+    partes = [(0, 2, str(tmp_path / "a.pdf")), (2, 6, str(tmp_path / "b.pdf"))]
+
+    resultados = escribir_en_worker(str(origen), partes)
+
+    assert [error for _, error in resultados] == [None, None]
+    assert _anchos(tmp_path / "a.pdf") == [595, 596]
+    assert _anchos(tmp_path / "b.pdf") == [597, 598, 599, 600]
+    for (sha256, _), (_, _, destino) in zip(resultados, partes):
+        with open(destino, "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == sha256
+
+def test_la_misma_acta_produce_los_mismos_bytes(tmp_path):
+    origen = tmp_path / "consolidado.pdf"
+    _consolidado(origen, 3)
+
+    primera = escribir_en_worker(str(origen), [(1, 3, str(tmp_path / "1.pdf"))])
+    segunda = escribir_en_worker(str(origen), [(1, 3, str(tmp_path / "2.pdf"))])
+
+    # Sin fecha ni /ID al azar: el índice de duplicados reconoce el acta al volver a dividir
+    assert primera[0][0] is not None and primera == segunda
+
+def test_parte_fuera_de_rango_no_deja_archivo(tmp_path):
+    origen = tmp_path / "consolidado.pdf"
+    _consolidado(origen, 2)
+    destino = tmp_path / "fuera.pdf"
+
+    (sha256, error), = escribir_en_worker(str(origen), [(1, 5, str(destino))])
+
+    assert sha256 is None and error.startswith("No se pudo escribir el acta")
+    assert not destino.exists()
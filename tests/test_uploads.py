@@ -0,0 +1,71 @@
+"""Subidas reanudables: Content-Range y archivo parcial (uploads.py)."""
+import hashlib
+
+import pytest
+
+from uploads import SubidaInvalida, SubidaReanudable, leer_content_range
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("bytes 0-1048575/3145728", (0, 1048575, 3145728)),
+    ("bytes 10-10/11", (10, 10, 11)),
+    ("  bytes 0-4/5  ", (0, 4, 5)),
+    ("bytes */0", (0, -1, 0)),
+])
+def test_content_range_valido(valor, esperado):
+    assert leer_content_range(valor) == esperado
+
+@pytest.mark.parametrize("valor", [
+    "bytes 5-4/10",  # desde > hasta
+    "bytes 0-10/10",  # hasta fuera del archivo
+    "bytes 0-4/*",  # total desconocido
+    "bytes */10",
+    "0-4/5",
+    "bytes -1-4/5",
+    "items 0-4/5",
+])
+def test_content_range_invalido(valor):
+    with pytest.raises(ValueError):
+        leer_content_range(valor)
+
+def _subida(tmp_path, contenido: bytes) -> SubidaReanudable:
+    return SubidaReanudable(hashlib.sha256(contenido).hexdigest(), "acta.pdf", len(contenido),
+                            tmp_path / "parciales" / "acta.part")
+
+def test_partes_en_orden(tmp_path):
+    contenido = bytes(range(256)) * 4
+    subida = _subida(tmp_path, contenido)
+    for desde in range(0, len(contenido), 300):
+        subida.escribir(subida.recortar(desde, contenido[desde:desde + 300]))
+
+    assert subida.recibido == len(contenido)
+    assert subida.ruta.read_bytes() == contenido
+    assert subida.verificar()
+
+def test_parte_repetida_no_duplica_bytes(tmp_path):
+    contenido = b"0123456789"
+    subida = _subida(tmp_path, contenido)
+    subida.escribir(subida.recortar(0, contenido[:6]))
+    # Reintento tras un corte: la parte se superpone con lo ya recibido
+    subida.escribir(subida.recortar(4, contenido[4:]))
+    subida.escribir(subida.recortar(0, contenido[:3]))
+
+    assert subida.ruta.read_bytes() == contenido
+    assert subida.recibido == len(contenido)
+
+def test_parte_adelantada_indica_desde_donde_seguir(tmp_path):
+    subida = _subida(tmp_path, b"0123456789")
+    subida.escribir(subida.recortar(0, b"0123"))
+
+    with pytest.raises(SubidaInvalida) as error:
+        subida.recortar(6, b"6789")
+    assert error.value.recibido == 4
+
+def test_contenido_distinto_se_descarta(tmp_path):
+    subida = _subida(tmp_path, b"original")
+    subida.escribir(subida.recortar(0, b"alterado"))
+    assert not subida.verificar()
+
+    subida.descartar()
+    assert subida.recibido == 0
+    assert not subida.ruta.exists()
+    assert subida.estado().recibido == 0
@@ -0,0 +1,116 @@
+"""Escritura de las actas en su carpeta final (writer.py)."""
+import asyncio
+
+import writer
+from writer import EscritorActas
+
+def _colocar_todas(escritor, colocaciones):
+    async def correr():
+        return await asyncio.gather(*(escritor.colocar(o, d, m) for o, d, m in colocaciones),
+                                    return_exceptions=True)
+    try:
+        return asyncio.run(correr())
+    finally:
+        escritor.cerrar()
+
+def test_staging_renombra_sin_dejar_temporales(tmp_path):
+    origen = tmp_path / "staging" / "subida.pdf"
+    origen.parent.mkdir()
+    origen.write_bytes(b"%PDF acta")
+    destino = tmp_path / "final" / "2025" / "acta.pdf"
+
+    resultados = _colocar_todas(EscritorActas(sincronizar=False, espera_ms=0), [(origen, destino, "staging")])
+
+    assert resultados == [None]
+    assert destino.read_bytes() == b"%PDF acta"
+    assert not origen.exists()
+    assert [p.name for p in destino.parent.iterdir()] == ["acta.pdf"]
+
+def test_enlace_conserva_el_original(tmp_path):
+    origen = tmp_path / "carpeta" / "original.pdf"
+    origen.parent.mkdir()
+    origen.write_bytes(b"contenido")
+    destino = tmp_path / "final" / "acta.pdf"
+
+    _colocar_todas(EscritorActas(sincronizar=False, espera_ms=0), [(origen, destino, "enlace")])
+
+    assert origen.read_bytes() == destino.read_bytes() == b"contenido"
+    assert sorted(p.name for p in destino.parent.iterdir()) == ["acta.pdf"]
+
+def test_mover_no_reemplaza_un_destino_existente(tmp_path):
+    origen = tmp_path / "original.pdf"
+    origen.write_bytes(b"nuevo")
+    destino = tmp_path / "final" / "acta.pdf"
+    destino.parent.mkdir()
+    destino.write_bytes(b"otra acta")
+
+    resultados = _colocar_todas(EscritorActas(sincronizar=False, espera_ms=0), [(origen, destino, "mover")])
+
+    assert isinstance(resultados[0], FileExistsError)
+    assert destino.read_bytes() == b"otra acta"
+    assert origen.read_bytes() == b"nuevo"
+    assert sorted(p.name for p in destino.parent.iterdir()) == ["acta.pdf"]
+
+def test_mover_borra_el_original_al_terminar(tmp_path):
+    origen = tmp_path / "original.pdf"
+    origen.write_bytes(b"acta")
+    destino = tmp_path / "final" / "acta.pdf"
+
+    _colocar_todas(EscritorActas(sincronizar=False, espera_ms=0), [(origen, destino, "mover")])
+
+    assert destino.read_bytes() == b"acta"
+    assert not origen.exists()
+
+def test_un_lote_sincroniza_cada_carpeta_una_vez(tmp_path, monkeypatch):
+    archivos, carpetas = [], []
+    monkeypatch.setattr(writer, "_sincronizar_archivo", archivos.append)
+    monkeypatch.setattr(writer, "_sincronizar_directorio", carpetas.append)
+    colocaciones = []
+    for i in range(10):
+        origen = tmp_path / "staging" / f"{i}.pdf"
+        origen.parent.mkdir(exist_ok=True)
+        origen.write_bytes(b"x" * i)
+        carpeta = "a" if i % 2 else "b"
+        colocaciones.append((origen, tmp_path / "final" / carpeta / f"{i}.pdf", "staging"))
+
+    # Una espera larga junta las diez actas en un solo lote
+    resultados = _colocar_todas(EscritorActas(sincronizar=True, lote_max=32, espera_ms=50), colocaciones)
+
+    assert resultados == [None] * 10
+    assert len(archivos) == 10
+    assert sorted(carpetas) == [tmp_path / "final" / "a", tmp_path / "final" / "b"]
+
+def test_lotes_limitados_por_lote_max(tmp_path, monkeypatch):
+    carpetas = []
+    monkeypatch.setattr(writer, "_sincronizar_archivo", lambda ruta: None)
+    monkeypatch.setattr(writer, "_sincronizar_directorio", carpetas.append)
+    colocaciones = []
+    for i in range(5):
+        origen = tmp_path / f"{i}.pdf"
+        origen.write_bytes(b"acta")
+        colocaciones.append((origen, tmp_path / "final" / f"{i}.pdf", "staging"))
+
+    _colocar_todas(EscritorActas(sincronizar=True, lote_max=2, espera_ms=50), colocaciones)
+
+    # 5 actas en lotes de 2: tres lotes, un fsync de la carpeta por lote
+    assert len(carpetas) == 3
+
+def test_recrea_una_carpeta_borrada(tmp_path):
+    escritor = EscritorActas(sincronizar=False, espera_ms=0)
+    destino = tmp_path / "final" / "acta.pdf"
+    primero = tmp_path / "1.pdf"
+    primero.write_bytes(b"1")
+    segundo = tmp_path / "2.pdf"
+    segundo.write_bytes(b"2")
+
+    async def correr():
+        await escritor.colocar(primero, destino, "staging")
+        destino.unlink()
+        destino.parent.rmdir()  # la carpeta recordada desapareció (limpieza de sesiones)
+        await escritor.colocar(segundo, destino, "staging")
+    try:
+        asyncio.run(correr())
+    finally:
+        escritor.cerrar()
+
+    assert destino.read_bytes() == b"2"